@@ -0,0 +1,106 @@
+# benchmarks/cancel.py
+"""
+Cancellation regression check for the async LLM organizers.
+
+Organizes a synthetic tree with the semantic and intent organizers against
+the fake Ollama server (see fake_llm.py), with enough latency that most
+prompts are still queued behind the client's concurrency limit, and cancels
+the run part-way. The check fails if more prompts reach the server after
+the cancel than were already holding a slot, or if any file is moved.
+
+Usage:
+    python benchmarks/cancel.py [--files 60] [--cancel-after 0.8] [--latency 0.2]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from fake_llm import FakeOllama  # noqa: E402
+from synthetic import generate_tree  # noqa: E402
+
+
+def _list_files(directory):
+    return sorted(os.path.relpath(os.path.join(root, name), directory)
+                  for root, _, names in os.walk(directory) for name in names)
+
+
+def check(org_type, args, server):
+    """
+    Run one organizer, cancel it after `args.cancel_after` seconds and
+    return the failures found.
+    """
+    from neurotask.organizer import async_organizer
+    from neurotask.utils.progress import ProgressReporter
+
+    failures = []
+    with tempfile.TemporaryDirectory() as directory:
+        generate_tree(directory, args.files, 0, args.seed)
+        before = _list_files(directory)
+        progress = ProgressReporter()
+        sent = {}
+
+        def cancel():
+            sent["at_cancel"] = server.requests
+            progress.cancel()
+
+        timer = threading.Timer(args.cancel_after, cancel)
+        start = server.requests
+        timer.start()
+        try:
+            if org_type == "semantic":
+                # A small token budget gives one prompt per couple of files.
+                plan = asyncio.run(async_organizer.organize_by_semantics_async(
+                    directory, use_cache=False, llm_concurrency=args.llm_concurrency, token_budget=20,
+                    progress=progress))
+            else:
+                plan = asyncio.run(async_organizer.organize_by_intents_async(
+                    directory, llm_concurrency=args.llm_concurrency, use_cache=False, use_rules=False,
+                    progress=progress))
+        finally:
+            timer.cancel()
+        if "at_cancel" not in sent:
+            return [f"{org_type}: finished before the cancel; raise --latency or --files"]
+        late = server.requests - sent["at_cancel"]
+        print(f"{org_type:<10} {sent['at_cancel'] - start:4d} prompts before cancel, {late:4d} after")
+        if late > args.llm_concurrency:
+            failures.append(f"{org_type}: {late} prompts sent after cancel "
+                            f"(at most {args.llm_concurrency} may already hold a slot)")
+        if plan or _list_files(directory) != before:
+            failures.append(f"{org_type}: files were moved after cancel")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Neurotask cancellation check")
+    parser.add_argument("--files", type=int, default=60, help="Files in the synthetic tree")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic tree")
+    parser.add_argument("--llm-concurrency", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.2, help="Fake LLM seconds to first token")
+    parser.add_argument("--cancel-after", type=float, default=0.8, help="Seconds before the run is cancelled")
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as home, \
+            FakeOllama(latency=args.latency, token_latency=0.001, parallel=args.llm_concurrency) as server:
+        os.environ["NEUROTASK_HOME"] = home
+        os.environ["OLLAMA_HOST"] = server.address
+        for org_type in ("semantic", "intent"):
+            failures += check(org_type, args, server)
+
+    if failures:
+        print("\nFAILED")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nOK")
+
+
+if __name__ == "__main__":
+    main()
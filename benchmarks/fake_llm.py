@@ -0,0 +1,194 @@
+# benchmarks/fake_llm.py
+"""
+Deterministic stand-in for the Ollama HTTP API, used by the benchmarks.
+
+It speaks the parts of the API Neurotask uses (/api/generate, streaming
+and not, and /api/embed), recognizes each of Neurotask's prompts and
+answers them from a hash of the prompt, so the same input always gets the
+same answer. Latency is simulated: every request waits `latency` seconds
+before its first token and `token_latency` seconds per token, and at most
+`parallel` requests are served at once, like a GPU-bound model server.
+
+Usage:
+    python benchmarks/fake_llm.py [--port 11434] [--latency 0.05] [--token-latency 0.005]
+"""
+import argparse
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+INTENTS = ("To_Read", "To_Sign", "To_Pay", "To_Review", "To_Complete", "To_Reply", "To_File", "Reference")
+# Words appended after the answer, as a chatty model would; early stopping
+# in the client skips them.
+RAMBLE = " This category fits because the document asks for a follow-up action.\n"
+EMBED_DIM = 64
+
+
+def _pick(text: str, choices):
+    return choices[int(hashlib.blake2b(text.encode("utf-8"), digest_size=4).hexdigest(), 16) % len(choices)]
+
+
+def _category(filename: str) -> str:
+    word = re.split(r"[^A-Za-z]+", filename.strip())[0] or "Misc"
+    return word.capitalize() + " Files"
+
+
+def respond(prompt: str) -> str:
+    """Return the deterministic answer to one of Neurotask's prompts."""
+    if "Here are the filenames to categorize:" in prompt:
+        names = prompt.split("Here are the filenames to categorize:\n", 1)[1].split("\n\n", 1)[0].split(", ")
+        return "\n".join(f"{name} -> {_category(name)}" for name in names)
+    if "Folder names:\n" in prompt:
+        names = prompt.split("Folder names:\n", 1)[1].split("\n\n", 1)[0].split("\n")
+        return "\n".join(f"{name} -> {name}" for name in names)
+    if prompt.rstrip().endswith("Folder name:"):
+        files = prompt.split("Files:\n", 1)[1].split("\n\n", 1)[0].split("\n")
+        return _category(files[0]) + RAMBLE
+    if prompt.rstrip().endswith("JSON:"):
+        sections = re.split(r"=== Document (\S+) ===\n", prompt)[1:]
+        answer = {doc_id: _pick(content, INTENTS) for doc_id, content in zip(sections[::2], sections[1::2])}
+        return json.dumps(answer) + RAMBLE
+    return _pick(prompt, INTENTS) + RAMBLE
+
+
+def _tokens(text: str):
+    return re.findall(r"\s*\S+|\s+", text)
+
+
+class FakeOllama:
+    """
+    Threaded fake Ollama server.
+
+    Args:
+        port (int, optional): Port to listen on; 0 picks a free one.
+        latency (float, optional): Seconds before the first token of every request.
+        token_latency (float, optional): Seconds per generated token.
+        parallel (int, optional): Requests served at once; the rest queue.
+    """
+
+    def __init__(self, port: int = 0, latency: float = 0.05, token_latency: float = 0.005,
+                 parallel: int = 1):
+        self.latency = latency
+        self.token_latency = token_latency
+        self.requests = 0
+        self.tokens = 0
+        self._slots = threading.Semaphore(max(1, parallel))
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def address(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"{host}:{port}"
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, status, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if self.path == "/api/embed":
+                    inputs = request.get("input") or []
+                    inputs = [inputs] if isinstance(inputs, str) else inputs
+                    self._send_json(200, {"embeddings": [fake.embed(text) for text in inputs]})
+                elif self.path == "/api/generate":
+                    fake.generate(self, request)
+                else:
+                    self._send_json(404, {"error": "not found"})
+
+        return Handler
+
+    @staticmethod
+    def embed(text: str) -> list:
+        """Deterministic pseudo-embedding of a text."""
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=EMBED_DIM).digest()
+        return [b / 255 - 0.5 for b in digest]
+
+    def generate(self, handler, request):
+        tokens = _tokens(respond(request.get("prompt", "")))
+        limit = (request.get("options") or {}).get("num_predict")
+        if limit:
+            tokens = tokens[:limit]
+        with self._lock:
+            self.requests += 1
+        with self._slots:
+            time.sleep(self.latency)
+            if not request.get("stream", True):
+                time.sleep(self.token_latency * len(tokens))
+                with self._lock:
+                    self.tokens += len(tokens)
+                handler._send_json(200, {"response": "".join(tokens), "done": True})
+                return
+            handler.send_response(200)
+            handler.send_header("Content-Type", "application/x-ndjson")
+            handler.send_header("Transfer-Encoding", "chunked")
+            handler.end_headers()
+            try:
+                for token in tokens + [None]:
+                    if token is not None:
+                        time.sleep(self.token_latency)
+                        with self._lock:
+                            self.tokens += 1
+                    line = json.dumps({"response": token or "", "done": token is None}).encode("utf-8") + b"\n"
+                    handler.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+                    handler.wfile.flush()
+                handler.wfile.write(b"0\r\n\r\n")
+                handler.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                # The client stopped reading (early termination); stop generating.
+                handler.close_connection = True
+
+    def start(self):
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Shut the server down."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--token-latency", type=float, default=0.005)
+    parser.add_argument("--parallel", type=int, default=1)
+    args = parser.parse_args()
+    server = FakeOllama(args.port, args.latency, args.token_latency, args.parallel)
+    print(f"Fake Ollama listening on {server.address} (Ctrl+C to stop)")
+    with server:
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+# benchmarks/organizers.py
+"""
+Throughput benchmark for the organizers.
+
+For every organizer variant and repeat, a fresh synthetic tree is generated
+(see synthetic.py, on tmpfs when available) and organized in a new Python
+process with a cold classification cache. LLM prompts go to a deterministic
+fake Ollama server (see fake_llm.py) with simulated latency, so LLM modes can
+be measured without a model and results are comparable between runs and
+machines with the same parameters.
+
+Reported per run, and as the median over repeats:
+    files_per_sec      files organized per second of wall time
+    syscalls           read/write syscalls of the organizer process (/proc/self/io);
+                       all syscalls of all processes with --strace (extra pass)
+    peak_rss_mb        peak resident memory of the organizer process
+    peak_child_rss_mb  peak resident memory of its largest child (e.g. extraction worker)
+    decide_ms          p50/p99 of the gaps between consecutive per-file decisions
+                       (PlannedMove creation), i.e. per-file planning latency
+    move_ms            p50/p99 of the time to move one file
+    llm_requests       prompts sent to the fake server
+
+Usage:
+    python benchmarks/organizers.py [--files 1000] [--types extension timeline semantic intent]
+                                    [--repeat 3] [--latency 0.02] [--out results.json]
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from fake_llm import FakeOllama  # noqa: E402
+from synthetic import default_base_dir, generate_tree  # noqa: E402
+
+SCHEMA_VERSION = 1
+VARIANTS = ("extension", "timeline", "semantic", "semantic-embedding", "intent", "intent-batch",
+            "intent-async")
+DEFAULT_VARIANTS = ("extension", "timeline", "semantic", "intent")
+
+
+def percentiles(values):
+    """Return {"p50": ..., "p99": ...} in milliseconds (nearest rank), or None if empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+
+    def rank(q):
+        return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered) + 0.5)) - 1))] * 1000
+
+    return {"p50": round(rank(0.50), 3), "p99": round(rank(0.99), 3)}
+
+
+def _proc_io():
+    try:
+        with open("/proc/self/io", "r") as f:
+            fields = dict(line.split(": ") for line in f.read().splitlines())
+        return int(fields["syscr"]) + int(fields["syscw"])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _organize(variant, directory, config):
+    # Runs inside the child process.
+    from neurotask.file_manager.scanner import walk_directory
+    from neurotask.utils.config import DEFAULT_CONFIG, compile_extension_index
+
+    depth = config["depth"]
+    workers = config["workers"]
+    llm_concurrency = config["llm_concurrency"]
+    if variant == "extension":
+        from neurotask.organizer import extension_based
+        # The built-in categories, not the local config.json, so results stay comparable.
+        extension_index = compile_extension_index(DEFAULT_CONFIG["file_categories"],
+                                                  DEFAULT_CONFIG.get("fallback_category"))
+        prune = extension_based.category_folders(extension_index).__contains__
+    elif variant == "timeline":
+        from neurotask.organizer import timeline_based
+        prune = timeline_based.timeline_folder_filter(directory)
+    elif variant.startswith("semantic"):
+        from neurotask.organizer import semantic_based
+        prune = semantic_based.created_folders(directory).__contains__
+    else:
+        from neurotask.organizer import intent_based
+        prune = intent_based.is_intent_folder
+    entries = list(walk_directory(directory, max_depth=depth, prune=prune, workers=workers))
+
+    if variant == "extension":
+        return extension_based.organize_by_extension(directory, extension_index, entries=entries,
+                                                     open_explorer=False)
+    if variant == "timeline":
+        return timeline_based.organize_by_timeline(directory, entries=entries)
+    if variant.startswith("semantic"):
+        engine = "embedding" if variant == "semantic-embedding" else "prompt"
+        return semantic_based.organize_by_semantics(directory, llm_concurrency=llm_concurrency,
+                                                    entries=entries, engine=engine, workers=workers)
+    if variant == "intent-async":
+        import asyncio
+        from neurotask.organizer.async_organizer import organize_by_intents_async
+        return asyncio.run(organize_by_intents_async(directory, workers=workers,
+                                                     llm_concurrency=llm_concurrency,
+                                                     entries=entries))
+    batch_size = config["batch_size"] if variant == "intent-batch" else 1
+    return intent_based.organize_by_intents(directory, workers=workers, llm_concurrency=llm_concurrency,
+                                            entries=entries, batch_size=batch_size)
+
+
+def run_child(variant, directory, config):
+    """
+    Organize `directory` once in this process and return the measurements.
+    Called in a fresh interpreter by run_once.
+    """
+    sys.path.insert(0, REPO_ROOT)
+    from neurotask.file_manager.mover import BatchMover
+    from neurotask.organizer.plan import PlannedMove
+
+    decided = []
+    move_times = []
+    new_move = PlannedMove.__new__
+    batch_move = BatchMover.move
+
+    def timed_new(cls, *args, **kwargs):
+        decided.append(time.perf_counter())
+        return new_move(cls, *args, **kwargs)
+
+    def timed_move(self, source_path, dest_path):
+        started = time.perf_counter()
+        try:
+            return batch_move(self, source_path, dest_path)
+        finally:
+            move_times.append(time.perf_counter() - started)
+
+    PlannedMove.__new__ = timed_new
+    BatchMover.move = timed_move
+
+    syscalls_before = _proc_io()
+    started = time.perf_counter()
+    plan = _organize(variant, directory, config)
+    elapsed = time.perf_counter() - started
+    syscalls_after = _proc_io()
+
+    gaps = [b - a for a, b in zip([started] + decided, decided)]
+    files = len(plan or [])
+    return {
+        "files": files,
+        "seconds": round(elapsed, 4),
+        "files_per_sec": round(files / elapsed, 2) if elapsed > 0 else None,
+        "syscalls": (syscalls_after - syscalls_before) if syscalls_before is not None else None,
+        # ru_maxrss is in kilobytes on Linux (bytes on macOS).
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "peak_child_rss_mb": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1),
+        "decide_ms": percentiles(gaps),
+        "move_ms": percentiles(move_times),
+    }
+
+
+def count_syscalls(command, env):
+    """Run `command` under `strace -f -c` and return the total syscall count (None without strace)."""
+    if not shutil.which("strace"):
+        return None
+    with tempfile.NamedTemporaryFile("r", suffix=".strace") as report:
+        subprocess.run(["strace", "-f", "-c", "-o", report.name] + command, env=env, cwd=REPO_ROOT,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        lines = report.read().splitlines()
+    # Columns are right-aligned under the header; read the "calls" column of the total row.
+    header = next((line for line in lines if "calls" in line and "syscall" in line), None)
+    total = next((line for line in lines if line.rstrip().endswith(" total")), None)
+    if header is None or total is None:
+        return None
+    match = re.search(r"(\d+)\s*$", total[:header.index("calls") + len("calls")])
+    return int(match.group(1)) if match else None
+
+
+def run_once(variant, args, server, strace=False):
+    """Generate a fresh tree and organize it in a child process."""
+    base = tempfile.mkdtemp(prefix="neurotask-bench-", dir=args.base_dir)
+    try:
+        directory = os.path.join(base, "tree")
+        tree = generate_tree(directory, args.files, args.depth, args.seed)
+        home = os.path.join(base, "home")
+        result_path = os.path.join(base, "result.json")
+        config = {"depth": args.depth, "workers": args.workers, "llm_concurrency": args.llm_concurrency,
+                  "batch_size": args.batch_size}
+        env = dict(os.environ, NEUROTASK_HOME=home, OLLAMA_HOST=server.address,
+                   PYTHONPATH=REPO_ROOT, PYTHONDONTWRITEBYTECODE="1")
+        command = [sys.executable, os.path.abspath(__file__), "--child", variant, directory,
+                   json.dumps(config), result_path]
+        if strace:
+            return count_syscalls(command, env)
+
+        requests = server.requests
+        completed = subprocess.run(command, env=env, cwd=REPO_ROOT, capture_output=True, text=True)
+        if completed.returncode != 0:
+            raise RuntimeError(f"{variant} failed:\n{completed.stderr[-2000:]}")
+        with open(result_path, "r", encoding="utf-8") as f:
+            result = json.load(f)
+        result["llm_requests"] = server.requests - requests
+        return tree, result
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+
+
+def summarize(runs):
+    """Median of every numeric metric (and of each percentile) over the runs."""
+    summary = {}
+    for key, value in runs[0].items():
+        if isinstance(value, dict):
+            summary[key] = {q: round(statistics.median(run[key][q] for run in runs), 3) for q in value}
+        elif isinstance(value, (int, float)):
+            summary[key] = round(statistics.median(run[key] for run in runs), 3)
+        else:
+            summary[key] = value
+    return summary
+
+
+def environment():
+    """Machine and source details stored with every result file."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                                text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        variant, directory, config, result_path = sys.argv[2:6]
+        result = run_child(variant, directory, json.loads(config))
+        with open(result_path, "w", encoding="utf-8") as f:
+            json.dump(result, f)
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=1000, help="Files in the synthetic tree")
+    parser.add_argument("--depth", type=int, default=2, help="Folder depth of the synthetic tree")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic tree")
+    parser.add_argument("--types", nargs="+", choices=VARIANTS, default=list(DEFAULT_VARIANTS),
+                        help="Organizer variants to run")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per variant (median is reported)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--llm-concurrency", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=10, help="Documents per prompt for intent-batch")
+    parser.add_argument("--latency", type=float, default=0.02, help="Fake LLM seconds to first token")
+    parser.add_argument("--token-latency", type=float, default=0.002, help="Fake LLM seconds per token")
+    parser.add_argument("--parallel", type=int, default=1, help="Requests the fake LLM serves at once")
+    parser.add_argument("--base-dir", default=default_base_dir(), help="Where trees are generated")
+    parser.add_argument("--strace", action="store_true",
+                        help="Count all syscalls with strace in one extra (untimed) run per variant")
+    parser.add_argument("--out", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    report = {
+        "schema": SCHEMA_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "environment": environment(),
+        "params": {key: value for key, value in vars(args).items() if key not in ("out", "strace")},
+        "tree": None,
+        "results": {},
+    }
+    with FakeOllama(latency=args.latency, token_latency=args.token_latency, parallel=args.parallel) as server:
+        for variant in args.types:
+            runs = []
+            for i in range(args.repeat):
+                tree, result = run_once(variant, args, server)
+                report["tree"] = report["tree"] or tree
+                runs.append(result)
+                print(f"[Bench] {variant} run {i + 1}/{args.repeat}: {result['files_per_sec']} files/s",
+                      file=sys.stderr)
+            entry = {"median": summarize(runs), "runs": runs}
+            if args.strace:
+                entry["median"]["total_syscalls"] = run_once(variant, args, server, strace=True)
+            report["results"][variant] = entry
+
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# benchmarks/startup.py
+"""
+Startup regression check for the CLI path.
+
+Runs `run_neurotask.py --cli --dry-run` on an empty directory under
+`python -X importtime` for each organizer type. The check fails if a module
+that only the GUI or a specific file type needs gets imported, or if the
+total import time goes over the budget.
+
+Usage:
+    python benchmarks/startup.py [--budget-ms 200] [--repeat 5] [--top 8]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TYPES = ("extension", "timeline", "semantic", "intent")
+# Top-level packages that must never be imported when starting the CLI.
+FORBIDDEN = (
+    "tkinter", "PyPDF2", "docx", "speech_recognition", "pyttsx3", "bs4", "requests",
+    "dateutil", "numpy", "multiprocessing",
+)
+
+
+def measure(org_type: str, directory: str, home: str):
+    """
+    Start the CLI once and parse its -X importtime report.
+
+    Returns:
+        tuple: (total import time in microseconds, {module: cumulative microseconds}).
+    """
+    env = dict(os.environ, NEUROTASK_HOME=home, PYTHONDONTWRITEBYTECODE="1")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "run_neurotask.py",
+         "--cli", "--dir", directory, "--type", org_type, "--dry-run"],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{org_type} run failed:\n{result.stdout}{result.stderr}")
+    total = 0
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        total += int(self_us)
+        modules[name.strip()] = int(cumulative_us)
+    return total, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Neurotask CLI startup benchmark")
+    parser.add_argument("--budget-ms", type=float, default=200,
+                        help="Maximum total import time per organizer type")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="Runs per organizer type; the fastest one counts")
+    parser.add_argument("--top", type=int, default=8,
+                        help="Number of slowest imports to list per type")
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as directory, tempfile.TemporaryDirectory() as home:
+        for org_type in TYPES:
+            runs = [measure(org_type, directory, home) for _ in range(args.repeat)]
+            total, modules = min(runs, key=lambda run: run[0])
+            loaded = sorted(name for name in modules if name.split(".")[0] in FORBIDDEN)
+
+            print(f"{org_type:<10} {total / 1000:7.1f} ms imports")
+            for name, cumulative in sorted(modules.items(), key=lambda item: -item[1])[:args.top]:
+                print(f"    {cumulative / 1000:7.1f} ms  {name}")
+            if loaded:
+                failures.append(f"{org_type}: imported {', '.join(loaded)}")
+            if total / 1000 > args.budget_ms:
+                failures.append(f"{org_type}: {total / 1000:.1f} ms is over the {args.budget_ms:g} ms budget")
+
+    if failures:
+        print("\nFAILED")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nOK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+# benchmarks/synthetic.py
+"""
+Deterministic synthetic directory trees for the benchmarks.
+
+The same (files, depth, seed) always produces byte-identical trees, so runs
+on different commits organize exactly the same input. Documents (PDF, DOCX,
+TXT) contain short realistic texts, some with the phrases the intent rules
+look for; other files are seeded random bytes with common extensions.
+
+Usage:
+    python benchmarks/synthetic.py DIR [--files 1000] [--depth 2] [--seed 0]
+"""
+import argparse
+import hashlib
+import os
+import random
+import tempfile
+import zipfile
+
+# (extension, share of files); documents are generated with real content.
+EXTENSION_MIX = (
+    (".pdf", 0.15), (".docx", 0.10), (".txt", 0.15), (".jpg", 0.15), (".png", 0.10),
+    (".mp3", 0.05), (".mp4", 0.05), (".zip", 0.05), (".py", 0.05), (".csv", 0.05),
+    (".xlsx", 0.05), (".bin", 0.05),
+)
+DOCUMENT_EXTENSIONS = {".pdf", ".docx", ".txt"}
+# Size range of the non-document files, in bytes.
+BINARY_SIZE = (2 * 1024, 256 * 1024)
+
+NAME_PATTERNS = (
+    "invoice_{year}_{month:02d}", "IMG_{n:04d}", "Screenshot {year}-{month:02d}-{day:02d} at {n}",
+    "report_q{quarter}_{year}", "meeting_notes_{month:02d}{day:02d}", "contract_{word}",
+    "{word}_draft_v{version}", "receipt_{word}_{n}", "resume_{word}", "{word}_{word2}",
+    "scan_{n:05d}", "budget_{year}", "lecture_{n:02d}_{word}", "form_{word}",
+)
+WORDS = (
+    "alpha", "project", "travel", "garden", "tax", "insurance", "school", "kitchen", "office",
+    "client", "summer", "design", "research", "family", "bank", "health", "car", "lease",
+)
+SENTENCES = (
+    "This document summarizes the quarterly results for the {word} team.",
+    "The meeting covered the {word} roadmap and the next steps for {word2}.",
+    "Attached you will find the notes from our discussion about {word}.",
+    "The {word} budget increased compared to last year, mostly because of {word2}.",
+    "Background reading on {word} and {word2} for the upcoming workshop.",
+    "Please review the attached {word} proposal and send feedback by Friday.",
+    "Invoice number {n}. Amount due: {amount} EUR. Payment due {year}-{month:02d}-{day:02d}.",
+    "Please sign the {word} agreement below and return it to the office.",
+    "Thank you for your payment. This is your receipt for order {n}.",
+    "Let me know if the {word} schedule works for you.",
+    "Please complete the {word} application form and fill out every section.",
+    "Chapter {n}: an introduction to {word} and its history.",
+)
+
+
+def _fields(rng):
+    return {
+        "year": rng.randint(2019, 2025), "month": rng.randint(1, 12), "day": rng.randint(1, 28),
+        "quarter": rng.randint(1, 4), "n": rng.randint(1, 99999), "version": rng.randint(1, 9),
+        "word": rng.choice(WORDS), "word2": rng.choice(WORDS), "amount": rng.randint(10, 5000),
+    }
+
+
+def document_text(rng, sentences: int = 12) -> list:
+    """Return a list of lines of plausible document text."""
+    return [rng.choice(SENTENCES).format(**_fields(rng)) for _ in range(sentences)]
+
+
+def _pdf_escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def pdf_bytes(lines: list) -> bytes:
+    """Build a minimal one-page PDF with the lines as extractable text."""
+    content = "BT /F1 11 Tf 14 TL 72 760 Td " + " ".join(f"({_pdf_escape(l)}) '" for l in lines) + " ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        "/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        f"<< /Length {len(content)} >>\nstream\n{content}\nendstream",
+    ]
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("ascii")
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("ascii")
+    out += (f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+            f"startxref\n{xref}\n%%EOF\n").encode("ascii")
+    return bytes(out)
+
+
+def docx_bytes(lines: list) -> bytes:
+    """Build a minimal DOCX (Office Open XML) file with one paragraph per line."""
+    from io import BytesIO
+    from xml.sax.saxutils import escape
+
+    w = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+    body = "".join(f"<w:p><w:r><w:t>{escape(line)}</w:t></w:r></w:p>" for line in lines)
+    files = {
+        "[Content_Types].xml": (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/word/document.xml" ContentType="application/'
+            'vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/></Types>'),
+        "_rels/.rels": (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+            'relationships/officeDocument" Target="word/document.xml"/></Relationships>'),
+        "word/document.xml": (
+            f'<?xml version="1.0" encoding="UTF-8"?><w:document xmlns:w="{w}"><w:body>{body}'
+            '</w:body></w:document>'),
+    }
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in files.items():
+            # Fixed timestamps keep the bytes identical across runs.
+            archive.writestr(zipfile.ZipInfo(name, date_time=(2020, 1, 1, 0, 0, 0)), data)
+    return buffer.getvalue()
+
+
+def default_base_dir() -> str:
+    """Prefer a tmpfs (/dev/shm) so disk speed does not dominate the numbers."""
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        return "/dev/shm"
+    return tempfile.gettempdir()
+
+
+def generate_tree(root: str, files: int = 1000, depth: int = 2, seed: int = 0) -> dict:
+    """
+    Create a synthetic tree of `files` files under `root`.
+
+    Files are spread over the top level and subfolders up to `depth` levels
+    deep. File modification times are fixed per file, so timeline buckets are
+    stable too.
+
+    Args:
+        root (str): Directory to fill (created if missing).
+        files (int, optional): Number of files.
+        depth (int, optional): Maximum folder depth below root.
+        seed (int, optional): Seed of the generator.
+
+    Returns:
+        dict: Summary with file count, total bytes, per-extension counts and a
+            fingerprint of the tree (identical for identical parameters).
+    """
+    rng = random.Random(seed)
+    extensions = [ext for ext, _ in EXTENSION_MIX]
+    weights = [share for _, share in EXTENSION_MIX]
+    # Two new folders per level, each inside a folder of the level above.
+    folders = [root]
+    parents = [root]
+    for level in range(depth):
+        parents = [os.path.join(rng.choice(parents), f"{rng.choice(WORDS)}_{level}{i}") for i in range(2)]
+        folders.extend(parents)
+    for folder in folders:
+        os.makedirs(folder, exist_ok=True)
+
+    fingerprint = hashlib.blake2b(digest_size=8)
+    summary = {"files": 0, "bytes": 0, "extensions": {}}
+    used = set()
+    for i in range(files):
+        ext = rng.choices(extensions, weights)[0]
+        # About half of the files sit at the top level.
+        folder = root if rng.random() < 0.5 else rng.choice(folders)
+        stem = rng.choice(NAME_PATTERNS).format(**_fields(rng))
+        name = f"{stem}{ext}"
+        copy = 1
+        while os.path.join(folder, name) in used:
+            copy += 1
+            name = f"{stem} ({copy}){ext}"
+        path = os.path.join(folder, name)
+        used.add(path)
+
+        if ext in DOCUMENT_EXTENSIONS:
+            lines = document_text(rng, rng.randint(4, 20))
+            if ext == ".pdf":
+                data = pdf_bytes(lines)
+            elif ext == ".docx":
+                data = docx_bytes(lines)
+            else:
+                data = ("\n".join(lines) + "\n").encode("utf-8")
+        else:
+            data = rng.randbytes(rng.randint(*BINARY_SIZE))
+        with open(path, "wb") as f:
+            f.write(data)
+        mtime = 1577836800 + rng.randint(0, 5 * 365 * 86400)
+        os.utime(path, (mtime, mtime))
+
+        fingerprint.update(os.path.relpath(path, root).encode("utf-8"))
+        fingerprint.update(hashlib.blake2b(data, digest_size=8).digest())
+        summary["files"] += 1
+        summary["bytes"] += len(data)
+        summary["extensions"][ext] = summary["extensions"].get(ext, 0) + 1
+    summary["fingerprint"] = fingerprint.hexdigest()
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory")
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    summary = generate_tree(args.directory, args.files, args.depth, args.seed)
+    print(f"{summary['files']} files, {summary['bytes']} bytes, fingerprint {summary['fingerprint']}")
+
+
+if __name__ == "__main__":
+    main()
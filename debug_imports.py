@@ -63,7 +63,7 @@ def main():
     try:
         # Try direct import
         print("Trying direct import...")
-        from neurotask.file_manager.mover import move_file as move_file1
+        from neurotask.file_manager.mover import BatchMover as BatchMover1
         print("✅ Direct import successful!")
     except ImportError as e:
         print(f"❌ Direct import failed: {e}")
@@ -73,13 +73,13 @@ def main():
         print("\nTrying import after adding neurotask to path...")
         sys.path.insert(0, os.path.join(project_root, "neurotask"))
         print(f"Updated Python path: {sys.path[0]}")
-        from file_manager.mover import move_file as move_file2
+        from file_manager.mover import BatchMover as BatchMover2
         print("✅ Path-based import successful!")
     except ImportError as e:
         print(f"❌ Path-based import failed: {e}")
 
-    # Try running the move_file function with a test file
-    print("\n----- Testing move_file function -----")
+    # Try moving a test file with BatchMover
+    print("\n----- Testing BatchMover -----")
     try:
         # Create a test file
         test_file = os.path.join(project_root, "test_file.txt")
@@ -91,17 +91,18 @@ def main():
         check_file_existence(test_file)
         check_file_existence(test_dir)
         
-        # Import and run move_file
+        # Move it with BatchMover
         print(f"Attempting to move {test_file} to {test_dir}")
-        result = move_file2(test_file, test_dir)
-        print(f"move_file result: {result}")
+        with BatchMover2() as mover:
+            result = mover.move(test_file, os.path.join(test_dir, "test_file.txt"))
+        print(f"BatchMover.move result: {result}")
         
         # Check results
         check_file_existence(test_file)
         check_file_existence(test_dir)
         check_file_existence(os.path.join(test_dir, "test_file.txt"))
     except Exception as e:
-        print(f"❗ Error testing move_file: {e}")
+        print(f"❗ Error testing BatchMover: {e}")
         traceback.print_exc()
 
 if __name__ == "__main__":
@@ -0,0 +1,152 @@
+# file_manager/dedup.py
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+from neurotask.file_manager.scanner import ScanEntry
+from neurotask.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Bytes hashed from each end of a file by partial_hash.
+PARTIAL_BYTES = 64 * 1024
+# Read size for full hashes.
+HASH_CHUNK_SIZE = 1 << 20
+DEFAULT_WORKERS = 4
+
+
+def partial_hash(path: str, size: int) -> str:
+    """
+    Hash the first and last PARTIAL_BYTES of a file (the whole file if it is
+    shorter than both together).
+
+    Args:
+        path (str): The file path.
+        size (int): The file size in bytes.
+
+    Returns:
+        str: Hex digest.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        if size <= 2 * PARTIAL_BYTES:
+            digest.update(f.read())
+        else:
+            digest.update(f.read(PARTIAL_BYTES))
+            f.seek(-PARTIAL_BYTES, os.SEEK_END)
+            digest.update(f.read(PARTIAL_BYTES))
+    return digest.hexdigest()
+
+
+def full_hash(path: str) -> str:
+    """
+    Hash a whole file, streaming it in HASH_CHUNK_SIZE pieces.
+
+    Args:
+        path (str): The file path.
+
+    Returns:
+        str: Hex digest.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _refine(groups, key, pool):
+    # Split every group by `key`, keeping only sub-groups that still have
+    # more than one member. Files that cannot be read drop out.
+    def safe_key(entry):
+        try:
+            return key(entry)
+        except OSError as e:
+            logger.warning("[Dedup] Could not read %s: %s", entry.path, e)
+            return None
+
+    refined = []
+    for group, keys in zip(groups, [pool.map(safe_key, group) for group in groups]):
+        by_key = {}
+        for entry, k in zip(group, keys):
+            if k is not None:
+                by_key.setdefault(k, []).append(entry)
+        refined.extend(g for g in by_key.values() if len(g) > 1)
+    return refined
+
+
+def find_duplicates(entries, workers: int = DEFAULT_WORKERS) -> Tuple[List[ScanEntry], Dict[str, List[ScanEntry]]]:
+    """
+    Find byte-identical files among `entries`.
+
+    Candidates are narrowed down in stages so that most files are never read:
+    files are grouped by size, then by a hash of their first and last 64 KB,
+    and only files that still collide are hashed in full. Empty files are
+    never treated as duplicates.
+
+    In each group of identical files, the oldest file is kept as the first
+    copy. Ties go to the shortest name, so "report.pdf" wins over "report (1).pdf".
+
+    Args:
+        entries (iterable): ScanEntry objects.
+        workers (int, optional): Number of threads reading files.
+
+    Returns:
+        tuple: (entries without the duplicates, {first copy path: [duplicate entries]}).
+    """
+    entries = list(entries)
+    by_size = {}
+    for entry in entries:
+        if entry.size > 0:
+            by_size.setdefault(entry.size, []).append(entry)
+    groups = [group for group in by_size.values() if len(group) > 1]
+    if not groups:
+        return entries, {}
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        groups = _refine(groups, lambda e: partial_hash(e.path, e.size), pool)
+        # Files up to 2 * PARTIAL_BYTES were hashed completely already.
+        small = [g for g in groups if g[0].size <= 2 * PARTIAL_BYTES]
+        large = [g for g in groups if g[0].size > 2 * PARTIAL_BYTES]
+        groups = small + _refine(large, lambda e: full_hash(e.path), pool)
+
+    duplicates = {}
+    duplicate_paths = set()
+    for group in groups:
+        group.sort(key=lambda e: (e.mtime, len(e.name), e.path))
+        duplicates[group[0].path] = group[1:]
+        duplicate_paths.update(e.path for e in group[1:])
+    unique = [entry for entry in entries if entry.path not in duplicate_paths]
+    return unique, duplicates
+
+
+def link_duplicates(duplicates: Dict[str, List[ScanEntry]]) -> int:
+    """
+    Replace every duplicate with a hard link to its first copy, so identical
+    content is stored once. Must run before the first copies are moved.
+
+    Undo (`--undo`) moves the links back but does not turn them into separate
+    copies again; their content is identical either way.
+
+    Args:
+        duplicates (dict): {first copy path: [duplicate entries]}, from find_duplicates.
+
+    Returns:
+        int: Number of duplicates replaced.
+    """
+    linked = 0
+    for original, copies in duplicates.items():
+        for entry in copies:
+            tmp_path = f"{entry.path}.neurotask-link"
+            try:
+                os.link(original, tmp_path)
+                os.replace(tmp_path, entry.path)
+                linked += 1
+            except OSError as e:
+                # E.g. a file system without hard links; the copy stays as it is.
+                logger.warning("[Dedup] Could not hard link %s: %s", entry.path, e)
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+    return linked
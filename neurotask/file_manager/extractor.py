@@ -0,0 +1,281 @@
+# file_manager/extractor.py
+import os
+import signal
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, InvalidStateError, wait
+from typing import Iterable, Iterator, NamedTuple
+from neurotask.file_manager.reader import read_first_page
+from neurotask.utils import instrumentation
+
+# Seconds one file may spend in a parser before it is given up on.
+DEFAULT_TIMEOUT = 30
+# Files larger than this are not parsed at all.
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+# A file still unfinished this many timeouts after a worker picked it up is
+# reported as timed out by the parent (the worker-side SIGALRM should fire
+# long before; this covers platforms without it).
+DEADLINE_FACTOR = 2
+
+
+class ExtractionResult(NamedTuple):
+    """Text extracted from one file; `error` is None on success."""
+    path: str
+    text: str
+    error: str = None
+    # Time the worker spent on the file.
+    seconds: float = 0.0
+
+
+class _ExtractionTimeout(BaseException):
+    # BaseException so the readers' `except Exception` blocks cannot swallow it.
+    pass
+
+
+def _on_alarm(signum, frame):
+    raise _ExtractionTimeout()
+
+
+def _extract(path: str, timeout: float, max_bytes: int, budgets: dict = None) -> ExtractionResult:
+    """Worker-side extraction, timed for instrumentation (see _extract_file)."""
+    start = time.perf_counter()
+    result = _extract_file(path, timeout, max_bytes, budgets)
+    return result._replace(seconds=time.perf_counter() - start)
+
+
+def _report_pid(pids):
+    # Pool initializer: tell the parent which process this worker is, so a
+    # worker stuck in a parser can be killed (the executor has no public API for it).
+    pids.put(os.getpid())
+
+
+def _terminate_workers(pids):
+    # Kill every worker that reported its pid to the `pids` queue.
+    while not pids.empty():
+        try:
+            os.kill(pids.get(), signal.SIGTERM)
+        except OSError:
+            pass
+
+
+def _record_extraction(future: Future):
+    # Runs in the parent, where the instrumentation data is collected.
+    if future.cancelled() or future.exception() is not None:
+        return
+    result = future.result()
+    instrumentation.record("extract", result.seconds)
+    instrumentation.count("files_extracted")
+    instrumentation.count("chars_extracted", len(result.text))
+
+
+def _extract_file(path: str, timeout: float, max_bytes: int, budgets: dict = None) -> ExtractionResult:
+    """Worker-side extraction with a size cap and a SIGALRM-based timeout."""
+    try:
+        if max_bytes and os.path.getsize(path) > max_bytes:
+            return ExtractionResult(path, "", f"larger than {max_bytes} bytes")
+    except OSError as e:
+        return ExtractionResult(path, "", str(e))
+
+    use_alarm = bool(timeout) and hasattr(signal, "SIGALRM")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return ExtractionResult(path, read_first_page(path, budgets) or "")
+    except _ExtractionTimeout:
+        return ExtractionResult(path, "", f"timed out after {timeout}s")
+    except Exception as e:
+        return ExtractionResult(path, "", str(e))
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+class ExtractionService:
+    """
+    Runs read_first_page on a pool of worker processes.
+
+    PDF and DOCX parsing is CPU-bound and holds the GIL, so extraction is
+    spread over processes rather than threads. Each file gets a size cap and a
+    timeout, enforced inside the worker via SIGALRM where available. As a
+    backstop, a watchdog thread in the parent gives each file a deadline of
+    DEADLINE_FACTOR timeouts from when a worker took it. When a file
+    overruns it, the pool is replaced (its workers may be stuck in a parser),
+    the other unfinished files are resubmitted, and an overdue file is retried
+    once before it is reported as timed out. A single pathological document
+    therefore cannot stall a run on any platform. `budgets` caps the snippet
+    length per extension (see reader.DEFAULT_BUDGETS).
+    """
+
+    def __init__(self, workers: int = None, timeout: float = DEFAULT_TIMEOUT,
+                 max_bytes: int = DEFAULT_MAX_BYTES, budgets: dict = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.budgets = budgets
+        self._pool = None
+        # Queue the current pool's workers report their pids to (see _report_pid).
+        self._pids = None
+        self._lock = threading.RLock()
+        # Worker future -> [future returned by submit, path, start time or None, retried].
+        self._watched = {}
+        # Worker futures of replaced pools, whose outcome is ignored.
+        self._superseded = set()
+        self._watchdog = None
+        self._stop = threading.Event()
+
+    def _dispatch(self, path: str, target: Future, retried: bool = False):
+        with self._lock:
+            if self._pool is None:
+                # Importing ProcessPoolExecutor loads multiprocessing; defer it to first use.
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+                context = multiprocessing.get_context()
+                self._pids = context.SimpleQueue()
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                                 initializer=_report_pid, initargs=(self._pids,))
+            source = self._pool.submit(_extract, path, self.timeout, self.max_bytes, self.budgets)
+            if instrumentation.is_enabled():
+                source.add_done_callback(_record_extraction)
+            if target is None:
+                return source
+            self._watched[source] = [target, path, None, retried]
+            if self._watchdog is None:
+                self._stop.clear()
+                self._watchdog = threading.Thread(target=self._sweep_deadlines, daemon=True,
+                                                  name="extraction-deadlines")
+                self._watchdog.start()
+        source.add_done_callback(lambda done: self._relay(done, target))
+        return target
+
+    def _relay(self, source: Future, target: Future):
+        # Copy a worker future's outcome to the future handed out by submit().
+        with self._lock:
+            if source in self._superseded:
+                self._superseded.discard(source)
+                return
+            self._watched.pop(source, None)
+        try:
+            if source.cancelled():
+                target.set_exception(RuntimeError("extraction cancelled"))
+            elif source.exception() is not None:
+                target.set_exception(source.exception())
+            else:
+                target.set_result(source.result())
+        except InvalidStateError:
+            pass
+
+    def _sweep_deadlines(self):
+        interval = min(1.0, self.timeout / 4)
+        limit = self.timeout * DEADLINE_FACTOR
+        while not self._stop.wait(interval):
+            now = time.monotonic()
+            with self._lock:
+                overdue = False
+                # The pool dispatches in submission order and marks a few more
+                # files running than it has workers; only the oldest `workers`
+                # running files can actually be in a parser, so only their
+                # clocks run.
+                executing = 0
+                for source, watch in self._watched.items():
+                    if executing >= self.workers:
+                        break
+                    if not source.running():
+                        continue
+                    executing += 1
+                    if watch[2] is None:
+                        watch[2] = now
+                    elif now - watch[2] > limit:
+                        overdue = True
+                if overdue:
+                    self._replace_pool(now, limit)
+
+    def _replace_pool(self, now: float, limit: float):
+        # Called with the lock held: drop the (possibly stuck) pool and move
+        # its unfinished files to a fresh one.
+        watched, self._watched = self._watched, {}
+        pool, self._pool = self._pool, None
+        self._superseded.update(watched)
+        _terminate_workers(self._pids)
+        pool.shutdown(wait=False, cancel_futures=True)
+        for target, path, started, retried in watched.values():
+            is_overdue = started is not None and now - started > limit
+            if is_overdue and retried:
+                try:
+                    target.set_result(ExtractionResult(path, "", f"timed out after {self.timeout}s"))
+                except InvalidStateError:
+                    pass
+            else:
+                self._dispatch(path, target, retried or is_overdue)
+
+    def submit(self, path: str) -> Future:
+        """
+        Schedule extraction of one file.
+
+        Args:
+            path (str): The file to read.
+
+        Returns:
+            Future: Resolves to an ExtractionResult, a timed-out one if the file
+                overruns its deadline.
+        """
+        if not self.timeout:
+            return self._dispatch(path, None)
+        target = Future()
+        target.set_running_or_notify_cancel()
+        return self._dispatch(path, target)
+
+    def extract_many(self, paths: Iterable[str]) -> Iterator[ExtractionResult]:
+        """
+        Extract text from many files, yielding results as they finish.
+
+        At most twice as many files as there are workers are in flight at once.
+        Files that overrun their deadline (see submit) are reported as timed out.
+
+        Args:
+            paths (iterable): Files to read.
+
+        Yields:
+            ExtractionResult: One result per file, in completion order.
+        """
+        paths = iter(paths)
+        in_flight = {}
+        while True:
+            while len(in_flight) < 2 * self.workers:
+                path = next(paths, None)
+                if path is None:
+                    break
+                in_flight[self.submit(path)] = path
+            if not in_flight:
+                return
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = in_flight.pop(future)
+                try:
+                    yield future.result()
+                except Exception as e:
+                    yield ExtractionResult(path, "", str(e))
+
+    def close(self):
+        """Shut the worker processes down, terminating any still busy with an unfinished file."""
+        if self._watchdog is not None:
+            self._stop.set()
+            self._watchdog.join()
+            self._watchdog = None
+        with self._lock:
+            pool, self._pool = self._pool, None
+            if pool is not None and any(not source.done() for source in self._watched):
+                _terminate_workers(self._pids)
+        if pool is not None:
+            # Outside the lock: the pool fails the killed workers' futures from
+            # its own thread, and _relay needs the lock to pass them on.
+            pool.shutdown(wait=True, cancel_futures=True)
+        with self._lock:
+            self._watched.clear()
+            self._superseded.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,166 @@
+# file_manager/index.py
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable, List
+from neurotask.file_manager.scanner import ScanEntry, state_dir
+
+INDEX_FILENAME = "index.sqlite"
+# Longest extracted snippet kept per file.
+MAX_SNIPPET_CHARS = 4096
+
+
+class FileIndex:
+    """
+    Per-directory SQLite index of files Neurotask has already seen.
+
+    Stored in `<directory>/.neurotask/index.sqlite`, keyed by the path
+    relative to the directory. Each row records size, mtime, the content
+    hash and extracted snippet, and the category the file was organized
+    into. Files handled by a completed (non dry-run) run are marked as
+    processed; as long as their size and mtime are unchanged they are not
+    read or classified again.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = os.path.abspath(directory)
+        self.path = os.path.join(state_dir(directory), INDEX_FILENAME)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " path TEXT PRIMARY KEY,"
+            " size INTEGER NOT NULL,"
+            " mtime REAL NOT NULL,"
+            " content_hash TEXT,"
+            " snippet TEXT,"
+            " category TEXT,"
+            " processed INTEGER NOT NULL DEFAULT 0,"
+            " updated REAL NOT NULL)"
+        )
+
+    def _key(self, path: str) -> str:
+        return os.path.relpath(os.path.abspath(path), self.directory)
+
+    def filter_changed(self, entries: Iterable[ScanEntry]) -> List[ScanEntry]:
+        """
+        Keep only entries that are new, changed, or not yet processed by a run.
+
+        Args:
+            entries (iterable): ScanEntry objects from the scanner.
+
+        Returns:
+            list: The entries that need processing.
+        """
+        with self._lock:
+            known = {path: (size, mtime) for path, size, mtime
+                     in self._conn.execute("SELECT path, size, mtime FROM files WHERE processed")}
+        return [entry for entry in entries
+                if known.get(self._key(entry.path)) != (entry.size, entry.mtime)]
+
+    def record_entries(self, entries: Iterable[ScanEntry]):
+        """
+        Record scanned files. Rows of files that changed lose their cached
+        content and category and are no longer considered processed.
+
+        Args:
+            entries (iterable): ScanEntry objects from the scanner.
+        """
+        now = time.time()
+        rows = [(self._key(e.path), e.size, e.mtime, now) for e in entries]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO files (path, size, mtime, updated) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT(path) DO UPDATE SET"
+                "  content_hash = CASE WHEN size = excluded.size AND mtime = excluded.mtime"
+                "                 THEN content_hash END,"
+                "  snippet = CASE WHEN size = excluded.size AND mtime = excluded.mtime"
+                "            THEN snippet END,"
+                "  category = CASE WHEN size = excluded.size AND mtime = excluded.mtime"
+                "             THEN category END,"
+                "  processed = CASE WHEN size = excluded.size AND mtime = excluded.mtime"
+                "              THEN processed ELSE 0 END,"
+                "  size = excluded.size, mtime = excluded.mtime, updated = excluded.updated",
+                rows,
+            )
+
+    def lookup_content(self, entry: ScanEntry):
+        """
+        Return the stored (content_hash, snippet) of an unchanged file.
+
+        Args:
+            entry (ScanEntry): The file.
+
+        Returns:
+            tuple or None: (content_hash, snippet), or None if unknown or changed.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_hash, snippet FROM files"
+                " WHERE path = ? AND size = ? AND mtime = ? AND snippet IS NOT NULL",
+                (self._key(entry.path), entry.size, entry.mtime),
+            ).fetchone()
+        return row
+
+    def record_content(self, path: str, content_hash: str, snippet: str):
+        """
+        Store the content hash and extracted snippet of a file.
+
+        Args:
+            path (str): Path to the file.
+            content_hash (str): Hash of the extracted text.
+            snippet (str): The extracted text.
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE files SET content_hash = ?, snippet = ?, updated = ? WHERE path = ?",
+                (content_hash, snippet[:MAX_SNIPPET_CHARS], time.time(), self._key(path)),
+            )
+
+    def record_move(self, source: str, destination: str, category: str = None):
+        """
+        Follow a file to its new location and remember its category.
+
+        Args:
+            source (str): The old path.
+            destination (str): The new path.
+            category (str, optional): The folder the file was organized into.
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM files WHERE path = ?", (self._key(destination),))
+            self._conn.execute(
+                "UPDATE files SET path = ?, category = ?, processed = 1, updated = ? WHERE path = ?",
+                (self._key(destination), category, time.time(), self._key(source)),
+            )
+
+    def mark_processed(self, paths: Iterable[str]):
+        """
+        Mark files as handled by a completed run, e.g. files left in place.
+
+        Args:
+            paths (iterable): Paths of the files.
+        """
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE files SET processed = 1 WHERE path = ?",
+                [(self._key(path),) for path in paths],
+            )
+
+    def commit(self):
+        """Write pending changes to disk."""
+        with self._lock:
+            self._conn.commit()
+
+    def close(self):
+        """Commit and close the index."""
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
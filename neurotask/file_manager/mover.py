@@ -1,47 +1,186 @@
 # file_manager/mover.py
+import errno
+import json
 import os
 import shutil
+from datetime import datetime
+from neurotask.utils import instrumentation
+from neurotask.utils.config import neurotask_home
+from neurotask.utils.logger import setup_logger
 
-def move_file(source_path: str, dest_folder: str, new_filename: str = None) -> bool:
+logger = setup_logger(__name__)
+
+# Chunk size used when a move has to copy data between filesystems.
+COPY_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+def new_run_id() -> str:
+    """Return a unique, sortable identifier for an organization run."""
+    return f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.urandom(2).hex()}"
+
+
+def journal_path(run_id: str) -> str:
+    """Return the path of the move journal for a run."""
+    return os.path.join(neurotask_home(), "runs", f"{run_id}.jsonl")
+
+
+def _copy_then_unlink(source_path: str, dest_path: str):
+    # Cross-device move: stream into a temporary file next to the destination,
+    # fsync it, atomically rename it into place and only then drop the source.
+    tmp_path = os.path.join(os.path.dirname(dest_path), f".{os.path.basename(dest_path)}.neurotask-tmp")
+    try:
+        with open(source_path, "rb") as src, open(tmp_path, "wb") as dst:
+            shutil.copyfileobj(src, dst, COPY_CHUNK_SIZE)
+            dst.flush()
+            os.fsync(dst.fileno())
+        shutil.copystat(source_path, tmp_path)
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    os.unlink(source_path)
+
+
+class BatchMover:
     """
-    Move a file to a destination folder, optionally with a new filename.
-    Creates the destination folder if it doesn't exist.
-    
-    Args:
-        source_path (str): Path to the source file
-        dest_folder (str): Path to the destination folder
-        new_filename (str, optional): New name for the file. If None, keeps original name.
-        
-    Returns:
-        bool: True if successful, False otherwise
+    Moves many files with as few syscalls as possible and journals every step.
+
+    Destination folders are created once and remembered. Files are moved with
+    an atomic os.rename when source and destination share a device, falling
+    back to a streamed copy + fsync + unlink otherwise. Each completed move
+    and created folder is appended to `~/.neurotask/runs/<run_id>.jsonl`, so
+    the run can be rolled back with undo_run. Move entries record the
+    moved file's size and mtime so undo can tell whether it changed since.
+
+    Destinations are expected to be collision-free (see
+    organizer.plan.resolve_collisions); existing files are not checked for.
     """
-    try:
-        print(f"[DEBUG] Moving file: {source_path}")
-        print(f"[DEBUG] Destination folder: {dest_folder}")
-        
-        # Check if source file exists
-        if not os.path.exists(source_path):
-            print(f"[DEBUG] Source file does not exist: {source_path}")
+
+    def __init__(self, run_id: str = None):
+        self.run_id = run_id or new_run_id()
+        self.journal_path = journal_path(self.run_id)
+        self._known_folders = set()
+        self._journal = None
+
+    def _record(self, **event):
+        if self._journal is None:
+            os.makedirs(os.path.dirname(self.journal_path), exist_ok=True)
+            self._journal = open(self.journal_path, "a", encoding="utf-8")
+        self._journal.write(json.dumps(event) + "\n")
+        # Flushed per entry so a crash mid-run still leaves an undoable journal.
+        self._journal.flush()
+
+    def ensure_folder(self, folder: str):
+        """
+        Create a destination folder (and missing parents) once per run.
+
+        Args:
+            folder (str): The folder to create.
+        """
+        if folder in self._known_folders:
+            return
+        missing = []
+        current = os.path.abspath(folder)
+        while not os.path.isdir(current):
+            missing.append(current)
+            current = os.path.dirname(current)
+        for path in reversed(missing):
+            os.mkdir(path)
+            self._record(op="mkdir", path=path)
+        self._known_folders.add(folder)
+
+    @instrumentation.timed("move")
+    def move(self, source_path: str, dest_path: str) -> bool:
+        """
+        Move one file.
+
+        Args:
+            source_path (str): Path to the source file.
+            dest_path (str): Full destination path.
+
+        Returns:
+            bool: True if successful, False otherwise.
+        """
+        try:
+            self.ensure_folder(os.path.dirname(dest_path))
+            try:
+                os.rename(source_path, dest_path)
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+                _copy_then_unlink(source_path, dest_path)
+            st = os.stat(dest_path)
+            self._record(op="move", src=os.path.abspath(source_path), dst=os.path.abspath(dest_path),
+                         size=st.st_size, mtime_ns=st.st_mtime_ns)
+            return True
+        except Exception as e:
+            logger.error("Error moving file %s: %s", source_path, e)
             return False
-            
-        # Create destination folder if it doesn't exist
-        if not os.path.exists(dest_folder):
-            print(f"[DEBUG] Creating destination folder: {dest_folder}")
-            os.makedirs(dest_folder)
-            
-        # Get the destination path
-        if new_filename is None:
-            new_filename = os.path.basename(source_path)
-        dest_path = os.path.join(dest_folder, new_filename)
-        print(f"[DEBUG] Final destination path: {dest_path}")
-        
-        # Move the file
-        shutil.move(source_path, dest_path)
-        print(f"[DEBUG] File successfully moved")
+
+    def close(self):
+        """Flush and close the journal."""
+        if self._journal is not None:
+            os.fsync(self._journal.fileno())
+            self._journal.close()
+            self._journal = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _changed_since_move(event: dict) -> bool:
+    # True if the moved file is gone or no longer matches the journal entry.
+    try:
+        st = os.stat(event["dst"])
+    except OSError:
         return True
-        
-    except Exception as e:
-        print(f"[DEBUG] Error details: {str(e)}")
-        print(f"Error moving file {source_path}: {str(e)}")
+    # Journals written before size/mtime were recorded only have the paths.
+    if "size" not in event:
         return False
+    return st.st_size != event["size"] or st.st_mtime_ns != event["mtime_ns"]
+
+
+def undo_run(run_id: str) -> dict:
+    """
+    Roll back an organization run using its journal.
+
+    Moves are undone newest first; folders the run created are removed again
+    if they are empty. Files whose size or mtime differs from the journal
+    (changed or replaced since the run), and files whose original path is
+    taken again, are left alone.
+
+    Args:
+        run_id (str): The identifier printed when the run was applied.
+
+    Returns:
+        dict: Counts of restored, skipped and failed files.
+    """
+    path = journal_path(run_id)
+    with open(path, "r", encoding="utf-8") as f:
+        events = [json.loads(line) for line in f if line.strip()]
 
+    summary = {"restored": 0, "skipped": 0, "failed": 0}
+    # The undo itself is journaled too, so it can be undone if needed.
+    with BatchMover(run_id=f"{run_id}-undo") as mover:
+        for event in reversed(events):
+            if event["op"] == "move":
+                if _changed_since_move(event) or os.path.lexists(event["src"]):
+                    logger.debug("[Undo] Skipping %s", event["dst"])
+                    summary["skipped"] += 1
+                elif mover.move(event["dst"], event["src"]):
+                    summary["restored"] += 1
+                else:
+                    summary["failed"] += 1
+            elif event["op"] == "mkdir":
+                try:
+                    os.rmdir(event["path"])
+                except OSError:
+                    pass
+    os.replace(path, path + ".undone")
+    logger.info("[Undo] Restored %d files, skipped %d, %d failed",
+                summary["restored"], summary["skipped"], summary["failed"])
+    return summary
@@ -1,41 +1,220 @@
 # file_manager/reader.py
+import mmap
 import os
-from PyPDF2 import PdfReader
-from docx import Document
+import struct
+import zipfile
+import xml.etree.ElementTree as ET
+from neurotask.utils.logger import setup_logger
 
-def read_first_page(path):
+logger = setup_logger(__name__)
+
+# Maximum number of characters extracted per format. Override per call with
+# `budgets` (e.g. from the "snippet_budgets" key in config.json).
+DEFAULT_BUDGETS = {
+    ".pdf": 4096,
+    ".docx": 4096,
+    ".txt": 2048,
+}
+# Paragraphs collected from a DOCX file before stopping.
+DOCX_MAX_PARAGRAPHS = 10
+# Decompressed bytes of word/document.xml parsed before giving up.
+DOCX_MAX_XML_BYTES = 16 * 1024 * 1024
+DOCX_CHUNK_SIZE = 64 * 1024
+# Nesting limit when walking a PDF page tree down to its first page.
+PDF_MAX_TREE_DEPTH = 32
+# Page attributes that page-tree nodes pass down to their pages.
+PDF_INHERITED_KEYS = ("/Resources", "/MediaBox", "/CropBox", "/Rotate")
+
+# Files read_exif_date looks into, and how much of their start it reads.
+EXIF_EXTENSIONS = {".jpg", ".jpeg", ".tif", ".tiff"}
+EXIF_SCAN_BYTES = 128 * 1024
+# DateTimeOriginal, DateTimeDigitized, DateTime, in order of preference.
+_EXIF_DATE_TAGS = (0x9003, 0x9004, 0x0132)
+_EXIF_IFD_POINTER = 0x8769
+
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+def read_first_page(path, budgets=None):
+    """
+    Extract a short text snippet from the start of a document.
+
+    Args:
+        path (str): Path to the file.
+        budgets (dict, optional): Maximum characters per extension (".pdf",
+            ".docx", ".txt"), overriding DEFAULT_BUDGETS.
+
+    Returns:
+        str: The extracted text, or "" for unsupported or unreadable files.
+    """
     ext = os.path.splitext(path)[1].lower()
+    max_chars = (budgets or {}).get(ext) or DEFAULT_BUDGETS.get(ext)
 
     if ext == ".pdf":
-        return read_pdf(path)
+        return read_pdf(path, max_chars)
     elif ext == ".docx":
-        return read_docx(path)
+        return read_docx(path, max_chars)
     elif ext == ".txt":
-        return read_txt(path)
+        return read_txt(path, max_chars)
     else:
         return ""
 
-def read_pdf(path):
+
+def _first_pdf_page(reader):
+    # reader.pages flattens the whole page tree; walk down the first branch only.
+    from PyPDF2 import PageObject
+    from PyPDF2.generic import NameObject
+
+    node = reader.trailer["/Root"]["/Pages"].get_object()
+    reference = None
+    inherited = {}
+    for _ in range(PDF_MAX_TREE_DEPTH):
+        if "/Kids" not in node:
+            break
+        for key in PDF_INHERITED_KEYS:
+            if key in node:
+                inherited[key] = node[key]
+        kids = node["/Kids"]
+        if not kids:
+            return None
+        reference = kids[0]
+        node = reference.get_object()
+    else:
+        return None
+    if reference is None:
+        return None
+    page = PageObject(reader, reference)
+    page.update(node)
+    for key, value in inherited.items():
+        page.setdefault(NameObject(key), value)
+    return page
+
+
+def read_pdf(path, max_chars=DEFAULT_BUDGETS[".pdf"]):
     try:
-        reader = PdfReader(path)
-        if reader.pages:
-            return reader.pages[0].extract_text()
+        from PyPDF2 import PdfReader
+
+        # Passing a path makes PdfReader load the whole file into memory; with an
+        # open file it seeks and only parses the objects the first page needs.
+        with open(path, "rb") as f:
+            reader = PdfReader(f)
+            page = _first_pdf_page(reader)
+            if page is not None:
+                return (page.extract_text() or "")[:max_chars]
     except Exception as e:
-        print(f"PDF read error: {e}")
+        logger.warning("PDF read error in %s: %s", path, e)
     return ""
 
-def read_docx(path):
+
+def read_docx(path, max_chars=DEFAULT_BUDGETS[".docx"]):
     try:
-        doc = Document(path)
-        return "\n".join([p.text for p in doc.paragraphs[:10]])
+        paragraphs = []
+        current = []
+        length = 0
+        parser = ET.XMLPullParser(events=("end",))
+        with zipfile.ZipFile(path) as archive, archive.open("word/document.xml") as xml:
+            consumed = 0
+            while length < max_chars and len(paragraphs) < DOCX_MAX_PARAGRAPHS:
+                chunk = xml.read(DOCX_CHUNK_SIZE)
+                if not chunk or consumed >= DOCX_MAX_XML_BYTES:
+                    break
+                consumed += len(chunk)
+                parser.feed(chunk)
+                for _, element in parser.read_events():
+                    if element.tag == _W_NS + "t":
+                        current.append(element.text or "")
+                        length += len(element.text or "")
+                    elif element.tag == _W_NS + "p":
+                        paragraphs.append("".join(current))
+                        current = []
+                        length += 1
+                        # Drop the paragraph's subtree so memory stays flat.
+                        element.clear()
+                        if length >= max_chars or len(paragraphs) >= DOCX_MAX_PARAGRAPHS:
+                            break
+        return "\n".join(paragraphs)[:max_chars]
     except Exception as e:
-        print(f"DOCX read error: {e}")
+        logger.warning("DOCX read error in %s: %s", path, e)
     return ""
 
-def read_txt(path):
+
+def read_txt(path, max_chars=DEFAULT_BUDGETS[".txt"]):
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return f.read(2048)
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return ""
+            # A UTF-8 character is at most 4 bytes; only that prefix is paged in.
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                data = view[:min(size, max_chars * 4)]
+        return data.decode("utf-8", errors="ignore")[:max_chars]
     except Exception as e:
-        print(f"TXT read error: {e}")
+        logger.warning("TXT read error in %s: %s", path, e)
     return ""
+
+
+def _tiff_tags(tiff, order, offset, tags):
+    # Collect {tag: (type, count, value or offset)} from one IFD.
+    (count,) = struct.unpack_from(order + "H", tiff, offset)
+    for i in range(count):
+        tag, kind, n, value = struct.unpack_from(order + "HHII", tiff, offset + 2 + 12 * i)
+        tags[tag] = (kind, n, value)
+
+
+def read_exif_date(path):
+    """
+    Read the capture date from a JPEG or TIFF file's EXIF metadata.
+
+    Only the first EXIF_SCAN_BYTES of the file are read; no image library is
+    needed.
+
+    Args:
+        path (str): Path to the image.
+
+    Returns:
+        datetime.datetime or None: The (local, naive) date the picture was
+            taken, or None if the file has no usable EXIF date.
+    """
+    from datetime import datetime
+
+    try:
+        with open(path, "rb") as f:
+            head = f.read(EXIF_SCAN_BYTES)
+    except OSError as e:
+        logger.debug("EXIF read error in %s: %s", path, e)
+        return None
+    tiff = None
+    if head[:2] == b"\xff\xd8":
+        # Walk the JPEG segments up to the APP1 segment holding the EXIF data.
+        pos = 2
+        while pos + 4 <= len(head) and head[pos] == 0xFF:
+            marker = head[pos + 1]
+            if marker in (0xD9, 0xDA):  # end of image, start of scan
+                break
+            length = int.from_bytes(head[pos + 2:pos + 4], "big")
+            if marker == 0xE1 and head[pos + 4:pos + 10] == b"Exif\0\0":
+                tiff = head[pos + 10:pos + 2 + length]
+                break
+            pos += 2 + length
+    elif head[:4] in (b"II*\0", b"MM\0*"):
+        tiff = head
+    if not tiff:
+        return None
+    try:
+        order = "<" if tiff[:2] == b"II" else ">"
+        tags = {}
+        _tiff_tags(tiff, order, struct.unpack_from(order + "I", tiff, 4)[0], tags)
+        if _EXIF_IFD_POINTER in tags:
+            _tiff_tags(tiff, order, tags[_EXIF_IFD_POINTER][2], tags)
+    except struct.error:
+        return None
+    for tag in _EXIF_DATE_TAGS:
+        kind, count, offset = tags.get(tag, (None, 0, 0))
+        # ASCII "YYYY:MM:DD HH:MM:SS" plus a NUL, stored at `offset`.
+        if kind != 2 or count < 20:
+            continue
+        try:
+            return datetime.strptime(tiff[offset:offset + 19].decode("ascii"), "%Y:%m:%d %H:%M:%S")
+        except (UnicodeDecodeError, ValueError):
+            continue
+    return None
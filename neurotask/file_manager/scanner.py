@@ -0,0 +1,252 @@
+# file_manager/scanner.py
+import fnmatch
+import os
+import stat
+import struct
+import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Iterator, List, NamedTuple
+from neurotask.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Per-directory folder where Neurotask keeps its own state; never organized.
+STATE_DIR_NAME = ".neurotask"
+DEFAULT_WALK_WORKERS = 8
+# statx(2) constants (linux/stat.h) for reading birth times on Linux.
+_AT_FDCWD = -100
+_STATX_BTIME = 0x800
+_STATX_BUFFER_SIZE = 256
+_STATX_BTIME_OFFSET = 80
+
+# libc's statx function; False once it is known to be unavailable.
+_statx = None
+
+
+class ScanEntry(NamedTuple):
+    """A file found by the scanner, with the stat fields the organizers need."""
+    name: str
+    path: str
+    size: int
+    mtime: float
+    ctime: float
+    is_file: bool
+    # Creation time where stat() reports one (macOS, BSD, Windows); see birth_time().
+    birthtime: float = None
+
+
+def _to_entry(entry: os.DirEntry) -> ScanEntry:
+    # DirEntry caches its stat result, so every field comes from at most one
+    # syscall per entry (none at all on Windows, where scandir returns them).
+    st = entry.stat()
+    return ScanEntry(entry.name, entry.path, st.st_size, st.st_mtime, st.st_ctime, entry.is_file(),
+                     getattr(st, "st_birthtime", None))
+
+
+def stat_entry(path: str) -> ScanEntry:
+    """
+    Build the ScanEntry of a single file with one stat call.
+
+    Args:
+        path (str): Path of the file.
+
+    Returns:
+        ScanEntry: The entry, or None if the path is missing or not a regular file.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    if not stat.S_ISREG(st.st_mode):
+        return None
+    return ScanEntry(os.path.basename(path), path, st.st_size, st.st_mtime, st.st_ctime, True,
+                     getattr(st, "st_birthtime", None))
+
+
+def scan_directory(directory: str, files_only: bool = True) -> Iterator[ScanEntry]:
+    """
+    Scan a directory in a single pass using os.scandir.
+
+    Entries that vanish or cannot be stat'ed while scanning are skipped.
+
+    Args:
+        directory (str): The directory to scan.
+        files_only (bool, optional): Yield only regular files (default) or every entry.
+
+    Yields:
+        ScanEntry: One entry per file in the directory.
+    """
+    with os.scandir(directory) as it:
+        for entry in it:
+            try:
+                # is_file() is answered from the directory listing itself.
+                if files_only and not entry.is_file():
+                    continue
+                yield _to_entry(entry)
+            except OSError:
+                continue
+
+
+def _load_statx():
+    global _statx
+    _statx = False
+    try:
+        import ctypes
+        func = ctypes.CDLL(None, use_errno=True).statx
+    except (OSError, AttributeError):
+        return
+    func.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_uint, ctypes.c_char_p)
+    func.restype = ctypes.c_int
+    _statx = (func, ctypes.create_string_buffer)
+
+
+def birth_time(entry: ScanEntry):
+    """
+    Return the creation time of a scanned file, or None if it is not recorded.
+
+    Uses the birth time stat() reported during the scan where there is one. On
+    Linux, where stat() has none (st_ctime is the inode change time there), it
+    asks statx(2), which file systems like ext4, XFS and btrfs answer.
+
+    Args:
+        entry (ScanEntry): The file.
+
+    Returns:
+        float or None: POSIX timestamp of the file's creation.
+    """
+    if entry.birthtime is not None:
+        return entry.birthtime
+    if not sys.platform.startswith("linux"):
+        return None
+    if _statx is None:
+        _load_statx()
+    if not _statx:
+        return None
+    func, create_buffer = _statx
+    buffer = create_buffer(_STATX_BUFFER_SIZE)
+    if func(_AT_FDCWD, os.fsencode(entry.path), 0, _STATX_BTIME, buffer) != 0:
+        return None
+    mask = int.from_bytes(buffer.raw[:4], sys.byteorder)
+    if not mask & _STATX_BTIME:
+        return None
+    seconds, nanoseconds = struct.unpack_from("=qI", buffer.raw, _STATX_BTIME_OFFSET)
+    return seconds + nanoseconds / 1e9
+
+
+def state_dir(directory: str) -> str:
+    """
+    Return (and create) the Neurotask state folder inside a directory.
+
+    Args:
+        directory (str): The organized directory.
+
+    Returns:
+        str: Path to the `.neurotask` folder.
+    """
+    path = os.path.join(directory, STATE_DIR_NAME)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def list_subdirectories(directory: str) -> List[str]:
+    """
+    Return the names of the subdirectories of a directory.
+
+    Args:
+        directory (str): The directory to scan.
+
+    Returns:
+        list: A list of folder names (strings).
+    """
+    with os.scandir(directory) as it:
+        return [entry.name for entry in it if entry.is_dir()]
+
+
+def _matches(patterns, name: str, rel_path: str) -> bool:
+    return any(fnmatch.fnmatch(name, p) or fnmatch.fnmatch(rel_path, p) for p in patterns)
+
+
+def is_selected(name: str, rel_path: str, include: List[str] = None, exclude: List[str] = None) -> bool:
+    """
+    Apply the include/exclude globs of walk_directory to one file.
+
+    Args:
+        name (str): The file name.
+        rel_path (str): Its path relative to the organized directory.
+        include (list, optional): Globs the name or path must match, if any are given.
+        exclude (list, optional): Globs for files to skip.
+
+    Returns:
+        bool: True if the file is to be organized.
+    """
+    if include and not _matches(include, name, rel_path):
+        return False
+    return not (exclude and _matches(exclude, name, rel_path))
+
+
+def _scan_level(directory: str):
+    files, subdirs = [], []
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry)
+                    elif entry.is_file():
+                        files.append(_to_entry(entry))
+                except OSError:
+                    continue
+    except OSError as e:
+        logger.warning("[Scanner] Could not scan %s: %s", directory, e)
+    return files, subdirs
+
+
+def walk_directory(directory: str, max_depth: int = None, include: List[str] = None,
+                   exclude: List[str] = None, prune: Callable[[str], bool] = None,
+                   workers: int = DEFAULT_WALK_WORKERS) -> Iterator[ScanEntry]:
+    """
+    Recursively scan a directory tree, listing subdirectories concurrently.
+
+    Directory enumeration is I/O-bound, so each directory is scanned on a
+    thread pool as soon as its parent has been listed. Symlinked directories
+    are not followed and Neurotask's own state folder is always skipped.
+
+    Args:
+        directory (str): The root directory to walk.
+        max_depth (int, optional): How many levels below the root to descend;
+            0 scans only the root. None means unlimited.
+        include (list, optional): Glob patterns a file name or path relative to
+            the root must match to be yielded.
+        exclude (list, optional): Glob patterns for files and folders to skip.
+        prune (callable, optional): Called with the name of each folder directly
+            under the root; folders for which it returns True are not entered.
+            Organizers use this to skip the category folders they create.
+        workers (int, optional): Number of threads listing directories.
+
+    Yields:
+        ScanEntry: One entry per file found.
+    """
+    include = include or []
+    exclude = exclude or []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        pending = {pool.submit(_scan_level, directory): 0}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                depth = pending.pop(future)
+                files, subdirs = future.result()
+                for entry in files:
+                    if (include or exclude) and not is_selected(
+                            entry.name, os.path.relpath(entry.path, directory), include, exclude):
+                        continue
+                    yield entry
+                if max_depth is not None and depth >= max_depth:
+                    continue
+                for subdir in subdirs:
+                    if subdir.name == STATE_DIR_NAME:
+                        continue
+                    if depth == 0 and prune is not None and prune(subdir.name):
+                        continue
+                    if exclude and _matches(exclude, subdir.name, os.path.relpath(subdir.path, directory)):
+                        continue
+                    pending[pool.submit(_scan_level, subdir.path)] = depth + 1
@@ -0,0 +1,201 @@
+# file_manager/watcher.py
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Callable, List
+from neurotask.file_manager.scanner import ScanEntry, is_selected, scan_directory, stat_entry
+from neurotask.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+DEFAULT_DEBOUNCE = 2.0
+DEFAULT_POLL_INTERVAL = 5.0
+# Upper bound on files waiting to be organized; beyond it the watcher
+# forgets individual events and rescans the directory once things settle.
+DEFAULT_MAX_PENDING = 10000
+# Names of files that are still being written by other programs.
+PARTIAL_SUFFIXES = (".part", ".partial", ".crdownload", ".download", ".tmp", ".swp")
+
+# inotify constants from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _is_candidate(name: str) -> bool:
+    return not name.startswith(".") and not name.lower().endswith(PARTIAL_SUFFIXES)
+
+
+class InotifySource:
+    """Reports names of files created, written or moved into a directory (Linux)."""
+
+    def __init__(self, directory: str):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = IN_CREATE | IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO
+        if libc.inotify_add_watch(self._fd, os.fsencode(directory), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, f"inotify_add_watch failed for {directory}")
+
+    def poll(self, timeout: float):
+        """
+        Wait up to `timeout` seconds for events.
+
+        Returns:
+            tuple: (set of file names, overflowed flag).
+        """
+        names, overflow = set(), False
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return names, overflow
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return names, overflow
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                overflow = True
+            elif name and not mask & IN_ISDIR:
+                names.add(os.fsdecode(name))
+        return names, overflow
+
+    def close(self):
+        os.close(self._fd)
+
+
+class PollingSource:
+    """Portable fallback that detects new or changed files by rescanning."""
+
+    def __init__(self, directory: str, interval: float = DEFAULT_POLL_INTERVAL):
+        self.directory = directory
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self):
+        return {entry.name: (entry.size, entry.mtime) for entry in scan_directory(self.directory)}
+
+    def poll(self, timeout: float):
+        """
+        Sleep up to `timeout` seconds (at most one poll interval), then rescan.
+
+        Returns:
+            tuple: (set of new or changed file names, overflowed flag).
+        """
+        time.sleep(min(timeout, self.interval))
+        current = self._scan()
+        changed = {name for name, stat in current.items() if self._snapshot.get(name) != stat}
+        self._snapshot = current
+        return changed, False
+
+    def close(self):
+        pass
+
+
+def watch_directory(directory: str, handle_files: Callable[[List[ScanEntry]], None],
+                    debounce: float = DEFAULT_DEBOUNCE, poll_interval: float = DEFAULT_POLL_INTERVAL,
+                    max_pending: int = DEFAULT_MAX_PENDING, stop_event: threading.Event = None,
+                    use_inotify: bool = True, include: List[str] = None, exclude: List[str] = None):
+    """
+    Watch a directory and pass newly arrived files to `handle_files`.
+
+    Events are debounced: a file is handed over only after it has seen no
+    events for `debounce` seconds and its size and mtime have stopped
+    changing, so files that are still being downloaded or copied are left
+    alone. Only files directly inside the directory are watched, so moves
+    into category folders do not trigger new work. Files are filtered with
+    the same include/exclude globs as walk_directory.
+
+    Args:
+        directory (str): The directory to watch.
+        handle_files (callable): Called with a list of ScanEntry objects per batch.
+        debounce (float, optional): Quiet period in seconds before a file is handled.
+        poll_interval (float, optional): Rescan interval of the polling fallback.
+        max_pending (int, optional): Maximum number of files tracked individually.
+        stop_event (threading.Event, optional): Set it to stop watching.
+        use_inotify (bool, optional): Use inotify when available (Linux).
+        include (list, optional): Glob patterns a file name must match to be handled.
+        exclude (list, optional): Glob patterns for files to ignore.
+    """
+    def is_candidate(name):
+        return _is_candidate(name) and is_selected(name, name, include, exclude)
+
+    source = None
+    if use_inotify and sys.platform.startswith("linux"):
+        try:
+            source = InotifySource(directory)
+        except (OSError, AttributeError) as e:
+            logger.warning("[Watch] inotify unavailable (%s), falling back to polling", e)
+    if source is None:
+        source = PollingSource(directory, poll_interval)
+    logger.info("[Watch] Watching %s (%s)", directory, type(source).__name__)
+
+    # name -> (time of last event, (size, mtime) seen then)
+    pending = {}
+    # Set after an overflow; holds the last name queued by an unfinished rescan.
+    rescan = None
+    try:
+        while stop_event is None or not stop_event.is_set():
+            names, overflow = source.poll(debounce / 2)
+            now = time.monotonic()
+            if overflow or len(pending) + len(names) > max_pending:
+                pending.clear()
+                rescan = ""
+            elif names:
+                for name in names:
+                    if is_candidate(name):
+                        pending[name] = (now, None)
+            if rescan is not None and not names and not pending:
+                # Treat every file in the directory as new once the burst is over,
+                # at most `max_pending` at a time, continuing in name order.
+                remaining = sorted(entry.name for entry in scan_directory(directory)
+                                   if entry.name > rescan and is_candidate(entry.name))
+                for name in remaining[:max_pending]:
+                    pending[name] = (now - debounce, None)
+                rescan = remaining[max_pending - 1] if len(remaining) > max_pending else None
+
+            ready = []
+            for name, (last_event, last_stat) in list(pending.items()):
+                if now - last_event < debounce:
+                    continue
+                entry = stat_entry(os.path.join(directory, name))
+                if entry is None:
+                    del pending[name]
+                    continue
+                stat = (entry.size, entry.mtime)
+                if stat != last_stat:
+                    # Still being written (or not checked yet): wait another period.
+                    pending[name] = (now, stat)
+                    continue
+                del pending[name]
+                # The stat that confirmed the file is quiet also builds its entry.
+                ready.append(entry)
+
+            if ready:
+                try:
+                    handle_files(ready)
+                except Exception as e:
+                    # A failed batch must not end a long-running watch.
+                    logger.error("[Watch] Failed to organize %d files: %s", len(ready), e)
+    except KeyboardInterrupt:
+        logger.info("[Watch] Stopped")
+    finally:
+        source.close()
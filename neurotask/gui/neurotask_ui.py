@@ -3,14 +3,20 @@ import threading
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from tkinter.constants import *
-from vassist.assistant import VoiceAssistant
-import speech_recognition as sr
-import pyttsx3
 import math
 import time
 import random
-from neurotask.organizer import extension_based, timeline_based, semantic_based, intent_based
+import asyncio
+from neurotask.organizer import async_organizer
+from neurotask.organizer.plan import format_bytes
 from neurotask.utils.config import load_config
+from neurotask.utils.logger import setup_logger
+from neurotask.utils.progress import ProgressReporter
+
+logger = setup_logger(__name__)
+
+# Milliseconds between two reads of the progress queue while a run is active.
+PROGRESS_POLL_MS = 100
 
 class NeurotaskUI:
     def __init__(self, root, voice_enabled=True):
@@ -21,6 +27,8 @@ class NeurotaskUI:
 
         self.voice_enabled = voice_enabled
         self.voice_assistant = None
+        self.progress_reporter = None
+        self.worker_thread = None
         self.setup_styles()
         self.setup_ui()
 
@@ -30,6 +38,8 @@ class NeurotaskUI:
         self.center_window()
 
     def setup_voice_assistant(self):
+        # speech_recognition and pyttsx3 are slow to import; only load them when voice is on
+        from vassist.assistant import VoiceAssistant
         self.assistant = VoiceAssistant(self.root, self.update_voice_status, self.update_chat_display)
 
     def update_voice_status(self, state, message):
@@ -234,7 +244,14 @@ class NeurotaskUI:
                                    text="Organize Files", 
                                    command=self.run_organization,
                                    style='Primary.TButton')
-        self.org_button.pack(fill=X, ipady=8)
+        self.org_button.pack(side=LEFT, fill=X, expand=True, ipady=8)
+
+        self.cancel_button = ttk.Button(btn_frame,
+                                      text="Cancel",
+                                      command=self.cancel_organization,
+                                      style='Danger.TButton',
+                                      state=DISABLED)
+        self.cancel_button.pack(side=LEFT, padx=(10, 0), ipady=8)
         
         # --- Status and Progress ---
         status_frame = ttk.Frame(main_frame)
@@ -265,50 +282,115 @@ class NeurotaskUI:
 
         # Update UI
         self.status_label.config(text="Status: Organizing files...")
-        self.progress.start(10)
+        self.progress.config(mode="determinate", maximum=1, value=0)
         self.org_button.config(state=DISABLED)
+        self.cancel_button.config(state=NORMAL)
 
-        # Launch in separate thread
-        thread = threading.Thread(target=self.organize_files, args=(directory,), daemon=True)
-        thread.start()
+        # Launch in separate thread; it reports through the reporter's queue,
+        # which poll_progress drains on the Tk main loop.
+        self.progress_reporter = ProgressReporter()
+        self.worker_thread = threading.Thread(target=self.organize_files, args=(directory,), daemon=True)
+        self.worker_thread.start()
+        self.root.after(PROGRESS_POLL_MS, self.poll_progress)
+
+    def poll_progress(self):
+        reporter = self.progress_reporter
+        if reporter is None:
+            return
+        events = reporter.events()
+        if events:
+            self.show_progress(events[-1])
+        if self.worker_thread is not None and self.worker_thread.is_alive():
+            self.root.after(PROGRESS_POLL_MS, self.poll_progress)
+
+    def show_progress(self, event):
+        if event.total:
+            self.progress.config(maximum=event.total, value=event.done)
+            counts = f"{event.done}/{event.total} files"
+        else:
+            counts = f"{event.done} files"
+        parts = [f"Status: {event.stage.capitalize()} {counts}"]
+        if event.bytes_total:
+            parts.append(f"{format_bytes(event.bytes_done)} of {format_bytes(event.bytes_total)}")
+        if event.files_per_sec:
+            parts.append(f"{event.files_per_sec:.1f} files/s")
+        if event.eta is not None:
+            parts.append(f"ETA {int(event.eta) // 60}:{int(event.eta) % 60:02d}")
+        if self.progress_reporter.cancelled:
+            parts.append("cancelling...")
+        self.status_label.config(text=" - ".join(parts))
+
+    def cancel_organization(self):
+        if self.progress_reporter is None:
+            return
+        self.progress_reporter.cancel()
+        self.cancel_button.config(state=DISABLED)
+        self.status_label.config(text="Status: Cancelling after in-flight moves...")
 
     def organize_files(self, directory):
         try:
             org_type = self.org_choice.get()
-            print(f"[DEBUG] Starting organization with type: {org_type}")
-            print(f"[DEBUG] Directory: {directory}")
-
-            if org_type == "extension":
-                print("[DEBUG] Running extension-based organizer")
-                config = load_config()
-                extension_based.organize_by_extension(directory, config["file_categories"])
-            elif org_type == "timeline":
-                print("[DEBUG] Running timeline-based organizer")
-                timeline_based.organize_by_timeline(directory)
-            elif org_type == "semantic":
-                print("[DEBUG] Running semantic-based organizer")
-                semantic_based.organize_by_semantics(directory)
-            elif org_type == "intent":
-                print("[DEBUG] Running intent-based organizer")
-                intent_based.organize_by_intents(directory)
-
-            print("[DEBUG] Organization completed successfully")
+            logger.debug("Starting organization with type: %s", org_type)
+            logger.debug("Directory: %s", directory)
+
+            # The organizer runs on an event loop owned by this worker thread;
+            # Tk stays on the main thread and is only updated via root.after.
+            asyncio.run(self.organize_files_async(directory, org_type))
+
+            logger.debug("Organization finished (cancelled: %s)", self.progress_reporter.cancelled)
             self.root.after(0, self.organization_complete)
         except Exception as e:
-            print(f"[DEBUG] Error during organization: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error during organization: %s", e)
             self.root.after(0, self.organization_failed, str(e))
 
-    def organization_complete(self):
-        self.progress.stop()
+    async def organize_files_async(self, directory, org_type):
+        progress = self.progress_reporter
+        if org_type == "extension":
+            logger.debug("Running extension-based organizer")
+            config = load_config()
+            await async_organizer.organize_by_extension_async(directory, config["extension_index"],
+                                                              progress=progress)
+        elif org_type == "timeline":
+            logger.debug("Running timeline-based organizer")
+            await async_organizer.organize_by_timeline_async(directory, progress=progress)
+        elif org_type == "semantic":
+            logger.debug("Running semantic-based organizer")
+            await async_organizer.organize_by_semantics_async(directory, progress=progress)
+        elif org_type == "intent":
+            logger.debug("Running intent-based organizer")
+            await async_organizer.organize_by_intents_async(directory, progress=progress)
+
+    def finish_run(self):
+        # Show the last events the worker queued before it finished.
+        events = self.progress_reporter.events()
+        if events:
+            self.show_progress(events[-1])
         self.org_button.config(state=NORMAL)
-        self.status_label.config(text="Status: Organization complete!")
-        messagebox.showinfo("Success", "File organization completed successfully!")
+        self.cancel_button.config(state=DISABLED)
+
+    def organization_complete(self):
+        self.finish_run()
+        run_id = self.progress_reporter.run_id
+        if self.progress_reporter.cancelled:
+            if run_id is None:
+                self.status_label.config(text="Status: Organization cancelled, no files moved")
+                messagebox.showinfo("Cancelled", "File organization was cancelled before any file was moved.")
+            else:
+                self.status_label.config(text=f"Status: Organization cancelled (run {run_id})")
+                messagebox.showinfo("Cancelled", "File organization was cancelled. Files already moved can be "
+                                                 f"restored with:\n\npython run_neurotask.py --undo {run_id}")
+            return
+        self.progress.config(value=self.progress.cget("maximum"))
+        if run_id is None:
+            self.status_label.config(text="Status: Organization complete, nothing to move")
+            messagebox.showinfo("Success", "File organization completed successfully!")
+            return
+        self.status_label.config(text=f"Status: Organization complete! (run {run_id})")
+        messagebox.showinfo("Success", "File organization completed successfully!\n\n"
+                                       f"To undo it, run:\npython run_neurotask.py --undo {run_id}")
 
     def organization_failed(self, error):
-        self.progress.stop()
-        self.org_button.config(state=NORMAL)
+        self.finish_run()
         self.status_label.config(text=f"Status: Error - {error[:30]}...")
         messagebox.showerror("Error", f"An error occurred:\n{error}")
 
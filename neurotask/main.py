@@ -5,23 +5,19 @@ import sys
 # Add parent directory to path so 'neurotask' can be found
 parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, parent_dir)
-print(f"[DEBUG] Added to Python path: {parent_dir}")
 
 import argparse
-import tkinter as tk
-from neurotask.utils.logger import setup_logger
+from neurotask.utils.logger import set_log_level, setup_logger
 
 # Setup logging
 logger = setup_logger("neurotask")
+logger.debug("Added to Python path: %s", parent_dir)
 
 def main():
     """Main entry point for the application"""
     try:
         sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-        logger.info("🧠 Neurotask running with Python: %s", sys.version.split()[0])
-        logger.info("📍 Interpreter: %s", sys.executable)
-
         parser = argparse.ArgumentParser(description='Neurotask File Organizer')
         parser.add_argument('--cli', action='store_true', help='Run in command line mode')
         parser.add_argument('--gui', action='store_true', help='Run with graphical user interface')
@@ -32,12 +28,95 @@ def main():
                            help='Enable voice assistant in GUI mode')
         parser.add_argument('--no-voice', action='store_true', 
                            help='Disable voice assistant in GUI mode')
+        parser.add_argument('--workers', type=int, default=4,
+                           help='Number of workers for recursive scanning and text extraction')
+        parser.add_argument('--llm-concurrency', type=int, default=2,
+                           help='Maximum number of concurrent LLM requests (semantic and intent modes)')
+        parser.add_argument('--extract-timeout', type=float, default=30,
+                           help='Seconds allowed for extracting text from one file (intent mode)')
+        parser.add_argument('--max-file-size', type=float, default=200, metavar='MB',
+                           help='Do not read files larger than this many MB (intent mode)')
+        parser.add_argument('--batch-size', type=int, default=1,
+                           help='Documents classified per LLM prompt in intent mode (e.g. 10-20)')
+        parser.add_argument('--no-rules', action='store_true',
+                           help='Send every document to the LLM in intent mode (skip the keyword rules)')
+        parser.add_argument('--semantic-engine', choices=['prompt', 'embedding'], default='prompt',
+                           help='Semantic mode: let the LLM group filenames, or cluster embeddings '
+                                'locally and only ask the LLM to name each cluster')
+        parser.add_argument('--embedder', choices=['hashing', 'ollama'], default='hashing',
+                           help='Vectors for the embedding engine: offline hashed TF-IDF or Ollama embeddings')
+        parser.add_argument('--granularity', choices=['day', 'week', 'month', 'quarter', 'year'],
+                           default='month', help='Folder per day, ISO week, month, quarter or year (timeline mode)')
+        parser.add_argument('--date-source', choices=['created', 'mtime', 'ctime', 'content'],
+                           default='created',
+                           help='Date used in timeline mode: creation time, modification time, inode change '
+                                'time, or an EXIF/in-document date (falling back to the modification time)')
+        parser.add_argument('--async', dest='use_async', action='store_true',
+                           help='Run the organizer on an asyncio event loop (overlaps file reads '
+                                'and LLM requests without a thread per task)')
+        parser.add_argument('--dedup', choices=['skip', 'move', 'hardlink'],
+                           help='Detect byte-identical files and organize each content once: leave '
+                                'copies in place, move them to Duplicates/, or file them next to the '
+                                'first copy as hard links')
+        parser.add_argument('--no-cache', action='store_true',
+                           help='Do not reuse or store cached LLM classifications')
+        parser.add_argument('--recursive', action='store_true',
+                           help='Also organize files in subfolders of --dir')
+        parser.add_argument('--max-depth', type=int, default=None,
+                           help='Maximum folder depth below --dir in recursive mode')
+        parser.add_argument('--include', action='append', default=[], metavar='GLOB',
+                           help='Only organize files matching this glob (repeatable)')
+        parser.add_argument('--exclude', action='append', default=[], metavar='GLOB',
+                           help='Skip files and folders matching this glob (repeatable)')
+        parser.add_argument('--incremental', action='store_true',
+                           help='Skip files already processed by an earlier run and unchanged since')
+        parser.add_argument('--dry-run', action='store_true',
+                           help='Print the planned moves without moving anything')
+        parser.add_argument('--plan-out', type=str, metavar='FILE',
+                           help='Write the planned moves to FILE as JSON')
+        parser.add_argument('--undo', type=str, metavar='RUN_ID',
+                           help='Roll back the organization run with this id')
+        parser.add_argument('--watch', action='store_true',
+                           help='Keep running and organize new files as they arrive in --dir')
+        parser.add_argument('--debounce', type=float, default=2.0, metavar='SECONDS',
+                           help='Quiet period before a new file is organized in watch mode')
+        parser.add_argument('--poll-interval', type=float, default=5.0, metavar='SECONDS',
+                           help='Rescan interval in watch mode when inotify is unavailable')
+        parser.add_argument('--log-level', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], default='INFO',
+                           help='Minimum level of log messages (DEBUG shows every file)')
+        parser.add_argument('--quiet', action='store_true',
+                           help='Only log warnings and errors (same as --log-level WARNING)')
+        parser.add_argument('--profile', action='store_true',
+                           help='Print a per-stage timing summary at the end of the run')
+        parser.add_argument('--metrics-out', type=str, metavar='FILE',
+                           help='Append run metrics to FILE as JSON lines (Prometheus text format for .prom files)')
 
         args = parser.parse_args()
+        if args.use_async and args.type == "intent" and args.batch_size > 1:
+            parser.error("--batch-size is not supported with --async (the async intent organizer "
+                         "sends one document per prompt)")
+        set_log_level('WARNING' if args.quiet else args.log_level)
+        logger.info("🧠 Neurotask running with Python: %s", sys.version.split()[0])
+        logger.info("📍 Interpreter: %s", sys.executable)
+
+        if args.profile or args.metrics_out:
+            from neurotask.utils import instrumentation
+            instrumentation.enable()
+
+        # Undo mode
+        if args.undo:
+            from neurotask.file_manager.mover import undo_run
+            try:
+                undo_run(args.undo)
+            except FileNotFoundError:
+                logger.error("No journal found for run %s", args.undo)
+                sys.exit(1)
+            return
 
         # GUI mode
         if args.gui or not args.cli:
             try:
+                import tkinter as tk
                 from neurotask.gui.neurotask_ui import NeurotaskUI
                 root = tk.Tk()
                 
@@ -63,9 +142,11 @@ def main():
         # CLI mode
         if args.cli or args.dir:
             try:
-                # Import CLI components
-                from neurotask.organizer import extension_based, timeline_based, semantic_based, intent_based
+                # Import CLI components (organizers are imported below, only the selected one)
                 from neurotask.utils.config import load_config
+                from neurotask.file_manager.scanner import scan_directory, walk_directory
+                from neurotask.organizer.plan import export_plan, print_plan, resolve_collisions
+                from neurotask.utils import instrumentation
                 
                 if not args.dir:
                     logger.error("Directory argument required for CLI mode")
@@ -75,18 +156,187 @@ def main():
                     logger.error("Invalid directory: %s", args.dir)
                     sys.exit(1)
                 
-                # Perform organization based on type
-                if args.type == "extension":
+                if args.type in ("extension", "intent"):
                     config = load_config()
-                    extension_based.organize_by_extension(args.dir, config["file_categories"])
+
+                # Never descend into the category folders the organizer creates
+                if args.type == "extension":
+                    from neurotask.organizer import extension_based
+                    prune = extension_based.category_folders(config["extension_index"]).__contains__
                 elif args.type == "timeline":
-                    timeline_based.organize_by_timeline(args.dir)
+                    from neurotask.organizer import timeline_based
+                    prune = timeline_based.timeline_folder_filter(args.dir)
                 elif args.type == "semantic":
-                    semantic_based.organize_by_semantics(args.dir)
-                elif args.type == "intent":
-                    intent_based.organize_by_intents(args.dir)
-                    
-                logger.info("Organization completed successfully")
+                    from neurotask.organizer import semantic_based
+                    prune = semantic_based.created_folders(args.dir).__contains__
+                else:
+                    from neurotask.organizer import intent_based
+                    from neurotask.organizer.rules import DEFAULT_THRESHOLD, RuleSet
+                    prune = intent_based.is_intent_folder
+                    rules = None
+                    if not args.no_rules:
+                        rules = RuleSet(config.get("intent_rules"),
+                                        config.get("rule_threshold", DEFAULT_THRESHOLD))
+
+                if args.dedup == "move":
+                    from neurotask.organizer.plan import DUPLICATES_FOLDER
+                    organizer_prune = prune
+                    prune = lambda name: name == DUPLICATES_FOLDER or organizer_prune(name)
+
+                entries = None
+                if args.recursive or args.include or args.exclude:
+                    max_depth = args.max_depth if args.recursive else 0
+                    with instrumentation.timer("scan"):
+                        entries = list(walk_directory(args.dir, max_depth=max_depth, include=args.include,
+                                                      exclude=args.exclude, prune=prune,
+                                                      workers=args.workers))
+                    logger.info("Found %d files to organize", len(entries))
+
+                index = None
+                if args.incremental:
+                    from neurotask.file_manager.index import FileIndex
+                    index = FileIndex(args.dir)
+
+                async def organize_async(entries, dry_run):
+                    """Async counterpart of the organizer dispatch in organize()."""
+                    from neurotask.organizer import async_organizer
+                    if args.type == "extension":
+                        return await async_organizer.organize_by_extension_async(
+                            args.dir, config["extension_index"], entries=entries,
+                            dry_run=dry_run, index=index, open_explorer=not args.watch)
+                    if args.type == "timeline":
+                        return await async_organizer.organize_by_timeline_async(
+                            args.dir, entries=entries, dry_run=dry_run, index=index,
+                            granularity=args.granularity, date_source=args.date_source,
+                            workers=args.workers)
+                    if args.type == "semantic":
+                        return await async_organizer.organize_by_semantics_async(
+                            args.dir, use_cache=not args.no_cache, llm_concurrency=args.llm_concurrency,
+                            entries=entries, dry_run=dry_run, index=index,
+                            engine=args.semantic_engine, embedder=args.embedder, workers=args.workers)
+                    return await async_organizer.organize_by_intents_async(
+                        args.dir, workers=args.workers, llm_concurrency=args.llm_concurrency,
+                        use_cache=not args.no_cache, entries=entries, dry_run=dry_run,
+                        extract_timeout=args.extract_timeout,
+                        max_bytes=int(args.max_file_size * 1024 * 1024), index=index,
+                        budgets=config.get("snippet_budgets"), rules=rules,
+                        use_rules=not args.no_rules)
+
+                def organize(entries):
+                    """Run the selected organizer over `entries` (None means the whole directory)."""
+                    if entries is None and (index is not None or args.dedup or instrumentation.is_enabled()):
+                        # Scanned here rather than in the organizer so the scan is timed on its own
+                        with instrumentation.timer("scan"):
+                            entries = list(scan_directory(args.dir))
+                    if index is not None:
+                        total = len(entries)
+                        entries = index.filter_changed(entries)
+                        index.record_entries(entries)
+                        logger.info("%d of %d files are new or changed", len(entries), total)
+
+                    # With dedup, only the first copy of each content is organized; the
+                    # organizer then only plans, so the duplicates' moves can be added.
+                    processed = entries
+                    duplicates = {}
+                    if args.dedup:
+                        from neurotask.file_manager.dedup import find_duplicates
+                        with instrumentation.timer("dedup"):
+                            entries, duplicates = find_duplicates(entries, workers=args.workers)
+                        logger.info("Found %d duplicates in %d groups",
+                                    sum(len(copies) for copies in duplicates.values()), len(duplicates))
+                    dry_run = args.dry_run or bool(duplicates)
+
+                    with instrumentation.timer("organize"):
+                        if args.use_async:
+                            import asyncio
+                            plan = asyncio.run(organize_async(entries, dry_run))
+                        elif args.type == "extension":
+                            plan = extension_based.organize_by_extension(args.dir, config["extension_index"],
+                                                                         entries=entries, dry_run=dry_run,
+                                                                         index=index, open_explorer=not args.watch)
+                        elif args.type == "timeline":
+                            plan = timeline_based.organize_by_timeline(args.dir, entries=entries,
+                                                                       dry_run=dry_run, index=index,
+                                                                       granularity=args.granularity,
+                                                                       date_source=args.date_source,
+                                                                       workers=args.workers)
+                        elif args.type == "semantic":
+                            plan = semantic_based.organize_by_semantics(args.dir, use_cache=not args.no_cache,
+                                                                        llm_concurrency=args.llm_concurrency,
+                                                                        entries=entries, dry_run=dry_run,
+                                                                        index=index, engine=args.semantic_engine,
+                                                                        embedder=args.embedder, workers=args.workers)
+                        elif args.type == "intent":
+                            plan = intent_based.organize_by_intents(args.dir, workers=args.workers,
+                                                                    llm_concurrency=args.llm_concurrency,
+                                                                    use_cache=not args.no_cache,
+                                                                    entries=entries, dry_run=dry_run,
+                                                                    extract_timeout=args.extract_timeout,
+                                                                    max_bytes=int(args.max_file_size * 1024 * 1024),
+                                                                    index=index,
+                                                                    budgets=config.get("snippet_budgets"),
+                                                                    batch_size=args.batch_size,
+                                                                    rules=rules, use_rules=not args.no_rules)
+
+                        if duplicates:
+                            from neurotask.organizer.plan import apply_plan, plan_duplicates
+                            plan = list(plan) + plan_duplicates(plan, duplicates, args.dedup, args.dir)
+                            if not args.dry_run:
+                                if args.dedup == "hardlink":
+                                    from neurotask.file_manager.dedup import link_duplicates
+                                    logger.info("Replaced %d duplicates with hard links",
+                                                link_duplicates(duplicates))
+                                if args.type in ("semantic", "timeline"):
+                                    organizer = semantic_based if args.type == "semantic" else timeline_based
+                                    organizer.record_created_folders(
+                                        args.dir, {os.path.basename(os.path.dirname(m.destination))
+                                                   for m in plan})
+                                apply_plan(plan, index=index)
+
+                    if index is not None:
+                        if not args.dry_run:
+                            # Moved files were marked processed by apply_plan (under their
+                            # new path); files the plan left in place count as processed
+                            # too. Files whose move failed are not, so the next run retries them.
+                            planned = {move.source for move in plan}
+                            index.mark_processed(entry.path for entry in processed
+                                                 if entry.path not in planned)
+                        index.commit()
+
+                    if args.dry_run:
+                        plan = resolve_collisions(plan)
+                        print_plan(plan)
+
+                    if instrumentation.is_enabled():
+                        if args.profile:
+                            print(instrumentation.format_summary())
+                        if args.metrics_out:
+                            instrumentation.export(args.metrics_out, labels={"type": args.type})
+                            logger.info("Metrics written to %s", args.metrics_out)
+                        # In watch mode every batch is reported on its own
+                        instrumentation.reset()
+                    return plan
+
+                # Perform organization based on type
+                plan = organize(entries)
+                if args.plan_out:
+                    export_plan(plan, args.plan_out)
+                    logger.info("Move plan written to %s", args.plan_out)
+
+                if args.watch:
+                    from neurotask.file_manager.watcher import watch_directory
+                    logger.info("Watching %s for new files (Ctrl+C to stop)", args.dir)
+                    watch_directory(args.dir, organize, debounce=args.debounce,
+                                    poll_interval=args.poll_interval, include=args.include,
+                                    exclude=args.exclude)
+
+                if index is not None:
+                    index.close()
+
+                if args.dry_run:
+                    logger.info("Dry run completed, no files were moved")
+                else:
+                    logger.info("Organization completed successfully")
             except Exception as e:
                 logger.error("CLI operation failed: %s", str(e))
                 sys.exit(1)
@@ -0,0 +1,303 @@
+# models/async_ollama.py
+import asyncio
+import json
+import time
+from neurotask.models.ollama_runner import (
+    DEFAULT_KEEP_ALIVE, DEFAULT_MODEL, HTTP_RETRY_INTERVAL, REQUEST_TIMEOUT, OllamaError,
+    split_host, stop_at_line_end,
+)
+from neurotask.utils import instrumentation
+from neurotask.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Default number of generation requests in flight at once.
+DEFAULT_CONCURRENCY = 2
+
+
+class _Response:
+    """Status, headers and body reader of one HTTP/1.1 response."""
+
+    def __init__(self, status, headers, reader, timeout):
+        self.status = status
+        self.headers = headers
+        self._reader = reader
+        self._timeout = timeout
+        # False while body bytes are left unread on the connection.
+        self.complete = False
+
+    @property
+    def reusable(self):
+        return self.complete and self.headers.get("connection", "").lower() != "close"
+
+    async def _read(self, coro):
+        return await asyncio.wait_for(coro, self._timeout)
+
+    async def chunks(self):
+        """Yield the body in pieces as it arrives (chunked or Content-Length)."""
+        if self.headers.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                size = int((await self._read(self._reader.readline())).split(b";")[0], 16)
+                if size == 0:
+                    # Skip trailers up to the blank line ending the body.
+                    while (await self._read(self._reader.readline())).strip():
+                        pass
+                    break
+                data = await self._read(self._reader.readexactly(size + 2))
+                yield data[:-2]
+        elif "content-length" in self.headers:
+            length = int(self.headers["content-length"])
+            if length:
+                yield await self._read(self._reader.readexactly(length))
+        else:
+            while True:
+                data = await self._read(self._reader.read(65536))
+                if not data:
+                    break
+                yield data
+            # Without a length the server ends the body by closing the connection.
+            self.headers["connection"] = "close"
+        self.complete = True
+
+    async def read(self):
+        """Read the whole body."""
+        return b"".join([chunk async for chunk in self.chunks()])
+
+
+class AsyncOllamaClient:
+    """
+    asyncio counterpart of OllamaClient for use inside an event loop.
+
+    Requests go over a small pool of keep-alive connections opened with
+    asyncio streams, so hundreds of pending prompts cost a coroutine each
+    rather than a thread. At most `concurrency` generation requests are sent
+    at once; the rest wait on a semaphore. If the server cannot be reached,
+    prompts are sent through `ollama run` subprocesses instead.
+
+    A client belongs to the event loop it is first used in; use one client per
+    `asyncio.run` and close it with `aclose()`.
+    """
+
+    def __init__(self, host: str = None, model: str = DEFAULT_MODEL,
+                 keep_alive: str = DEFAULT_KEEP_ALIVE, timeout: float = REQUEST_TIMEOUT,
+                 concurrency: int = DEFAULT_CONCURRENCY):
+        self.host, self.port = split_host(host)
+        self.model = model
+        self.keep_alive = keep_alive
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._idle = []
+        self._retry_at = 0.0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def _open(self):
+        if self._idle:
+            return self._idle.pop(), True
+        streams = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.timeout)
+        return streams, False
+
+    def _release(self, streams, response):
+        if response is not None and response.reusable:
+            self._idle.append(streams)
+        else:
+            streams[1].close()
+
+    async def _request(self, path: str, payload: dict):
+        body = json.dumps(payload).encode("utf-8")
+        head = (f"POST {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                "Connection: keep-alive\r\n\r\n").encode("ascii")
+        # A pooled connection may have been closed by the server while idle;
+        # retry once on a fresh socket before giving up.
+        for attempt in range(2):
+            streams, reused = await self._open()
+            reader, writer = streams
+            try:
+                writer.write(head + body)
+                await writer.drain()
+                status_line = await asyncio.wait_for(reader.readline(), self.timeout)
+                if not status_line:
+                    raise ConnectionResetError("connection closed before response")
+                headers = {}
+                while True:
+                    line = await asyncio.wait_for(reader.readline(), self.timeout)
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                if attempt or not reused:
+                    raise
+                continue
+            except BaseException:
+                writer.close()
+                raise
+            response = _Response(int(status_line.split()[1]), headers, reader, self.timeout)
+            if response.status != 200:
+                try:
+                    data = await response.read()
+                finally:
+                    self._release(streams, response)
+                raise OllamaError(f"HTTP {response.status}: {data.decode('utf-8', 'replace').strip()}")
+            return streams, response
+
+    def _payload(self, prompt, stream, max_tokens, stop):
+        payload = {"model": self.model, "prompt": prompt, "stream": stream, "keep_alive": self.keep_alive}
+        options = {}
+        if max_tokens:
+            options["num_predict"] = max_tokens
+        if stop:
+            options["stop"] = list(stop)
+        if options:
+            payload["options"] = options
+        return payload
+
+    async def stream(self, prompt: str, max_tokens: int = None, stop: list = None):
+        """
+        Send a streaming generation request and yield tokens as they arrive.
+
+        Closing the generator early (`aclose()`, or leaving an `async for` via
+        run_until) drops the connection, which makes Ollama stop generating.
+
+        Args:
+            prompt (str): The prompt text to be processed by the LLM.
+            max_tokens (int, optional): Upper bound on generated tokens (`num_predict`).
+            stop (list, optional): Stop sequences that end generation on the server.
+
+        Yields:
+            str: Response fragments in order.
+        """
+        streams, response = await self._request("/api/generate", self._payload(prompt, True, max_tokens, stop))
+        buffer = b""
+        try:
+            async for data in response.chunks():
+                buffer += data
+                *lines, buffer = buffer.split(b"\n")
+                for line in lines:
+                    if not line.strip():
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("error"):
+                        raise OllamaError(chunk["error"])
+                    if chunk.get("response"):
+                        instrumentation.count("llm_tokens")
+                        yield chunk["response"]
+        finally:
+            self._release(streams, response)
+
+    async def generate(self, prompt: str, max_tokens: int = None, stop: list = None) -> str:
+        """
+        Send a single non-streaming generation request.
+
+        Args:
+            prompt (str): The prompt text to be processed by the LLM.
+            max_tokens (int, optional): Upper bound on generated tokens (`num_predict`).
+            stop (list, optional): Stop sequences that end generation on the server.
+
+        Returns:
+            str: The raw response text from the model.
+        """
+        streams, response = await self._request("/api/generate", self._payload(prompt, False, max_tokens, stop))
+        try:
+            data = await response.read()
+        finally:
+            self._release(streams, response)
+        return json.loads(data).get("response", "")
+
+    async def run_until(self, prompt: str, until=stop_at_line_end, max_tokens: int = None,
+                        stop: list = None, cancelled=None) -> str:
+        """
+        Async counterpart of ollama_runner.run_llm_until: stream the answer and
+        stop generating once `until` returns it. Waits for a concurrency slot
+        first, and falls back to `ollama run` when the HTTP API is unreachable.
+        `cancelled` is checked once the slot is acquired, so requests still
+        queued when a run is cancelled are never sent.
+
+        Args:
+            prompt (str): The prompt text to be processed by the LLM.
+            until (callable, optional): Stop condition taking the text so far and
+                returning the final answer, or None to keep reading; None reads
+                the full response.
+            max_tokens (int, optional): Upper bound on generated tokens.
+            stop (list, optional): Stop sequences for the server.
+            cancelled (callable, optional): Returns True if the request is no longer wanted.
+
+        Returns:
+            str: The (possibly truncated) response, or an empty string if an
+                error occurs or the request was cancelled.
+        """
+        async with self._semaphore:
+            if cancelled is not None and cancelled():
+                return ""
+            with instrumentation.timer("llm"):
+                return await self._run_until(prompt, until, max_tokens, stop)
+
+    async def _run_until(self, prompt, until, max_tokens, stop):
+        instrumentation.count("llm_requests")
+        if time.monotonic() >= self._retry_at:
+            tokens = self.stream(prompt, max_tokens, stop)
+            text = ""
+            try:
+                async for token in tokens:
+                    text += token
+                    answer = until(text) if until is not None else None
+                    if answer is not None:
+                        return answer.strip()
+                if not text.strip():
+                    logger.warning("[LLM] Empty response received from model")
+                return text.strip()
+            except asyncio.TimeoutError:
+                logger.error("[LLM] The request timed out after %s seconds", self.timeout)
+                return ""
+            except OllamaError as e:
+                logger.error("[LLM] Ollama returned error: %s", e)
+                return ""
+            except (OSError, asyncio.IncompleteReadError) as e:
+                if text:
+                    logger.warning("[LLM] Connection lost mid-response: %s", e)
+                    return text.strip()
+                logger.warning("[LLM] Ollama HTTP API unavailable (%s), falling back to `ollama run`", e)
+                self._retry_at = time.monotonic() + HTTP_RETRY_INTERVAL
+            except Exception as e:
+                logger.error("[LLM] An error occurred while running the LLM: %s", e)
+                return ""
+            finally:
+                await tokens.aclose()
+        response = await self._run_subprocess(prompt)
+        answer = until(response + "\n") if until is not None and response else None
+        return response if answer is None else answer.strip()
+
+    async def _run_subprocess(self, prompt: str) -> str:
+        try:
+            process = await asyncio.create_subprocess_exec(
+                "ollama", "run", self.model, prompt,
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        except OSError as e:
+            logger.error("[LLM] An error occurred while running the LLM: %s", e)
+            return ""
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), self.timeout)
+        except asyncio.TimeoutError:
+            logger.error("[LLM] The process timed out after %s seconds", self.timeout)
+            process.kill()
+            await process.wait()
+            return ""
+        if process.returncode != 0:
+            logger.error("[LLM] Ollama returned error: %s", stderr.decode("utf-8", "replace"))
+            return ""
+        response = stdout.decode("utf-8", "replace").strip()
+        if not response:
+            logger.warning("[LLM] Empty response received from model")
+        return response
+
+    async def aclose(self):
+        """Close all pooled connections."""
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
@@ -0,0 +1,206 @@
+# models/embeddings.py
+import os
+import re
+import zlib
+import numpy as np
+from neurotask.models.ollama_runner import get_client
+
+# Width of the hashed feature space; a power of two. Filenames and short
+# snippets have few distinct n-grams, and the dense matrix costs
+# 4 * HASH_DIM bytes per file.
+HASH_DIM = 1 << 11
+NGRAM_RANGE = (3, 5)
+# Texts sent to the embedding endpoint per request.
+EMBED_BATCH_SIZE = 64
+# Rows processed at once when assigning points to centroids, bounding the
+# size of the similarity matrix.
+ASSIGN_BLOCK_ROWS = 8192
+DEFAULT_MAX_ITERATIONS = 50
+
+
+def filename_text(filename: str) -> str:
+    """
+    Turn a filename into plain words: "ScreenShot_2024-01-03.png" becomes
+    "screen shot png". Pure numbers (dates, counters) are dropped.
+
+    Args:
+        filename (str): The filename.
+
+    Returns:
+        str: Space separated lowercase words.
+    """
+    stem, ext = os.path.splitext(filename)
+    stem = re.sub(r"([a-z])([A-Z])", r"\1 \2", stem)
+    words = [w for w in re.split(r"[^A-Za-z0-9]+", stem.lower()) if w and not w.isdigit()]
+    if ext:
+        words.append(ext[1:].lower())
+    return " ".join(words)
+
+
+def _features(text: str):
+    # Whole words plus character n-grams of each padded word, so that
+    # "invoice" and "invoices" share most of their features.
+    for word in text.split():
+        yield word
+        padded = f" {word} "
+        for n in range(NGRAM_RANGE[0], NGRAM_RANGE[1] + 1):
+            for i in range(len(padded) - n + 1):
+                yield padded[i:i + n]
+
+
+def hashed_tfidf(texts: list, dim: int = HASH_DIM) -> np.ndarray:
+    """
+    Vectorize texts offline with hashed word and character n-gram TF-IDF.
+
+    Args:
+        texts (list): The texts to vectorize.
+        dim (int, optional): Number of hash buckets (a power of two).
+
+    Returns:
+        np.ndarray: A (len(texts), dim) float32 matrix with L2-normalized rows.
+    """
+    rows, cols = [], []
+    for row, text in enumerate(texts):
+        for feature in _features(text):
+            rows.append(row)
+            cols.append(zlib.crc32(feature.encode("utf-8")) & (dim - 1))
+    matrix = np.zeros((len(texts), dim), dtype=np.float32)
+    if rows:
+        np.add.at(matrix, (np.asarray(rows), np.asarray(cols)), 1.0)
+    np.log1p(matrix, out=matrix)
+    document_frequency = np.count_nonzero(matrix, axis=0)
+    idf = np.log((1 + len(texts)) / (1 + document_frequency)).astype(np.float32) + 1
+    matrix *= idf
+    return normalize_rows(matrix)
+
+
+def ollama_embeddings(texts: list, batch_size: int = EMBED_BATCH_SIZE) -> np.ndarray:
+    """
+    Vectorize texts with Ollama's embedding endpoint.
+
+    Args:
+        texts (list): The texts to vectorize.
+        batch_size (int, optional): Texts per request.
+
+    Returns:
+        np.ndarray: A (len(texts), embedding size) float32 matrix with L2-normalized rows.
+    """
+    client = get_client()
+    vectors = []
+    for start in range(0, len(texts), batch_size):
+        vectors.extend(client.embed(texts[start:start + batch_size]))
+    return normalize_rows(np.asarray(vectors, dtype=np.float32))
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Scale every row to unit length (all-zero rows stay zero)."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return matrix / norms
+
+
+# Centroids at least this similar are merged after k-means.
+DEFAULT_MERGE_SIMILARITY = 0.5
+
+
+def suggest_cluster_count(n: int, max_clusters: int = 100) -> int:
+    """
+    Rule-of-thumb number of k-means clusters for n items: about 2 * sqrt(n).
+    This deliberately over-clusters; merge_clusters joins the parts again.
+    """
+    return max(1, min(max_clusters, n, int(round(2 * n ** 0.5))))
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray):
+    labels = np.empty(len(vectors), dtype=np.int64)
+    similarity = np.empty(len(vectors), dtype=np.float32)
+    for start in range(0, len(vectors), ASSIGN_BLOCK_ROWS):
+        block = vectors[start:start + ASSIGN_BLOCK_ROWS] @ centroids.T
+        labels[start:start + len(block)] = block.argmax(axis=1)
+        similarity[start:start + len(block)] = block.max(axis=1)
+    return labels, similarity
+
+
+def kmeans(vectors: np.ndarray, k: int, max_iterations: int = DEFAULT_MAX_ITERATIONS, seed: int = 0):
+    """
+    Spherical k-means (cosine similarity) with k-means++ seeding.
+
+    Args:
+        vectors (np.ndarray): L2-normalized row vectors.
+        k (int): Number of clusters.
+        max_iterations (int, optional): Upper bound on refinement rounds.
+        seed (int, optional): Seed for the initial centroids, for repeatable results.
+
+    Returns:
+        tuple: (labels array, similarity of each row to its centroid, centroid matrix).
+    """
+    n = len(vectors)
+    k = max(1, min(k, n))
+    rng = np.random.default_rng(seed)
+
+    centroids = np.empty((k, vectors.shape[1]), dtype=vectors.dtype)
+    centroids[0] = vectors[rng.integers(n)]
+    # Cosine distance of each point to its closest chosen centroid.
+    closest = 1 - vectors @ centroids[0]
+    for i in range(1, k):
+        weights = np.clip(closest, 0, None).astype(np.float64) ** 2
+        total = weights.sum()
+        choice = rng.choice(n, p=weights / total) if total > 0 else rng.integers(n)
+        centroids[i] = vectors[choice]
+        np.minimum(closest, 1 - vectors @ centroids[i], out=closest)
+
+    labels = None
+    for _ in range(max_iterations):
+        new_labels, similarity = _assign(vectors, centroids)
+        if labels is not None and np.array_equal(labels, new_labels):
+            break
+        labels = new_labels
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, vectors)
+        empty = ~sums.any(axis=1)
+        # Keep the old centroid for clusters that lost all their points.
+        sums[empty] = centroids[empty]
+        centroids = normalize_rows(sums)
+    labels, similarity = _assign(vectors, centroids)
+    return labels, similarity, centroids
+
+
+def merge_clusters(labels: np.ndarray, centroids: np.ndarray,
+                   threshold: float = DEFAULT_MERGE_SIMILARITY) -> np.ndarray:
+    """
+    Agglomerative pass over k-means output (reciprocal nearest neighbours).
+
+    In each round, pairs of clusters that are each other's most similar
+    cluster, with a centroid cosine similarity of at least `threshold`, are
+    merged and their centroids recomputed (weighted by size). Rounds repeat
+    until nothing merges. Unlike single linkage, a run of pairwise-similar
+    clusters does not collapse into one.
+
+    Args:
+        labels (np.ndarray): Cluster label per row, from kmeans.
+        centroids (np.ndarray): L2-normalized centroid matrix, from kmeans.
+        threshold (float, optional): Minimum centroid similarity to merge.
+
+    Returns:
+        np.ndarray: New labels; merged clusters share the smallest original label.
+    """
+    active = np.arange(len(centroids))
+    sizes = np.bincount(labels, minlength=len(centroids)).astype(np.float32)
+    sums = centroids * sizes[:, None]
+    owner = np.arange(len(centroids))
+    while len(active) > 1:
+        current = normalize_rows(sums[active])
+        similarity = current @ current.T
+        np.fill_diagonal(similarity, -np.inf)
+        nearest = similarity.argmax(axis=1)
+        positions = np.arange(len(active))
+        mutual = ((nearest[nearest] == positions)
+                  & (similarity[positions, nearest] >= threshold)
+                  & (positions < nearest))
+        if not mutual.any():
+            break
+        for keep, drop in zip(active[positions[mutual]], active[nearest[mutual]]):
+            sums[keep] += sums[drop]
+            owner[owner == drop] = keep
+        active = np.setdiff1d(active, active[nearest[mutual]])
+    return owner[labels]
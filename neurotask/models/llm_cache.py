@@ -0,0 +1,153 @@
+# models/llm_cache.py
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from neurotask.utils import instrumentation
+from neurotask.utils.config import neurotask_home
+
+DEFAULT_MAX_ENTRIES = 50000
+# Fraction of `max_entries` kept after an eviction pass, so eviction runs in
+# batches instead of on every insert once the cache is full.
+EVICTION_TARGET = 0.9
+
+
+def content_hash(text: str) -> str:
+    """Return the SHA-256 hex digest of the given text."""
+    return hashlib.sha256(text.encode("utf-8", errors="surrogatepass")).hexdigest()
+
+
+class ClassificationCache:
+    """
+    On-disk cache of LLM classifications backed by SQLite.
+
+    Entries are keyed by (content hash, model name, prompt version), so
+    changing the model or the prompt template never returns stale answers.
+    The least recently used entries are evicted once the cache grows past
+    `max_entries`.
+    """
+
+    def __init__(self, path: str = None, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path or os.path.join(neurotask_home(), "llm_cache.sqlite")
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS classifications ("
+            " content_hash TEXT NOT NULL,"
+            " model TEXT NOT NULL,"
+            " prompt_version TEXT NOT NULL,"
+            " category TEXT NOT NULL,"
+            " last_used REAL NOT NULL,"
+            " PRIMARY KEY (content_hash, model, prompt_version))"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS classifications_last_used ON classifications (last_used)"
+        )
+        self._size = self._conn.execute("SELECT COUNT(*) FROM classifications").fetchone()[0]
+
+    def get(self, text: str, model: str, prompt_version: str):
+        """
+        Look up a cached classification.
+
+        Args:
+            text (str): The text that was classified.
+            model (str): Name of the model that produced the answer.
+            prompt_version (str): Version of the prompt template used.
+
+        Returns:
+            str or None: The cached category, or None on a miss.
+        """
+        key = (content_hash(text), model, prompt_version)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT category FROM classifications"
+                " WHERE content_hash = ? AND model = ? AND prompt_version = ?",
+                key,
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                instrumentation.count("cache_misses")
+                return None
+            self.hits += 1
+            instrumentation.count("cache_hits")
+            self._conn.execute(
+                "UPDATE classifications SET last_used = ?"
+                " WHERE content_hash = ? AND model = ? AND prompt_version = ?",
+                (time.time(),) + key,
+            )
+            return row[0]
+
+    def put(self, text: str, model: str, prompt_version: str, category: str):
+        """
+        Store a classification, evicting least recently used entries if needed.
+
+        Args:
+            text (str): The text that was classified.
+            model (str): Name of the model that produced the answer.
+            prompt_version (str): Version of the prompt template used.
+            category (str): The category returned by the model.
+        """
+        key = (content_hash(text), model, prompt_version)
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO classifications"
+                " (content_hash, model, prompt_version, category, last_used)"
+                " VALUES (?, ?, ?, ?, ?)",
+                key + (category, time.time()),
+            )
+            if cursor.rowcount == 0:
+                self._conn.execute(
+                    "UPDATE classifications SET category = ?, last_used = ?"
+                    " WHERE content_hash = ? AND model = ? AND prompt_version = ?",
+                    (category, time.time()) + key,
+                )
+                return
+            self._size += 1
+            if self._size > self.max_entries:
+                self._evict()
+
+    def _evict(self):
+        keep = int(self.max_entries * EVICTION_TARGET)
+        self._conn.execute(
+            "DELETE FROM classifications WHERE rowid IN ("
+            " SELECT rowid FROM classifications ORDER BY last_used ASC LIMIT ?)",
+            (self._size - keep,),
+        )
+        self._size = self._conn.execute("SELECT COUNT(*) FROM classifications").fetchone()[0]
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the current number of entries."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": self._size,
+            }
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> ClassificationCache:
+    """Return the process-wide classification cache, opening it on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ClassificationCache()
+    return _cache
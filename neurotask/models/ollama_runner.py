@@ -1,51 +1,414 @@
 # models/ollama_runner.py
+import http.client
+import json
+import os
 import subprocess
+import threading
+import time
+from urllib.parse import urlsplit
+from neurotask.utils import instrumentation
+from neurotask.utils.logger import setup_logger
 
+logger = setup_logger(__name__)
+
+DEFAULT_MODEL = "gemma3:4b"
+DEFAULT_EMBED_MODEL = "nomic-embed-text"
+DEFAULT_HOST = "http://127.0.0.1:11434"
+# How long Ollama keeps the model resident after the last request.
+DEFAULT_KEEP_ALIVE = "30m"
+# Increased timeout to 300 seconds (5 minutes)
+REQUEST_TIMEOUT = 300
+# Seconds to wait before retrying the HTTP API after the server refused a connection.
+HTTP_RETRY_INTERVAL = 60
+
+
+class OllamaError(Exception):
+    """Raised when the Ollama HTTP API answers with a non-success status."""
+
+
+def split_host(host: str = None):
+    """
+    Resolve the Ollama server address.
+
+    Args:
+        host (str, optional): "host:port" or a URL; defaults to $OLLAMA_HOST or DEFAULT_HOST.
+
+    Returns:
+        tuple: (hostname, port).
+    """
+    host = host or os.environ.get("OLLAMA_HOST") or DEFAULT_HOST
+    if "://" not in host:
+        host = f"http://{host}"
+    parts = urlsplit(host)
+    return parts.hostname or "127.0.0.1", parts.port or 11434
+
+
+class OllamaClient:
+    """
+    Long-lived client for the local Ollama HTTP API.
+
+    Every thread keeps its own persistent keep-alive connection, so repeated
+    prompts reuse the same socket instead of paying connection setup (or a
+    whole `ollama run` process) per call. Requests are sent with `keep_alive`
+    so the model stays loaded between files.
+    """
+
+    def __init__(self, host: str = None, model: str = DEFAULT_MODEL,
+                 keep_alive: str = DEFAULT_KEEP_ALIVE, timeout: float = REQUEST_TIMEOUT,
+                 embed_model: str = None):
+        self.host, self.port = split_host(host)
+        self.model = model
+        self.embed_model = embed_model or os.environ.get("NEUROTASK_EMBED_MODEL") or DEFAULT_EMBED_MODEL
+        self.keep_alive = keep_alive
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def _reset_connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+        self._local.conn = None
+
+    def _request(self, path: str, payload: dict) -> http.client.HTTPResponse:
+        body = json.dumps(payload).encode("utf-8")
+        headers = {"Content-Type": "application/json", "Connection": "keep-alive"}
+        # A pooled connection may have been closed by the server while idle;
+        # retry once on a fresh socket before giving up.
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request("POST", path, body=body, headers=headers)
+                response = conn.getresponse()
+            except (http.client.HTTPException, ConnectionError):
+                self._reset_connection()
+                if attempt:
+                    raise
+                continue
+            except OSError:
+                self._reset_connection()
+                raise
+            if response.status != 200:
+                data = response.read()
+                raise OllamaError(f"HTTP {response.status}: {data.decode('utf-8', 'replace').strip()}")
+            return response
+
+    def _post(self, path: str, payload: dict) -> dict:
+        response = self._request(path, payload)
+        try:
+            return json.loads(response.read())
+        except (http.client.HTTPException, OSError):
+            self._reset_connection()
+            raise
+
+    @staticmethod
+    def _options(max_tokens: int = None, stop: list = None) -> dict:
+        options = {}
+        if max_tokens:
+            options["num_predict"] = max_tokens
+        if stop:
+            options["stop"] = list(stop)
+        return options
+
+    def generate(self, prompt: str, max_tokens: int = None, stop: list = None) -> str:
+        """
+        Send a single non-streaming generation request.
+
+        Args:
+            prompt (str): The prompt text to be processed by the LLM.
+            max_tokens (int, optional): Upper bound on generated tokens (`num_predict`).
+            stop (list, optional): Stop sequences that end generation on the server.
+
+        Returns:
+            str: The raw response text from the model.
+        """
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": False,
+            "keep_alive": self.keep_alive,
+        }
+        options = self._options(max_tokens, stop)
+        if options:
+            payload["options"] = options
+        data = self._post("/api/generate", payload)
+        instrumentation.count("llm_tokens", data.get("eval_count", 0))
+        return data.get("response", "")
+
+    def stream(self, prompt: str, max_tokens: int = None, stop: list = None):
+        """
+        Send a streaming generation request and yield tokens as they arrive.
+
+        Closing the generator before the model is done (e.g. breaking out of
+        the loop) drops the connection, which makes Ollama stop generating.
+
+        Args:
+            prompt (str): The prompt text to be processed by the LLM.
+            max_tokens (int, optional): Upper bound on generated tokens (`num_predict`).
+            stop (list, optional): Stop sequences that end generation on the server.
+
+        Yields:
+            str: Response fragments in order.
+        """
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": True,
+            "keep_alive": self.keep_alive,
+        }
+        options = self._options(max_tokens, stop)
+        if options:
+            payload["options"] = options
+        response = self._request("/api/generate", payload)
+        done = False
+        try:
+            while not done:
+                line = response.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise OllamaError(chunk["error"])
+                done = chunk.get("done", False)
+                if chunk.get("response"):
+                    instrumentation.count("llm_tokens")
+                    yield chunk["response"]
+        finally:
+            if done:
+                # Consume the end of the chunked body so the connection can be reused.
+                response.read()
+            else:
+                self._reset_connection()
+
+    def embed(self, texts: list) -> list:
+        """
+        Compute embedding vectors with the embedding model.
+
+        Args:
+            texts (list): The texts to embed.
+
+        Returns:
+            list: One vector (list of floats) per text, in input order.
+        """
+        payload = {
+            "model": self.embed_model,
+            "input": list(texts),
+            "keep_alive": self.keep_alive,
+        }
+        embeddings = self._post("/api/embed", payload).get("embeddings") or []
+        if len(embeddings) != len(texts):
+            raise OllamaError(f"expected {len(texts)} embeddings, got {len(embeddings)}")
+        return embeddings
+
+    def close(self):
+        """Close the calling thread's connection."""
+        self._reset_connection()
+
+
+_client = None
+_client_lock = threading.Lock()
+_http_retry_at = 0.0
+
+
+def get_client() -> OllamaClient:
+    """Return the process-wide Ollama client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = OllamaClient()
+    return _client
+
+
+@instrumentation.timed("llm")
 def run_llm(prompt: str) -> str:
     """
     Uses the local Gemma 3 model (via Ollama) to generate output for a given prompt.
-    
+
+    The Ollama HTTP API is tried first over a persistent connection; if the
+    server cannot be reached, the prompt is sent through `ollama run` instead.
+
     Args:
         prompt (str): The prompt text to be processed by the LLM.
-    
+
     Returns:
         str: The generated response from Gemma 3, or an empty string if an error occurs.
     """
+    global _http_retry_at
+    instrumentation.count("llm_requests")
+    if time.monotonic() >= _http_retry_at:
+        try:
+            response = get_client().generate(prompt).strip()
+            if not response:
+                logger.warning("[LLM] Empty response received from model")
+            return response
+        except TimeoutError as te:
+            logger.error("[LLM] The request timed out after %s seconds: %s", REQUEST_TIMEOUT, te)
+            return ""
+        except OllamaError as e:
+            logger.error("[LLM] Ollama returned error: %s", e)
+            return ""
+        except (OSError, http.client.HTTPException) as e:
+            logger.warning("[LLM] Ollama HTTP API unavailable (%s), falling back to `ollama run`", e)
+            _http_retry_at = time.monotonic() + HTTP_RETRY_INTERVAL
+        except Exception as e:
+            logger.error("[LLM] An error occurred while running the LLM: %s", e)
+            return ""
+    return _run_llm_subprocess(prompt)
+
+
+def stop_at_line_end(text: str):
+    """
+    Stop condition for run_llm_until: end the answer at its first line break.
+
+    Args:
+        text (str): The response received so far.
+
+    Returns:
+        str or None: The first non-empty line once it is complete, else None.
+    """
+    stripped = text.lstrip()
+    if "\n" in stripped:
+        return stripped.split("\n", 1)[0]
+    return None
+
+
+def stop_at_category(categories):
+    """
+    Build a stop condition that ends the answer at its first line break or as
+    soon as it exactly names one of `categories` (case-insensitive).
+
+    Args:
+        categories (iterable): Known answers, e.g. intent folder names.
+
+    Returns:
+        callable: A stop condition for run_llm_until.
+    """
+    known = {c.lower() for c in categories}
+
+    def until(text):
+        line = stop_at_line_end(text)
+        if line is not None:
+            return line
+        if text.strip().lower() in known:
+            return text.strip()
+        return None
+
+    return until
+
+
+@instrumentation.timed("llm")
+def run_llm_until(prompt: str, until=stop_at_line_end, max_tokens: int = None, stop: list = None) -> str:
+    """
+    Run a prompt with a streamed response and stop generating as soon as the
+    answer is known, instead of waiting for the model to finish rambling.
+
+    Tokens are read from the HTTP API as they arrive; after each one `until`
+    is called with the text so far, and generation is cancelled when it
+    returns an answer. `max_tokens` and `stop` are also passed to Ollama
+    (`num_predict` and stop sequences) so the server ends generation itself.
+    Without the HTTP API, the prompt goes through `ollama run` and `until` is
+    applied to the full response.
+
+    Args:
+        prompt (str): The prompt text to be processed by the LLM.
+        until (callable, optional): Stop condition taking the text so far and
+            returning the final answer, or None to keep reading.
+        max_tokens (int, optional): Upper bound on generated tokens.
+        stop (list, optional): Stop sequences for the server.
+
+    Returns:
+        str: The (possibly truncated) response, or an empty string if an error occurs.
+    """
+    global _http_retry_at
+    instrumentation.count("llm_requests")
+    if time.monotonic() >= _http_retry_at:
+        tokens = get_client().stream(prompt, max_tokens, stop)
+        text = ""
+        try:
+            for token in tokens:
+                text += token
+                answer = until(text) if until is not None else None
+                if answer is not None:
+                    return answer.strip()
+            if not text.strip():
+                logger.warning("[LLM] Empty response received from model")
+            return text.strip()
+        except TimeoutError as te:
+            logger.error("[LLM] The request timed out after %s seconds: %s", REQUEST_TIMEOUT, te)
+            return ""
+        except OllamaError as e:
+            logger.error("[LLM] Ollama returned error: %s", e)
+            return ""
+        except (OSError, http.client.HTTPException) as e:
+            if text:
+                logger.warning("[LLM] Connection lost mid-response: %s", e)
+                return text.strip()
+            logger.warning("[LLM] Ollama HTTP API unavailable (%s), falling back to `ollama run`", e)
+            _http_retry_at = time.monotonic() + HTTP_RETRY_INTERVAL
+        except Exception as e:
+            logger.error("[LLM] An error occurred while running the LLM: %s", e)
+            return ""
+        finally:
+            tokens.close()
+    response = _run_llm_subprocess(prompt)
+    answer = until(response + "\n") if until is not None and response else None
+    return response if answer is None else answer.strip()
+
+
+def _run_llm_subprocess(prompt: str) -> str:
+    """
+    Run the prompt through a fresh `ollama run` process.
+
+    Args:
+        prompt (str): The prompt text to be processed by the LLM.
+
+    Returns:
+        str: The generated response, or an empty string if an error occurs.
+    """
+    process = None
     try:
         # Start the subprocess to run the command
         process = subprocess.Popen(
-            ["ollama", "run", "gemma3:4b", prompt],  # Pass prompt directly as argument
+            ["ollama", "run", DEFAULT_MODEL, prompt],  # Pass prompt directly as argument
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             text=True
         )
-        
-        # Increased timeout to 300 seconds (5 minutes)
-        stdout, stderr = process.communicate(timeout=300)
-        
+
+        stdout, stderr = process.communicate(timeout=REQUEST_TIMEOUT)
+
         # Check if the process exited with an error
         if process.returncode != 0:
-            print(f"[LLM Error] Ollama returned error: {stderr}")
+            logger.error("[LLM] Ollama returned error: %s", stderr)
             return ""
-        
+
         # Clean and return the response
         response = stdout.strip()
         if not response:
-            print("[LLM Warning] Empty response received from model")
+            logger.warning("[LLM] Empty response received from model")
             return ""
-            
+
         return response
-    
+
     except subprocess.TimeoutExpired as te:
-        print(f"[LLM Timeout] The process timed out after 5 minutes: {te}")
+        logger.error("[LLM] The process timed out after 5 minutes: %s", te)
         process.kill()  # Ensure the process is terminated
         return ""
     except Exception as e:
-        print(f"[LLM Exception] An error occurred while running the LLM: {e}")
+        logger.error("[LLM] An error occurred while running the LLM: %s", e)
         return ""
 
 # Example usage:
 if __name__ == "__main__":
     test_prompt = "Summarize the following text in one sentence:\nNeurotask is designed to organize files based on AI analysis."
     response = run_llm(test_prompt)
-    print("Generated Response:", response)
\ No newline at end of file
+    print("Generated Response:", response)
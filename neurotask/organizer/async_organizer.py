@@ -0,0 +1,328 @@
+# organizer/async_organizer.py
+import asyncio
+import os
+from functools import partial
+from neurotask.file_manager.extractor import DEFAULT_MAX_BYTES, DEFAULT_TIMEOUT, ExtractionService
+from neurotask.file_manager.scanner import scan_directory
+from neurotask.models.async_ollama import AsyncOllamaClient
+from neurotask.models.llm_cache import content_hash, get_cache
+from neurotask.models.ollama_runner import stop_at_category
+from neurotask.organizer import extension_based, timeline_based
+from neurotask.organizer.intent_based import (
+    DEFAULT_LLM_CONCURRENCY, DEFAULT_WORKERS, FOLDER_PREFIX, INTENT_CATEGORIES, INTENT_MAX_TOKENS,
+    PROMPT_VERSION as INTENT_PROMPT_VERSION, UNKNOWN_INTENT, build_intent_prompt, clean_intent,
+)
+from neurotask.organizer.plan import PlannedMove, apply_plan
+from neurotask.organizer.rules import RuleSet, TierStats
+from neurotask.organizer.semantic_based import (
+    CHUNK_TOKEN_BUDGET, assignments_to_plan, build_semantic_prompt, cached_assignments,
+    chunk_filenames, parse_categorization, record_created_folders, reduce_assignments,
+)
+from neurotask.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Files being read or classified at once. Each costs a coroutine (not a
+# thread); reads are bounded by the extraction processes and prompts by the
+# client's concurrency limit.
+DEFAULT_MAX_IN_FLIGHT = 256
+
+
+async def _in_executor(func, *args, **kwargs):
+    # Blocking file system work runs on the loop's default thread pool.
+    return await asyncio.get_running_loop().run_in_executor(None, partial(func, *args, **kwargs))
+
+
+async def _scan(directory, entries):
+    if entries is None:
+        return await _in_executor(lambda: list(scan_directory(directory)))
+    return list(entries)
+
+
+async def plan_by_semantics_async(directory: str, use_cache: bool = True,
+                                  llm_concurrency: int = DEFAULT_LLM_CONCURRENCY,
+                                  token_budget: int = CHUNK_TOKEN_BUDGET, entries=None,
+                                  client: AsyncOllamaClient = None, progress=None):
+    """
+    asyncio variant of semantic_based.plan_by_semantics: all filename chunks
+    are sent as coroutines and at most `llm_concurrency` prompts run at once.
+    Once `progress` is cancelled, chunks still waiting for an LLM slot are not sent.
+
+    Args:
+        directory (str): The directory to organize.
+        use_cache (bool, optional): Whether to use the classification cache.
+        llm_concurrency (int, optional): Maximum number of chunks categorized at once.
+        token_budget (int, optional): Maximum estimated filename tokens per chunk.
+        entries (iterable, optional): ScanEntry objects to organize. Defaults to
+            the files directly inside `directory`.
+        client (AsyncOllamaClient, optional): Client to use; one is created
+            (and closed) for this call if omitted.
+        progress (ProgressReporter, optional): Receives a "categorize" event per
+            chunk and can cancel the run.
+
+    Returns:
+        list: PlannedMove objects.
+    """
+    if client is None:
+        async with AsyncOllamaClient(concurrency=llm_concurrency) as client:
+            return await plan_by_semantics_async(directory, use_cache, llm_concurrency,
+                                                 token_budget, entries, client, progress)
+
+    entries_by_name = {}
+    for entry in await _scan(directory, entries):
+        entries_by_name.setdefault(entry.name, []).append(entry)
+    filenames = list(entries_by_name)
+    if not filenames:
+        logger.info("No files found to organize.")
+        return []
+    logger.info("[Semantic Organizer] Found %d files to organize", len(filenames))
+
+    cache = get_cache() if use_cache else None
+    assignments = await _in_executor(cached_assignments, filenames, cache, client.model)
+    pending = [f for f in filenames if f not in assignments]
+    if pending:
+        chunks = chunk_filenames(pending, token_budget)
+        logger.info("[Semantic Organizer] Categorizing %d files in %d chunks", len(pending), len(chunks))
+        cancelled = None
+        if progress is not None:
+            progress.start_stage("categorize", len(pending))
+            cancelled = lambda: progress.cancelled
+
+        done = 0
+
+        async def classify(chunk):
+            nonlocal done
+            response = await client.run_until(build_semantic_prompt(chunk), until=None, cancelled=cancelled)
+            result = parse_categorization(response, chunk) if response else {}
+            # Reported as each chunk finishes, in completion order.
+            done += 1
+            logger.info("[Semantic Organizer] Chunk %d/%d done: %d of %d files categorized",
+                        done, len(chunks), len(result), len(chunk))
+            if progress is not None:
+                progress.advance(len(chunk))
+            return result
+
+        new_assignments = {}
+        results = await asyncio.gather(*(classify(chunk) for chunk in chunks), return_exceptions=True)
+        if cancelled is not None and cancelled():
+            logger.info("[Semantic Organizer] Cancelled, no files moved")
+            return []
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error("[Semantic Organizer] Chunk failed: %s", result)
+                result = {}
+            new_assignments.update(result)
+        if not new_assignments:
+            logger.error("LLM did not return any categorization. Please check if Ollama is running with Gemma 3 model.")
+            if not assignments:
+                return []
+        else:
+            # The merge prompt is a single blocking call; keep it off the loop.
+            await _in_executor(reduce_assignments, directory, assignments, new_assignments,
+                               len(chunks) > 1, cache, client.model)
+    return assignments_to_plan(directory, entries_by_name, assignments)
+
+
+async def plan_by_intents_async(directory: str, workers: int = DEFAULT_WORKERS,
+                                llm_concurrency: int = DEFAULT_LLM_CONCURRENCY, use_cache: bool = True,
+                                entries=None, extract_timeout: float = DEFAULT_TIMEOUT,
+                                max_bytes: int = DEFAULT_MAX_BYTES, index=None, budgets=None,
+                                rules: RuleSet = None, use_rules: bool = True,
+                                client: AsyncOllamaClient = None,
+                                max_in_flight: int = DEFAULT_MAX_IN_FLIGHT, progress=None):
+    """
+    asyncio variant of intent_based.plan_by_intents (one document per prompt).
+
+    Up to `max_in_flight` files are handled by coroutines at once: text is
+    extracted on a pool of `workers` processes (awaited, not blocking the
+    loop), then rules, cache and LLM are tried in turn as in the threaded
+    version. Once `progress` is cancelled no new file is started and prompts
+    still waiting for an LLM slot are not sent; requests already in flight
+    are finished.
+
+    Args:
+        directory (str): The directory to scan for files.
+        workers (int, optional): Number of text extraction processes.
+        llm_concurrency (int, optional): Maximum number of concurrent LLM requests.
+        use_cache (bool, optional): Whether to use the classification cache.
+        entries (iterable, optional): ScanEntry objects to organize. Defaults to
+            the files directly inside `directory`.
+        extract_timeout (float, optional): Seconds allowed for extracting one file.
+        max_bytes (int, optional): Files larger than this are not read.
+        index (FileIndex, optional): Index to reuse and store extracted text.
+        budgets (dict, optional): Maximum snippet characters per file extension.
+        rules (RuleSet, optional): Pre-classification rules; the default rules if omitted.
+        use_rules (bool, optional): Whether to run the rules before the LLM.
+        client (AsyncOllamaClient, optional): Client to use; one is created
+            (and closed) for this call if omitted.
+        max_in_flight (int, optional): Maximum number of files being processed at once.
+        progress (ProgressReporter, optional): Receives a "classify" event per
+            file and can cancel the run.
+
+    Returns:
+        list: PlannedMove objects.
+    """
+    if client is None:
+        async with AsyncOllamaClient(concurrency=llm_concurrency) as client:
+            return await plan_by_intents_async(directory, workers, llm_concurrency, use_cache, entries,
+                                               extract_timeout, max_bytes, index, budgets, rules,
+                                               use_rules, client, max_in_flight, progress)
+
+    cache = get_cache() if use_cache else None
+    if use_rules and rules is None:
+        rules = RuleSet()
+    tiers = TierStats()
+    until = stop_at_category(INTENT_CATEGORIES)
+    cancelled = (lambda: progress.cancelled) if progress is not None else None
+    entries = await _scan(directory, entries)
+    pending = iter(entries)
+    plan = []
+    if progress is not None:
+        progress.start_stage("classify", len(entries), sum(entry.size for entry in entries))
+
+    # Index and cache calls are SQLite queries and commits; they run in the
+    # default executor so a slow fsync does not stall every coroutine.
+    async def read(entry, extractor):
+        stored = await _in_executor(index.lookup_content, entry) if index is not None else None
+        if stored is not None:
+            return stored[1]
+        try:
+            result = await asyncio.wrap_future(extractor.submit(entry.path))
+        except Exception as e:
+            logger.warning("[Intent Organizer] Could not read %s: %s", entry.path, e)
+            return ""
+        if result.error:
+            # Not stored, so the next run reads the file again.
+            logger.warning("[Intent Organizer] Could not read %s: %s", entry.path, result.error)
+        elif index is not None:
+            await _in_executor(lambda: index.record_content(entry.path, content_hash(result.text), result.text))
+        return result.text
+
+    async def classify(content):
+        if not content.strip():
+            tiers.hit("unreadable")
+            return UNKNOWN_INTENT, "intent"
+        match = rules.classify(content) if use_rules else None
+        if match is not None:
+            tiers.hit("rules")
+            return match.intent, f"rule {'+'.join(match.rules)}"
+        intent = None
+        if cache is not None:
+            intent = clean_intent(await _in_executor(cache.get, content, client.model, INTENT_PROMPT_VERSION))
+        if intent:
+            tiers.hit("cache")
+            return intent, "intent"
+        if cancelled is not None and cancelled():
+            return None, None
+        answer = await client.run_until(build_intent_prompt(content), until,
+                                        max_tokens=INTENT_MAX_TOKENS, cancelled=cancelled)
+        if not answer and cancelled is not None and cancelled():
+            # Still waiting for an LLM slot when the run was cancelled: never sent.
+            return None, None
+        tiers.hit("llm")
+        intent = clean_intent(answer)
+        if not intent:
+            return UNKNOWN_INTENT, "intent"
+        if cache is not None:
+            await _in_executor(cache.put, content, client.model, INTENT_PROMPT_VERSION, intent)
+        return intent, "intent"
+
+    async def worker(extractor):
+        # Workers share one iterator, so each file is taken exactly once.
+        for entry in pending:
+            if progress is not None and progress.cancelled:
+                break
+            try:
+                intent, source = await classify(await read(entry, extractor))
+            except Exception as e:
+                logger.warning("[Intent Organizer] Could not classify %s: %s", entry.path, e)
+                intent, source = UNKNOWN_INTENT, "intent"
+            if intent is None:
+                # Cancelled before the file was classified.
+                break
+            dest_path = os.path.join(directory, f"{FOLDER_PREFIX}{intent}", entry.name)
+            plan.append(PlannedMove(entry.path, dest_path, f"{source} -> {intent}", entry.size))
+            logger.debug("[Intent Organizer] %s -> %s (%s)", entry.name, intent, source)
+            if progress is not None:
+                progress.advance(nbytes=entry.size)
+
+    with ExtractionService(max(1, workers), extract_timeout, max_bytes, budgets) as extractor:
+        await asyncio.gather(*(worker(extractor) for _ in range(max(1, min(max_in_flight, len(entries))))))
+
+    logger.info("[Intent Organizer] Answered by tier: %s", tiers.report())
+    if progress is not None and progress.cancelled:
+        # The plan holds only the files classified before the cancel.
+        logger.info("[Intent Organizer] Cancelled after %d of %d files, no files moved", len(plan), len(entries))
+        return []
+    return plan
+
+
+async def organize_by_extension_async(directory: str, extension_map, entries=None,
+                                      dry_run: bool = False, index=None, open_explorer: bool = True,
+                                      progress=None):
+    """Run extension_based.organize_by_extension off the event loop (it only touches the file system)."""
+    return await _in_executor(extension_based.organize_by_extension, directory, extension_map,
+                              entries=entries, dry_run=dry_run, index=index,
+                              open_explorer=open_explorer, progress=progress)
+
+
+async def organize_by_timeline_async(directory: str, entries=None, dry_run: bool = False, index=None,
+                                     granularity: str = timeline_based.DEFAULT_GRANULARITY,
+                                     date_source: str = timeline_based.DEFAULT_DATE_SOURCE,
+                                     workers: int = DEFAULT_WORKERS, progress=None):
+    """Run timeline_based.organize_by_timeline off the event loop (it only touches the file system)."""
+    return await _in_executor(timeline_based.organize_by_timeline, directory,
+                              entries=entries, dry_run=dry_run, index=index, granularity=granularity,
+                              date_source=date_source, workers=workers, progress=progress)
+
+
+async def organize_by_semantics_async(directory: str, use_cache: bool = True,
+                                      llm_concurrency: int = DEFAULT_LLM_CONCURRENCY,
+                                      token_budget: int = CHUNK_TOKEN_BUDGET, entries=None,
+                                      dry_run: bool = False, index=None, engine: str = "prompt",
+                                      embedder: str = "hashing", workers: int = DEFAULT_WORKERS,
+                                      client: AsyncOllamaClient = None, progress=None):
+    """
+    asyncio variant of semantic_based.organize_by_semantics.
+
+    The embedding engine is mostly matrix math and runs in a worker thread.
+    A cancelled `progress` stops the run before or during the moves.
+
+    Returns:
+        list: The move plan.
+    """
+    if engine == "embedding":
+        from neurotask.organizer.cluster_based import plan_by_clusters
+        plan = await _in_executor(plan_by_clusters, directory, embedder, use_cache, llm_concurrency,
+                                  entries, workers=workers, index=index)
+    else:
+        plan = await plan_by_semantics_async(directory, use_cache, llm_concurrency, token_budget,
+                                             entries, client, progress)
+    if not dry_run and plan and not (progress is not None and progress.cancelled):
+        await _in_executor(record_created_folders, directory,
+                           {os.path.basename(os.path.dirname(m.destination)) for m in plan})
+        await _in_executor(apply_plan, plan, index=index, progress=progress)
+    return plan
+
+
+async def organize_by_intents_async(directory: str, workers: int = DEFAULT_WORKERS,
+                                    llm_concurrency: int = DEFAULT_LLM_CONCURRENCY,
+                                    use_cache: bool = True, entries=None, dry_run: bool = False,
+                                    extract_timeout: float = DEFAULT_TIMEOUT,
+                                    max_bytes: int = DEFAULT_MAX_BYTES, index=None, budgets=None,
+                                    rules: RuleSet = None, use_rules: bool = True,
+                                    client: AsyncOllamaClient = None, progress=None):
+    """
+    asyncio variant of intent_based.organize_by_intents.
+
+    A cancelled `progress` stops the run before or during the moves.
+
+    Returns:
+        list: The move plan.
+    """
+    plan = await plan_by_intents_async(directory, workers, llm_concurrency, use_cache, entries,
+                                       extract_timeout, max_bytes, index, budgets, rules,
+                                       use_rules, client, progress=progress)
+    if not dry_run and plan:
+        await _in_executor(apply_plan, plan, index=index, progress=progress)
+    return plan
@@ -0,0 +1,238 @@
+# organizer/cluster_based.py
+import http.client
+import os
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from neurotask.file_manager.extractor import ExtractionService
+from neurotask.file_manager.reader import DEFAULT_BUDGETS
+from neurotask.file_manager.scanner import STATE_DIR_NAME, scan_directory
+from neurotask.models.llm_cache import content_hash, get_cache
+from neurotask.models.ollama_runner import OllamaError, get_client, run_llm_until
+from neurotask.organizer.plan import PlannedMove
+from neurotask.organizer.semantic_based import (
+    DEFAULT_LLM_CONCURRENCY, MISC_FOLDER, get_existing_categories, merge_categories,
+)
+from neurotask.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Bump whenever build_naming_prompt changes so cached names are not reused.
+PROMPT_VERSION = "cluster-name-v1"
+EMBEDDERS = ("hashing", "ollama")
+DEFAULT_EMBEDDER = "hashing"
+DEFAULT_WORKERS = 4
+# Clusters smaller than this, and files less similar than MIN_SIMILARITY to
+# their cluster centre, go to the Miscellaneous folder.
+MIN_CLUSTER_SIZE = 2
+MIN_SIMILARITY = 0.15
+# Filenames closest to the centre that are shown to the LLM when naming a cluster.
+REPRESENTATIVES = 8
+# Characters of document text added to a filename before vectorizing.
+SNIPPET_CHARS = 500
+MAX_FOLDER_NAME = 40
+# Generated-token cap for a cluster name; only its first line is used.
+NAME_MAX_TOKENS = 16
+# Words never used on their own as a fallback cluster name.
+STOPWORDS = {"the", "and", "for", "with", "from", "copy", "final", "new", "file", "untitled"}
+
+
+def build_naming_prompt(filenames):
+    """
+    Build the prompt asking the LLM to name one group of files.
+
+    Args:
+        filenames (list): Representative filenames of the group.
+
+    Returns:
+        str: The prompt to send to the LLM.
+    """
+    return (
+        "You are a file organization assistant. The following files were grouped together "
+        "because their names and contents are similar. Reply with a short, descriptive folder "
+        "name for the group (2-3 words max). Do not use generic names like 'Group 1' or 'Files'. "
+        "Reply with the folder name only.\n\n"
+        "Files:\n"
+        + "\n".join(filenames)
+        + "\n\nFolder name:"
+    )
+
+
+def sanitize_folder_name(name):
+    """Return a safe folder name from a model answer ("" if nothing usable remains)."""
+    name = name.strip().splitlines()[0] if name.strip() else ""
+    name = re.sub(r'[<>:"/\\|?*\x00-\x1f]+', " ", name).strip(" .'`*-")
+    return re.sub(r"\s+", " ", name)[:MAX_FOLDER_NAME].strip()
+
+
+def keyword_name(texts, extensions):
+    """
+    Name a cluster after its most common word, used when no LLM answer is available.
+
+    Args:
+        texts (list): Word texts (see filename_text) of the files in the cluster.
+        extensions (set): Extension words to ignore.
+
+    Returns:
+        str: A folder name, or "" if the texts have no usable words.
+    """
+    counts = Counter(word for text in texts for word in set(text.split())
+                     if len(word) > 2 and word not in extensions and word not in STOPWORDS)
+    if not counts:
+        return ""
+    return counts.most_common(1)[0][0].capitalize()
+
+
+def name_cluster(filenames, texts, cache=None):
+    """
+    Name one cluster with a single LLM call, falling back to its most common word.
+
+    Args:
+        filenames (list): Representative filenames, closest to the centre first.
+        texts (list): Word texts of all files in the cluster.
+        cache (ClassificationCache, optional): Cache of earlier names.
+
+    Returns:
+        str: The folder name ("" if none could be found).
+    """
+    key = "\n".join(sorted(filenames))
+    model = get_client().model
+    if cache is not None:
+        cached = cache.get(key, model, PROMPT_VERSION)
+        if cached is not None:
+            return cached
+    name = sanitize_folder_name(run_llm_until(build_naming_prompt(filenames), max_tokens=NAME_MAX_TOKENS))
+    if name and cache is not None:
+        cache.put(key, model, PROMPT_VERSION, name)
+    if not name:
+        extensions = {os.path.splitext(f)[1][1:].lower() for f in filenames}
+        name = keyword_name(texts, extensions)
+    return name
+
+
+def _snippets(entries, workers, index):
+    # Leading text of readable documents, reusing snippets stored in the index.
+    budgets = {ext: SNIPPET_CHARS for ext in DEFAULT_BUDGETS}
+    snippets = {}
+    to_read = []
+    for entry in entries:
+        if os.path.splitext(entry.name)[1].lower() not in DEFAULT_BUDGETS:
+            continue
+        stored = index.lookup_content(entry) if index is not None else None
+        if stored is not None:
+            snippets[entry.path] = stored[1][:SNIPPET_CHARS]
+        else:
+            to_read.append(entry.path)
+    if to_read:
+        with ExtractionService(workers, budgets=budgets) as extractor:
+            for result in extractor.extract_many(to_read):
+                if result.text:
+                    snippets[result.path] = result.text
+                    if index is not None:
+                        index.record_content(result.path, content_hash(result.text), result.text)
+    return snippets
+
+
+def vectorize(names, snippets, embedder=DEFAULT_EMBEDDER):
+    """
+    Compute one L2-normalized vector per file.
+
+    Args:
+        names (list): Filenames.
+        snippets (list): Document text per file ("" if none).
+        embedder (str, optional): "hashing" (offline TF-IDF) or "ollama"
+            (embedding endpoint, falling back to hashing if unavailable).
+
+    Returns:
+        tuple: (vector matrix, word texts used for fallback naming).
+    """
+    from neurotask.models import embeddings
+
+    texts = [embeddings.filename_text(name) for name in names]
+    if embedder == "ollama":
+        try:
+            return embeddings.ollama_embeddings(
+                [f"{name}\n{snippet}".strip() for name, snippet in zip(names, snippets)]), texts
+        except (OSError, OllamaError, http.client.HTTPException) as e:
+            logger.warning("[Cluster] Embedding endpoint unavailable (%s), using hashed TF-IDF", e)
+    vectors = embeddings.hashed_tfidf(
+        [f"{text} {snippet.lower()}" if snippet else text for text, snippet in zip(texts, snippets)])
+    return vectors, texts
+
+
+def plan_by_clusters(directory: str, embedder: str = DEFAULT_EMBEDDER, use_cache: bool = True,
+                     llm_concurrency: int = DEFAULT_LLM_CONCURRENCY, entries=None,
+                     clusters: int = None, workers: int = DEFAULT_WORKERS,
+                     with_snippets: bool = True, index=None):
+    """
+    Group files by clustering vectors of their names and leading text, without
+    moving anything.
+
+    Files are vectorized (see vectorize), over-clustered with spherical k-means,
+    and clusters with similar centroids are then merged again.
+    The LLM is only used to name each cluster, one short call per cluster, so
+    the run time is dominated by matrix math rather than generated tokens.
+
+    Args:
+        directory (str): The directory to organize.
+        embedder (str, optional): "hashing" or "ollama".
+        use_cache (bool, optional): Whether to reuse cached cluster names.
+        llm_concurrency (int, optional): Maximum number of clusters named at once.
+        entries (iterable, optional): ScanEntry objects to organize, e.g. from
+            walk_directory. Defaults to the files directly inside `directory`.
+        clusters (int, optional): Number of k-means clusters before merging; chosen
+            from the file count if omitted.
+        workers (int, optional): Number of text extraction processes.
+        with_snippets (bool, optional): Add document text to filenames before vectorizing.
+        index (FileIndex, optional): Index to reuse and store extracted text.
+
+    Returns:
+        list: PlannedMove objects.
+    """
+    from neurotask.models import embeddings
+
+    entries = list(scan_directory(directory) if entries is None else entries)
+    if not entries:
+        logger.info("No files found to organize.")
+        return []
+    logger.info("[Cluster] Found %d files to organize", len(entries))
+
+    snippets = _snippets(entries, workers, index) if with_snippets else {}
+    names = [entry.name for entry in entries]
+    vectors, texts = vectorize(names, [snippets.get(entry.path, "") for entry in entries], embedder)
+
+    k = clusters or embeddings.suggest_cluster_count(len(entries))
+    labels, similarity, centroids = embeddings.kmeans(vectors, k)
+    labels = embeddings.merge_clusters(labels, centroids)
+    members = {}
+    for i, label in enumerate(labels.tolist()):
+        if similarity[i] >= MIN_SIMILARITY:
+            members.setdefault(label, []).append(i)
+    members = {label: rows for label, rows in members.items() if len(rows) >= MIN_CLUSTER_SIZE}
+    logger.info("[Cluster] %d clusters from %d files (k=%d)", len(members), len(entries), k)
+
+    cache = get_cache() if use_cache else None
+
+    def name(rows):
+        rows = sorted(rows, key=lambda i: -similarity[i])
+        return name_cluster([names[i] for i in rows[:REPRESENTATIVES]], [texts[i] for i in rows], cache)
+
+    with ThreadPoolExecutor(max_workers=max(1, llm_concurrency)) as pool:
+        cluster_names = dict(zip(members, pool.map(name, members.values())))
+
+    # Fold clusters with the same (or nearly the same) name together, and onto
+    # folders that already exist.
+    anchors = set(get_existing_categories(directory)) - {STATE_DIR_NAME}
+    mapping = merge_categories([n for n in cluster_names.values() if n], anchors, use_llm=False)
+
+    folder_of = {}
+    for label, rows in members.items():
+        folder = mapping.get(cluster_names[label]) or MISC_FOLDER
+        for i in rows:
+            folder_of[i] = folder
+    plan = []
+    for i, entry in enumerate(entries):
+        folder = folder_of.get(i, MISC_FOLDER)
+        reason = "cluster -> uncategorized" if folder == MISC_FOLDER else f"cluster -> {folder}"
+        plan.append(PlannedMove(entry.path, os.path.join(directory, folder, entry.name), reason, entry.size))
+    return plan
@@ -1,34 +1,88 @@
 import os
 import platform
-from neurotask.file_manager.mover import move_file
-from typing import Dict
+from neurotask.file_manager.scanner import scan_directory
+from neurotask.organizer.plan import PlannedMove, apply_plan
+from neurotask.utils.config import ExtensionIndex, compile_extension_index
+from typing import Dict, Union
+from neurotask.utils.logger import setup_logger
 
-def organize_by_extension(directory: str, extension_map: Dict[str, list]):
+logger = setup_logger(__name__)
+
+def _as_index(extension_map) -> ExtensionIndex:
+    if isinstance(extension_map, ExtensionIndex):
+        return extension_map
+    return compile_extension_index(extension_map)
+
+def category_folders(extension_map: Union[ExtensionIndex, Dict[str, list]]) -> set:
+    """
+    Return the names of the folders organize_by_extension creates.
+
+    Args:
+        extension_map (ExtensionIndex or dict): The compiled extension index, or a
+            mapping of category names to file extensions.
+
+    Returns:
+        set: Folder names.
+    """
+    return set(_as_index(extension_map).folders)
+
+def plan_by_extension(directory: str, extension_map: Union[ExtensionIndex, Dict[str, list]],
+                      entries=None):
+    """
+    Decide where each file goes based on its file extension, without moving anything.
+
+    Args:
+        directory (str): The directory to scan for files.
+        extension_map (ExtensionIndex or dict): The compiled extension index from
+            load_config, or a mapping of category names to file extensions.
+        entries (iterable, optional): ScanEntry objects to organize, e.g. from
+            walk_directory. Defaults to the files directly inside `directory`.
+
+    Returns:
+        list: PlannedMove objects.
+    """
+    index = _as_index(extension_map)
+    if entries is None:
+        entries = scan_directory(directory)
+    plan = []
+    for entry in entries:
+        target_category = index.lookup(entry.name)
+        if target_category:
+            dest_path = os.path.join(directory, target_category, entry.name)
+            plan.append(PlannedMove(entry.path, dest_path, f"extension -> {target_category}", entry.size))
+    return plan
+
+def organize_by_extension(directory: str, extension_map: Union[ExtensionIndex, Dict[str, list]],
+                          entries=None, dry_run: bool = False, index=None,
+                          open_explorer: bool = True, progress=None):
     """
     Organize files in the given directory based on their file extension.
     After organization, opens the target directory in the system file explorer.
 
     Args:
         directory (str): The directory to scan for files.
-        extension_map (dict): A mapping of category names to file extensions.
-    """
-    # First organize all files
-    for filename in os.listdir(directory):
-        file_path = os.path.join(directory, filename)
-        if os.path.isfile(file_path):
-            _, ext = os.path.splitext(filename)
-            ext = ext.lower()
-            target_category = None
-            for category, extensions in extension_map.items():
-                if ext in extensions:
-                    target_category = category.capitalize()
-                    break
-            if target_category:
-                dest_folder = os.path.join(directory, target_category)
-                move_file(file_path, dest_folder)
-    
+        extension_map (ExtensionIndex or dict): The compiled extension index from
+            load_config, or a mapping of category names to file extensions.
+        entries (iterable, optional): ScanEntry objects to organize, e.g. from
+            walk_directory. Defaults to the files directly inside `directory`.
+        dry_run (bool, optional): Only build the plan; do not move anything.
+        index (FileIndex, optional): Index updated with each file's new location.
+        open_explorer (bool, optional): Open the directory afterwards (off in watch mode).
+        progress (ProgressReporter, optional): Receives move progress and can cancel the run.
+
+    Returns:
+        list: The move plan.
+    """
+    # First plan, then organize all files
+    plan = plan_by_extension(directory, extension_map, entries)
+    if dry_run:
+        return plan
+    apply_plan(plan, index=index, progress=progress)
+
     # After organization completes, open the directory
-    open_directory_in_explorer(directory)
+    if open_explorer:
+        open_directory_in_explorer(directory)
+    return plan
 
 def open_directory_in_explorer(path: str):
     """
@@ -45,4 +99,4 @@ def open_directory_in_explorer(path: str):
         else:  # Linux and other Unix-like systems
             os.system(f'xdg-open "{path}"')
     except Exception as e:
-        print(f"Error opening directory: {e}")
\ No newline at end of file
+        logger.warning("Error opening directory: %s", e)
\ No newline at end of file
@@ -1,10 +1,429 @@
 # organizer/intent_based.py
+import json
 import os
-from neurotask.file_manager.reader import read_first_page
-from neurotask.file_manager.mover import move_file
-from neurotask.models.ollama_runner import run_llm
+import re
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from neurotask.file_manager.extractor import DEFAULT_MAX_BYTES, DEFAULT_TIMEOUT, ExtractionService
+from neurotask.file_manager.scanner import scan_directory
+from neurotask.organizer.plan import PlannedMove, apply_plan
+from neurotask.models.ollama_runner import get_client, run_llm_until, stop_at_category
+from neurotask.models.llm_cache import content_hash, get_cache
+from neurotask.organizer.rules import RuleSet, TierStats
+from neurotask.organizer.semantic_based import estimate_tokens
+from neurotask.utils.logger import setup_logger
 
-def organize_by_intents(directory: str):
+logger = setup_logger(__name__)
+
+# Bump whenever build_intent_prompt or build_batch_prompt changes so cached
+# answers are not reused. Both prompts offer the same categories, so single
+# and batched runs share cached answers.
+PROMPT_VERSION = "intent-v2"
+DEFAULT_WORKERS = 4
+DEFAULT_LLM_CONCURRENCY = 2
+UNKNOWN_INTENT = "Unknown_Intent"
+FOLDER_PREFIX = "Intent_"
+# Batched classification: documents per prompt, the token budget for their
+# snippets, and the characters of each document included.
+DEFAULT_BATCH_SIZE = 1
+BATCH_TOKEN_BUDGET = 4000
+BATCH_SNIPPET_CHARS = 1000
+# Times the documents missing from a batched answer are asked for again
+# before falling back to one prompt per document.
+BATCH_RETRIES = 1
+MAX_INTENT_LENGTH = 40
+# Categories offered by the prompts; generation stops as soon as the answer names one.
+# The default rules (rules.DEFAULT_RULES) only answer with these categories too.
+INTENT_CATEGORIES = ("To_Read", "To_Sign", "To_Pay", "To_Review", "To_Complete", "To_Reply", "To_File",
+                     "Reference")
+# Generated-token caps: one category name, and one JSON entry per batched document.
+INTENT_MAX_TOKENS = 16
+BATCH_TOKENS_PER_DOCUMENT = 16
+
+def build_intent_prompt(content: str) -> str:
+    """
+    Build the classification prompt for a single document.
+
+    Args:
+        content (str): Text extracted from the document.
+
+    Returns:
+        str: The prompt to send to the LLM.
+    """
+    return (
+        "You are a document categorization assistant. Your task is to determine the most appropriate "
+        "action category for a document based on its content.\n\n"
+        "Instructions:\n"
+        "1. Analyze the document content carefully\n"
+        "2. Determine what the next logical action should be for this document\n"
+        f"3. Choose the most suitable category from: {', '.join(INTENT_CATEGORIES)}\n"
+        "4. If none of these fit, suggest a concise, action-oriented category (2-3 words max)\n"
+        "5. Output only the category name, nothing else\n\n"
+        "Document content:\n"
+        f"{content}\n\n"
+        "Document category:"
+    )
+
+def classify_intent(content: str, cache=None, tiers=None) -> str:
+    """
+    Ask the LLM for the intent of a document.
+
+    Args:
+        content (str): Text extracted from the document.
+        cache (ClassificationCache, optional): Cache consulted before calling the LLM.
+        tiers (TierStats, optional): Counts whether the cache or the LLM answered.
+
+    Returns:
+        str: Intent name suitable for use in a folder name.
+    """
+    if not content.strip():
+        if tiers is not None:
+            tiers.hit("unreadable")
+        return UNKNOWN_INTENT
+    model = get_client().model
+    if cache is not None:
+        intent = clean_intent(cache.get(content, model, PROMPT_VERSION))
+        if intent:
+            if tiers is not None:
+                tiers.hit("cache")
+            return intent
+    if tiers is not None:
+        tiers.hit("llm")
+    # The answer becomes a folder name; anything that is not a short,
+    # path-safe category (e.g. a sentence from the `ollama run` fallback) is rejected.
+    intent = clean_intent(run_llm_until(build_intent_prompt(content), stop_at_category(INTENT_CATEGORIES),
+                                        max_tokens=INTENT_MAX_TOKENS))
+    if not intent:
+        return UNKNOWN_INTENT
+    if cache is not None:
+        cache.put(content, model, PROMPT_VERSION, intent)
+    return intent
+
+def build_batch_prompt(documents) -> str:
+    """
+    Build one classification prompt for several documents.
+
+    Args:
+        documents (list): (id, content) pairs.
+
+    Returns:
+        str: The prompt to send to the LLM.
+    """
+    parts = [
+        "You are a document categorization assistant. Your task is to determine the most appropriate "
+        "action category for each of the documents below based on its content.\n\n"
+        "Instructions:\n"
+        "1. Analyze each document's content separately\n"
+        "2. Determine what the next logical action should be for that document\n"
+        f"3. Choose the most suitable category from: {', '.join(INTENT_CATEGORIES)}\n"
+        "4. If none of these fit, suggest a concise, action-oriented category (2-3 words max)\n"
+        "5. Output only a JSON object mapping every document id to its category, e.g. "
+        '{"1": "To_Read", "2": "To_Sign"}, nothing else\n\n'
+    ]
+    for doc_id, content in documents:
+        parts.append(f"=== Document {doc_id} ===\n{content[:BATCH_SNIPPET_CHARS]}\n\n")
+    parts.append("JSON:")
+    return "".join(parts)
+
+def clean_intent(intent) -> str:
+    """
+    Validate one category from an LLM answer and make it usable as a folder name.
+
+    Args:
+        intent: The value the model returned for a document.
+
+    Returns:
+        str: The intent, or "" if the value is not a usable category.
+    """
+    if not isinstance(intent, str):
+        return ""
+    intent = intent.strip().replace(" ", "_")
+    if not intent or len(intent) > MAX_INTENT_LENGTH or re.search(r'[\n<>:"/\\|?*]', intent):
+        return ""
+    return intent
+
+def json_object_end(text: str):
+    """
+    Stop condition for batched answers: end the response once it contains a
+    complete JSON object, so the model is not left explaining its answer.
+
+    Args:
+        text (str): The response received so far.
+
+    Returns:
+        str or None: The text up to the closing brace, or None if not complete yet.
+    """
+    start, end = text.find("{"), text.rfind("}")
+    if start < 0 or end < start:
+        return None
+    try:
+        json.loads(text[start:end + 1])
+    except ValueError:
+        return None
+    return text[:end + 1]
+
+def parse_batch_response(response: str, ids) -> dict:
+    """
+    Parse the JSON object of a batched answer.
+
+    Args:
+        response (str): The raw LLM response (may be wrapped in a code fence).
+        ids (iterable): The document ids that were asked for.
+
+    Returns:
+        dict: Mapping of id to intent for every id with a valid answer.
+    """
+    start, end = response.find("{"), response.rfind("}")
+    if start < 0 or end < start:
+        return {}
+    try:
+        answer = json.loads(response[start:end + 1])
+    except ValueError:
+        return {}
+    if not isinstance(answer, dict):
+        return {}
+    intents = {}
+    for doc_id in ids:
+        intent = clean_intent(answer.get(doc_id))
+        if intent:
+            intents[doc_id] = intent
+    return intents
+
+def classify_batch(contents, cache=None, tiers=None):
+    """
+    Ask the LLM for the intents of several documents with one prompt.
+
+    Documents already in the cache are not sent. Documents whose answer is
+    missing or invalid are asked for again (keeping their ids) up to
+    BATCH_RETRIES times, then classified one by one with classify_intent.
+
+    Args:
+        contents (list): Text extracted from each document.
+        cache (ClassificationCache, optional): Cache consulted before calling the LLM.
+        tiers (TierStats, optional): Counts whether the cache or the LLM answered.
+
+    Returns:
+        list: One intent per document, in input order.
+    """
+    model = get_client().model
+    intents = [None] * len(contents)
+    todo = []
+    for i, content in enumerate(contents):
+        if not content.strip():
+            intents[i] = UNKNOWN_INTENT
+            if tiers is not None:
+                tiers.hit("unreadable")
+            continue
+        intent = clean_intent(cache.get(content, model, PROMPT_VERSION)) if cache is not None else None
+        if intent:
+            intents[i] = intent
+            if tiers is not None:
+                tiers.hit("cache")
+        else:
+            todo.append(i)
+
+    for attempt in range(BATCH_RETRIES + 1):
+        if not todo:
+            break
+        if attempt:
+            logger.info("[Intent Organizer] Re-asking for %d documents missing from the batch answer", len(todo))
+        ids = {str(i + 1): i for i in todo}
+        response = run_llm_until(build_batch_prompt([(doc_id, contents[i]) for doc_id, i in ids.items()]),
+                                 json_object_end, max_tokens=BATCH_TOKENS_PER_DOCUMENT * len(ids) + 16)
+        answered = parse_batch_response(response, ids)
+        for doc_id, intent in answered.items():
+            i = ids[doc_id]
+            intents[i] = intent
+            if cache is not None:
+                cache.put(contents[i], model, PROMPT_VERSION, intent)
+        if tiers is not None:
+            tiers.hit("llm", len(answered))
+        todo = [i for i in todo if intents[i] is None]
+
+    for i in todo:
+        # Uncached here, so classify_intent asks the LLM (and counts it).
+        intents[i] = classify_intent(contents[i], None, tiers)
+        if cache is not None and intents[i] != UNKNOWN_INTENT:
+            cache.put(contents[i], model, PROMPT_VERSION, intents[i])
+    return intents
+
+def _classify_one(content, cache, tiers):
+    return [classify_intent(content, cache, tiers)]
+
+def is_intent_folder(name: str) -> bool:
+    """
+    Check whether a folder name is one organize_by_intents creates.
+
+    Args:
+        name (str): The folder name.
+
+    Returns:
+        bool: True for "Intent_*" folders.
+    """
+    return name.startswith(FOLDER_PREFIX)
+
+def plan_by_intents(directory: str, workers: int = DEFAULT_WORKERS,
+                    llm_concurrency: int = DEFAULT_LLM_CONCURRENCY, use_cache: bool = True,
+                    entries=None, extract_timeout: float = DEFAULT_TIMEOUT,
+                    max_bytes: int = DEFAULT_MAX_BYTES, index=None, budgets=None,
+                    batch_size: int = DEFAULT_BATCH_SIZE, token_budget: int = BATCH_TOKEN_BUDGET,
+                    rules: RuleSet = None, use_rules: bool = True):
+    """
+    Decide the intent folder (e.g., To_Read, To_Sign) for each file, without
+    moving anything.
+
+    Text extraction on a pool of `workers` processes overlaps with LLM
+    classification, which has at most `llm_concurrency` requests in flight;
+    each file is added to the plan as soon as its classification completes.
+    Documents whose text was classified before are answered from the on-disk
+    cache without calling the LLM, and unchanged files whose text is stored in
+    the directory's FileIndex are not read again.
+
+    Every snippet first goes through the keyword/regex rules; only documents
+    no rule classifies with enough confidence go on to the cache and the LLM.
+
+    With `batch_size` > 1, up to that many documents (within `token_budget`
+    estimated snippet tokens) are classified with one prompt, so the
+    instruction header and generation overhead are paid once per batch.
+
+    Args:
+        directory (str): The directory to scan for files.
+        workers (int, optional): Number of text extraction processes.
+        llm_concurrency (int, optional): Maximum number of concurrent LLM requests.
+        use_cache (bool, optional): Whether to use the classification cache.
+        entries (iterable, optional): ScanEntry objects to organize, e.g. from
+            walk_directory. Defaults to the files directly inside `directory`.
+        extract_timeout (float, optional): Seconds allowed for extracting one file.
+        max_bytes (int, optional): Files larger than this are not read.
+        index (FileIndex, optional): Index to reuse and store extracted text.
+        budgets (dict, optional): Maximum snippet characters per file extension.
+        batch_size (int, optional): Documents per LLM prompt.
+        token_budget (int, optional): Maximum estimated snippet tokens per batched prompt.
+        rules (RuleSet, optional): Pre-classification rules; the default rules if omitted.
+        use_rules (bool, optional): Whether to run the rules before the LLM.
+
+    Returns:
+        list: PlannedMove objects.
+    """
+    cache = get_cache() if use_cache else None
+    start_stats = cache.stats() if cache is not None else None
+    workers = max(1, workers)
+    llm_concurrency = max(1, llm_concurrency)
+    batch_size = max(1, batch_size)
+    if use_rules and rules is None:
+        rules = RuleSet()
+    tiers = TierStats()
+    if entries is None:
+        entries = scan_directory(directory)
+    pending_entries = iter(list(entries))
+    plan = []
+    # Cap the number of files between reading and moving so extracted text
+    # does not pile up in memory while the LLM stage is the bottleneck.
+    max_buffered = workers + 2 * llm_concurrency * batch_size
+
+    with ExtractionService(workers, extract_timeout, max_bytes, budgets) as extractor, \
+            ThreadPoolExecutor(max_workers=llm_concurrency) as llm_pool:
+        stages = {}
+        # Files read (or being read) but not yet planned, and extracted
+        # documents waiting for their batch to fill up.
+        buffered = 0
+        reading = 0
+        batch = []
+        batch_tokens = 0
+
+        def flush_batch():
+            nonlocal batch, batch_tokens
+            if not batch:
+                return
+            entries_in_batch = [entry for entry, _ in batch]
+            if batch_size == 1:
+                future = llm_pool.submit(_classify_one, batch[0][1], cache, tiers)
+            else:
+                future = llm_pool.submit(classify_batch, [content for _, content in batch], cache, tiers)
+            stages[future] = ("classify", entries_in_batch)
+            batch = []
+            batch_tokens = 0
+
+        def queue_content(entry, content):
+            nonlocal batch_tokens, buffered
+            match = rules.classify(content) if use_rules else None
+            if match is not None:
+                tiers.hit("rules")
+                buffered -= 1
+                dest_path = os.path.join(directory, f"{FOLDER_PREFIX}{match.intent}", entry.name)
+                plan.append(PlannedMove(entry.path, dest_path,
+                                        f"rule {'+'.join(match.rules)} -> {match.intent}", entry.size))
+                return
+            tokens = estimate_tokens(content[:BATCH_SNIPPET_CHARS])
+            if batch and batch_tokens + tokens > token_budget:
+                flush_batch()
+            batch.append((entry, content))
+            batch_tokens += tokens
+            if len(batch) >= batch_size:
+                flush_batch()
+
+        def submit_reads():
+            nonlocal buffered, reading
+            while buffered < max_buffered:
+                entry = next(pending_entries, None)
+                if entry is None:
+                    break
+                buffered += 1
+                stored = index.lookup_content(entry) if index is not None else None
+                if stored is not None:
+                    queue_content(entry, stored[1])
+                else:
+                    stages[extractor.submit(entry.path)] = ("read", [entry])
+                    reading += 1
+            if not reading:
+                # Nothing more will arrive soon; do not wait for a full batch.
+                flush_batch()
+
+        submit_reads()
+        while stages:
+            done, _ = wait(stages, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, stage_entries = stages.pop(future)
+                if stage == "read":
+                    reading -= 1
+                    entry = stage_entries[0]
+                    try:
+                        result = future.result()
+                        content = result.text
+                        if result.error:
+                            logger.warning("[Intent Organizer] Could not read %s: %s", entry.path, result.error)
+                        elif index is not None:
+                            # Failed reads are not stored, so the next run reads the file again.
+                            index.record_content(entry.path, content_hash(content), content)
+                    except Exception as e:
+                        logger.warning("[Intent Organizer] Could not read %s: %s", entry.path, e)
+                        content = ""
+                    queue_content(entry, content)
+                else:
+                    try:
+                        intents = future.result()
+                    except Exception as e:
+                        logger.warning("[Intent Organizer] Could not classify %d files: %s", len(stage_entries), e)
+                        intents = [UNKNOWN_INTENT] * len(stage_entries)
+                    buffered -= len(stage_entries)
+                    for entry, intent in zip(stage_entries, intents):
+                        dest_path = os.path.join(directory, f"{FOLDER_PREFIX}{intent}", entry.name)
+                        plan.append(PlannedMove(entry.path, dest_path, f"intent -> {intent}", entry.size))
+                        logger.debug("[Intent Organizer] %s -> %s", entry.name, intent)
+            submit_reads()
+
+    if cache is not None:
+        stats = cache.stats()
+        logger.info("[Cache] %d hits, %d misses",
+                    stats["hits"] - start_stats["hits"], stats["misses"] - start_stats["misses"])
+    logger.info("[Intent Organizer] Answered by tier: %s", tiers.report())
+    return plan
+
+def organize_by_intents(directory: str, workers: int = DEFAULT_WORKERS,
+                        llm_concurrency: int = DEFAULT_LLM_CONCURRENCY, use_cache: bool = True,
+                        entries=None, dry_run: bool = False, extract_timeout: float = DEFAULT_TIMEOUT,
+                        max_bytes: int = DEFAULT_MAX_BYTES, index=None, budgets=None,
+                        batch_size: int = DEFAULT_BATCH_SIZE, rules: RuleSet = None,
+                        use_rules: bool = True):
     """
     Organize files by inferring the document's intent or next action.
     Uses the LLM to decide what should be done with the file (e.g., To_Read, To_Sign)
@@ -12,29 +431,26 @@ def organize_by_intents(directory: str):
 
     Args:
         directory (str): The directory to scan for files.
+        workers (int, optional): Number of text extraction processes.
+        llm_concurrency (int, optional): Maximum number of concurrent LLM requests.
+        use_cache (bool, optional): Whether to use the classification cache.
+        entries (iterable, optional): ScanEntry objects to organize, e.g. from
+            walk_directory. Defaults to the files directly inside `directory`.
+        dry_run (bool, optional): Only build the plan; do not move anything.
+        extract_timeout (float, optional): Seconds allowed for extracting one file.
+        max_bytes (int, optional): Files larger than this are not read.
+        index (FileIndex, optional): Index of already processed files to consult and update.
+        budgets (dict, optional): Maximum snippet characters per file extension.
+        batch_size (int, optional): Documents per LLM prompt.
+        rules (RuleSet, optional): Pre-classification rules; the default rules if omitted.
+        use_rules (bool, optional): Whether to run the rules before the LLM.
+
+    Returns:
+        list: The move plan.
     """
-    for filename in os.listdir(directory):
-        file_path = os.path.join(directory, filename)
-        if os.path.isfile(file_path):
-            content = read_first_page(file_path)
-            if not content.strip():
-                intent = "Unknown_Intent"
-            else:
-                prompt = (
-                    "You are a document categorization assistant. Your task is to determine the most appropriate "
-                    "action category for a document based on its content.\n\n"
-                    "Instructions:\n"
-                    "1. Analyze the document content carefully\n"
-                    "2. Determine what the next logical action should be for this document\n"
-                    "3. Choose the most suitable category from: To_Read, To_Sign, To_Review, To_Complete, To_Reply, To_File, Reference\n"
-                    "4. If none of these fit, suggest a concise, action-oriented category (2-3 words max)\n"
-                    "5. Output only the category name, nothing else\n\n"
-                    "Document content:\n"
-                    f"{content}\n\n"
-                    "Document category:"
-                )
-                intent = run_llm(prompt)
-                # Cleanup intent text for folder naming.
-                intent = intent.strip().replace(" ", "_")
-            dest_folder = os.path.join(directory, f"Intent_{intent}")
-            move_file(file_path, dest_folder)
+    plan = plan_by_intents(directory, workers, llm_concurrency, use_cache, entries,
+                           extract_timeout, max_bytes, index, budgets, batch_size,
+                           rules=rules, use_rules=use_rules)
+    if not dry_run:
+        apply_plan(plan, index=index)
+    return plan
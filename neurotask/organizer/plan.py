@@ -0,0 +1,216 @@
+# organizer/plan.py
+import json
+import os
+from typing import Iterable, List, NamedTuple
+from neurotask.file_manager.mover import BatchMover
+from neurotask.utils import instrumentation
+from neurotask.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class PlannedMove(NamedTuple):
+    """One file move decided by an organizer."""
+    source: str
+    destination: str
+    reason: str
+    size: int = 0
+
+
+@instrumentation.timed("plan")
+def resolve_collisions(plan: Iterable[PlannedMove]) -> List[PlannedMove]:
+    """
+    Give every planned destination a unique name.
+
+    Each destination folder is listed once; names already present there or
+    claimed by an earlier move in the plan get a numeric suffix
+    ("report_1.pdf"). Moves whose source already is the destination are dropped.
+
+    Args:
+        plan (iterable): The planned moves.
+
+    Returns:
+        list: The moves with collision-free destinations.
+    """
+    taken = {}
+    resolved = []
+    for move in plan:
+        if os.path.abspath(move.source) == os.path.abspath(move.destination):
+            continue
+        folder, name = os.path.split(move.destination)
+        names = taken.get(folder)
+        if names is None:
+            try:
+                names = {os.path.normcase(n) for n in os.listdir(folder)}
+            except OSError:
+                names = set()
+            taken[folder] = names
+        base, ext = os.path.splitext(name)
+        candidate = name
+        counter = 1
+        while os.path.normcase(candidate) in names:
+            candidate = f"{base}_{counter}{ext}"
+            counter += 1
+        names.add(os.path.normcase(candidate))
+        resolved.append(move._replace(destination=os.path.join(folder, candidate)))
+    return resolved
+
+
+# What happens to byte-identical copies found by the dedup stage (see plan_duplicates).
+DEDUP_POLICIES = ("skip", "move", "hardlink")
+DUPLICATES_FOLDER = "Duplicates"
+
+
+def plan_duplicates(plan: Iterable[PlannedMove], duplicates: dict, policy: str,
+                    directory: str) -> List[PlannedMove]:
+    """
+    Plan moves for the duplicates removed from an organizer's input.
+
+    Policies:
+        "skip": duplicates stay where they are.
+        "move": duplicates go to the Duplicates folder in `directory`.
+        "hardlink": duplicates follow their first copy into its folder, so
+            they reuse its classification; the caller replaces them with
+            hard links (see dedup.link_duplicates).
+
+    Args:
+        plan (iterable): The organizer's moves for the first copies.
+        duplicates (dict): {first copy path: [duplicate ScanEntry objects]}.
+        policy (str): One of DEDUP_POLICIES.
+        directory (str): The organized directory.
+
+    Returns:
+        list: Moves for the duplicates.
+    """
+    if policy not in DEDUP_POLICIES:
+        raise ValueError(f"unknown dedup policy: {policy}")
+    if policy == "skip":
+        return []
+    destinations = {move.source: move.destination for move in plan}
+    moves = []
+    for original, copies in duplicates.items():
+        name = os.path.basename(original)
+        if policy == "move":
+            folder = os.path.join(directory, DUPLICATES_FOLDER)
+            reason = f"duplicate of {name}"
+        elif original in destinations:
+            folder = os.path.dirname(destinations[original])
+            reason = f"duplicate of {name} -> {os.path.basename(folder)}"
+        else:
+            # The first copy stays in place, so its duplicates do too.
+            continue
+        for entry in copies:
+            moves.append(PlannedMove(entry.path, os.path.join(folder, entry.name), reason, entry.size))
+    return moves
+
+
+def apply_plan(plan: Iterable[PlannedMove], run_id: str = None, index=None, progress=None) -> dict:
+    """
+    Carry out a move plan.
+
+    All destination folders are created up front and name collisions are
+    resolved in bulk before the first file is moved. Moves go through a
+    journaling BatchMover, so the run can be rolled back with `--undo`.
+    Cancelling `progress` stops the run between two moves; the moves done
+    so far stay journaled.
+
+    Args:
+        plan (iterable): The planned moves.
+        run_id (str, optional): Identifier for the run's journal; generated if omitted.
+        index (FileIndex, optional): Index updated with each file's new location.
+        progress (ProgressReporter, optional): Receives a "move" stage event per
+            file and the run id, and can cancel the run.
+
+    Returns:
+        dict: The run id, counts of moved and failed files, the number of bytes
+            moved and whether the run was cancelled.
+    """
+    moves = resolve_collisions(plan)
+    summary = {"run_id": None, "moved": 0, "failed": 0, "bytes": 0, "cancelled": False}
+    if not moves:
+        logger.info("[Apply] Nothing to move")
+        return summary
+
+    with BatchMover(run_id) as mover:
+        summary["run_id"] = mover.run_id
+        if progress is not None:
+            progress.run_id = mover.run_id
+        for folder in sorted({os.path.dirname(move.destination) for move in moves}):
+            try:
+                mover.ensure_folder(folder)
+            except OSError as e:
+                # The moves into this folder will fail and be counted below.
+                logger.error("Error creating folder %s: %s", folder, e)
+        if progress is not None:
+            progress.start_stage("move", len(moves), sum(move.size for move in moves))
+        for move in moves:
+            if progress is not None and progress.cancelled:
+                summary["cancelled"] = True
+                break
+            if mover.move(move.source, move.destination):
+                logger.debug("[Apply] %s -> %s (%s)", move.source, move.destination, move.reason)
+                if index is not None:
+                    category = os.path.basename(os.path.dirname(move.destination))
+                    index.record_move(move.source, move.destination, category)
+                summary["moved"] += 1
+                summary["bytes"] += move.size
+            else:
+                summary["failed"] += 1
+            if progress is not None:
+                progress.advance(nbytes=move.size)
+    instrumentation.count("files_moved", summary["moved"])
+    instrumentation.count("bytes_moved", summary["bytes"])
+    logger.info("[Apply] Moved %d files (%s), %d failed",
+                summary["moved"], format_bytes(summary["bytes"]), summary["failed"])
+    if summary["cancelled"]:
+        logger.info("[Apply] Cancelled with %d files left in place",
+                    len(moves) - summary["moved"] - summary["failed"])
+    logger.info("[Apply] Run id %s (roll back with --undo %s)", summary["run_id"], summary["run_id"])
+    return summary
+
+
+def format_bytes(size: int) -> str:
+    """Format a byte count for humans (e.g. "4.2 MB")."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def plan_to_json(plan: Iterable[PlannedMove]) -> str:
+    """
+    Serialize a move plan as JSON.
+
+    Args:
+        plan (iterable): The planned moves.
+
+    Returns:
+        str: A JSON array of {source, destination, reason, size} objects.
+    """
+    return json.dumps([move._asdict() for move in plan], indent=2)
+
+
+def export_plan(plan: Iterable[PlannedMove], path: str):
+    """
+    Write a move plan to a JSON file.
+
+    Args:
+        plan (iterable): The planned moves.
+        path (str): Output file path.
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(plan_to_json(plan))
+
+
+def print_plan(plan: Iterable[PlannedMove]):
+    """
+    Print a move plan, one line per file, followed by a summary.
+
+    Args:
+        plan (iterable): The planned moves.
+    """
+    plan = list(plan)
+    for move in plan:
+        print(f"{move.source} -> {move.destination} ({move.reason})")
+    total = sum(move.size for move in plan)
+    print(f"[Plan] {len(plan)} files, {format_bytes(total)} would be moved")
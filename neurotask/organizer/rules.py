@@ -0,0 +1,162 @@
+# organizer/rules.py
+import re
+import threading
+from collections import Counter
+from typing import List, NamedTuple
+from neurotask.utils import instrumentation
+
+# Minimum combined confidence for a rule match to be used instead of the LLM.
+DEFAULT_THRESHOLD = 0.8
+
+# Default rule specs; replaced by the "intent_rules" list in config.json.
+# "keywords" match as whole words (case-insensitive); "patterns" are regular
+# expressions (compiled case-insensitive and multi-line). A rule's
+# `date_bonus` is added to its confidence when the text also contains a date.
+DEFAULT_RULES = [
+    {"name": "signature", "intent": "To_Sign", "confidence": 0.9,
+     "keywords": ["please sign", "signature required", "signature needed", "sign here",
+                  "sign below", "docusign", "countersign"]},
+    {"name": "invoice", "intent": "To_Pay", "confidence": 0.7, "date_bonus": 0.15,
+     "keywords": ["invoice number", "amount due", "payment due", "balance due", "remit to",
+                  "please pay"],
+     "patterns": [r"^\s*invoice\b"]},
+    {"name": "reply", "intent": "To_Reply", "confidence": 0.85,
+     "patterns": [r"^\s*(re|aw|sv)\s*:", r"\bplease (reply|respond|get back to me)\b",
+                  r"\blet me know (if|whether|by)\b", r"\bRSVP\b"]},
+    {"name": "review", "intent": "To_Review", "confidence": 0.8,
+     "keywords": ["please review", "for your review", "feedback welcome", "track changes"],
+     "patterns": [r"^\s*draft\b"]},
+    {"name": "form", "intent": "To_Complete", "confidence": 0.8, "date_bonus": 0.1,
+     "keywords": ["please complete", "fill out", "fill in the", "application form",
+                  "to be completed by"]},
+    {"name": "receipt", "intent": "To_File", "confidence": 0.85,
+     "keywords": ["payment received", "thank you for your payment", "order confirmation",
+                  "this is your receipt", "paid in full"]},
+]
+
+
+class Rule(NamedTuple):
+    """One compiled pre-classification rule."""
+    name: str
+    intent: str
+    regex: re.Pattern
+    confidence: float
+    date_bonus: float = 0.0
+
+
+class RuleMatch(NamedTuple):
+    """The intent chosen by the rules for one text."""
+    intent: str
+    confidence: float
+    rules: tuple
+
+
+def compile_rules(specs: List[dict]) -> List[Rule]:
+    """
+    Compile rule specs (see DEFAULT_RULES) into one regular expression per rule.
+
+    Args:
+        specs (list): Rule specs with "intent", "keywords" and/or "patterns",
+            and optional "name", "confidence" and "date_bonus".
+
+    Returns:
+        list: Rule objects.
+
+    Raises:
+        ValueError: If a spec has no intent, no keywords or patterns, or an invalid pattern.
+    """
+    rules = []
+    for i, spec in enumerate(specs):
+        intent = spec.get("intent")
+        alternatives = [r"\b" + re.escape(k).replace(r"\ ", r"\s+") + r"\b"
+                        for k in spec.get("keywords", [])]
+        alternatives += list(spec.get("patterns", []))
+        if not intent or not alternatives:
+            raise ValueError(f"rule {i} needs an intent and at least one keyword or pattern")
+        try:
+            regex = re.compile("|".join(f"(?:{a})" for a in alternatives), re.IGNORECASE | re.MULTILINE)
+        except re.error as e:
+            raise ValueError(f"rule {spec.get('name', i)}: invalid pattern: {e}") from e
+        rules.append(Rule(spec.get("name", intent), intent, regex,
+                          float(spec.get("confidence", 0.8)), float(spec.get("date_bonus", 0.0))))
+    return rules
+
+
+class RuleSet:
+    """
+    Cheap first stage of the intent cascade: keyword and regex rules run over
+    a document's snippet before the cache and the LLM are consulted.
+
+    The confidences of all rules that fire for the same intent are combined
+    (1 - product of (1 - confidence)). The best intent is used only if it
+    reaches the threshold and no other intent scores as high.
+    """
+
+    def __init__(self, specs: List[dict] = None, threshold: float = DEFAULT_THRESHOLD):
+        self.rules = compile_rules(DEFAULT_RULES if specs is None else specs)
+        self.threshold = threshold
+
+    @instrumentation.timed("rules")
+    def classify(self, text: str):
+        """
+        Classify a text with the rules.
+
+        Args:
+            text (str): The document snippet.
+
+        Returns:
+            RuleMatch or None: The confident match, or None if the LLM should decide.
+        """
+        if not text or not self.rules:
+            return None
+        has_date = None
+        scores = {}
+        fired = {}
+        for rule in self.rules:
+            if not rule.regex.search(text):
+                continue
+            confidence = rule.confidence
+            if rule.date_bonus:
+                if has_date is None:
+                    # Imported here: dateutil is only needed once a date-aware rule fires.
+                    from neurotask.utils.datetime_utils import extract_date
+                    has_date = extract_date(text) is not None
+                if has_date:
+                    confidence = min(1.0, confidence + rule.date_bonus)
+            scores[rule.intent] = 1 - (1 - scores.get(rule.intent, 0.0)) * (1 - confidence)
+            fired.setdefault(rule.intent, []).append(rule.name)
+        if not scores:
+            return None
+        ranked = sorted(scores.items(), key=lambda item: -item[1])
+        intent, score = ranked[0]
+        if score < self.threshold or (len(ranked) > 1 and ranked[1][1] >= score):
+            return None
+        return RuleMatch(intent, score, tuple(fired[intent]))
+
+
+class TierStats:
+    """Thread-safe count of which cascade tier answered each document."""
+
+    TIERS = ("rules", "cache", "llm", "unreadable")
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def hit(self, tier: str, count: int = 1):
+        """Record that `tier` answered `count` documents."""
+        with self._lock:
+            self._counts[tier] += count
+
+    def counts(self) -> dict:
+        """Return the number of documents answered per tier."""
+        with self._lock:
+            return {tier: self._counts[tier] for tier in self.TIERS}
+
+    def report(self) -> str:
+        """Format the hit rate of every tier, e.g. "rules 40% (4), cache 10% (1), ..."."""
+        counts = self.counts()
+        total = sum(counts.values())
+        if not total:
+            return "no documents classified"
+        return ", ".join(f"{tier} {100 * n / total:.0f}% ({n})" for tier, n in counts.items())
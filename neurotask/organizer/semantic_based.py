@@ -1,164 +1,449 @@
 import os
-from neurotask.file_manager.mover import move_file
-from neurotask.models.ollama_runner import run_llm
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from neurotask.organizer.plan import PlannedMove, apply_plan
+from neurotask.file_manager.scanner import STATE_DIR_NAME, list_subdirectories, scan_directory, state_dir
+from neurotask.models.ollama_runner import get_client, run_llm
+from neurotask.models.llm_cache import get_cache
+from neurotask.utils.logger import setup_logger
 
-def create_folder_if_not_exists(directory, folder_name):
+logger = setup_logger(__name__)
+
+# Bump whenever build_semantic_prompt changes so cached answers are not reused.
+PROMPT_VERSION = "semantic-v1"
+ROOT_CATEGORY = "(root)"
+MISC_FOLDER = "Miscellaneous"
+# File in the state folder listing the category folders this organizer created.
+CREATED_FOLDERS_FILE = "semantic_folders.txt"
+# Rough upper bound on filename tokens sent in one prompt, well inside the
+# model's context window so the answer is not truncated.
+CHUNK_TOKEN_BUDGET = 1500
+DEFAULT_LLM_CONCURRENCY = 2
+
+def get_existing_categories(directory):
     """
-    Creates a folder if it does not already exist.
+    Gets a list of existing subdirectories (potential categories) in the given directory.
 
     Args:
-        directory (str): The parent directory.
-        folder_name (str): The name of the folder to create.
+        directory (str): The directory to check.
 
     Returns:
-        str: The path to the created (or existing) folder.
+        list: A list of folder names (strings).
     """
-    folder_path = os.path.join(directory, folder_name)
-    if not os.path.exists(folder_path):
-        os.makedirs(folder_path)
-    return folder_path
+    return list_subdirectories(directory)
 
-def get_existing_categories(directory):
+def created_folders(directory):
     """
-    Gets a list of existing subdirectories (potential categories) in the given directory.
+    Return the names of the folders organize_by_semantics has created in a directory.
 
     Args:
-        directory (str): The directory to check.
+        directory (str): The organized directory.
 
     Returns:
-        list: A list of folder names (strings).
+        set: Folder names, always including the Miscellaneous folder.
     """
-    return [
-        d for d in os.listdir(directory)
-        if os.path.isdir(os.path.join(directory, d))
-    ]
+    folders = {MISC_FOLDER}
+    try:
+        with open(os.path.join(directory, STATE_DIR_NAME, CREATED_FOLDERS_FILE), "r", encoding="utf-8") as f:
+            folders.update(line.strip() for line in f if line.strip())
+    except OSError:
+        pass
+    return folders
 
-def organize_by_semantics(directory: str):
+def record_created_folders(directory, folders):
     """
-    Organizes files in a directory based on the semantic meaning of their filenames,
-    using an LLM to group similar files together. Creates folders for groups of
-    related files.
+    Remember category folders created in a directory, so recursive runs skip them.
+
+    Args:
+        directory (str): The organized directory.
+        folders (iterable): Folder names to record.
+    """
+    new_folders = set(folders) - created_folders(directory)
+    if new_folders:
+        with open(os.path.join(state_dir(directory), CREATED_FOLDERS_FILE), "a", encoding="utf-8") as f:
+            f.writelines(f"{name}\n" for name in sorted(new_folders))
+
+def build_semantic_prompt(filenames):
+    """
+    Build the prompt asking the LLM to group the given filenames.
+
+    Args:
+        filenames (list): The filenames to categorize.
+
+    Returns:
+        str: The prompt to send to the LLM.
+    """
+    return (
+        "You are a file organization assistant. Your task is to group similar files together "
+        "based solely on their filenames. Analyze the following list of filenames and "
+        "group them into logical categories.\n\n"
+        "Instructions:\n"
+        "1. Identify groups of files that clearly belong together based on their names\n"
+        "2. For each group, provide a short, descriptive folder name (2-3 words max)\n"
+        "3. If a file doesn't fit any group, mark it as (root) and it will be placed in a Miscellaneous folder\n"
+        "4. Use simple, clear category names based on file name patterns\n"
+        "5. For similar files (like screenshots), use the common part of the name as category\n"
+        "6. IMPORTANT: DO NOT use generic names like 'Category 1', 'Category 2', etc. Always use descriptive names based on content\n\n"
+        "Examples of good categorization:\n"
+        "invoice_march.pdf -> Invoices\n"
+        "invoice_april.pdf -> Invoices\n"
+        "screenshot_profile_2024.png -> Profile Screenshots\n"
+        "screenshot_profile_2023.png -> Profile Screenshots\n"
+        "resume_v2.docx -> Resume Documents\n"
+        "random_file.txt -> (root)\n\n"
+        "Output format should be:\n"
+        "filename1.jpg -> RelevantCategoryName\n"
+        "filename2.png -> RelevantCategoryName\n"
+        "document.pdf -> AnotherCategory\n"
+        "unique_file.txt -> (root)\n\n"
+        "Here are the filenames to categorize:\n"
+        f"{', '.join(filenames)}\n\n"
+        "Now provide your categorization in the specified format. Remember to use meaningful category names based on the file content, never use generic labels like 'Category 1':"
+    )
+
+def parse_categorization(categorization, filenames):
+    """
+    Parse `filename -> Category` lines returned by the LLM.
+
+    Args:
+        categorization (str): The raw LLM response.
+        filenames (list): The filenames that were sent to the LLM.
+
+    Returns:
+        dict: Mapping of filename to category, where ROOT_CATEGORY marks
+            files that do not belong to any group.
+    """
+    known = set(filenames)
+    assignments = {}
+    for line in categorization.split('\n'):
+        if '->' in line:
+            filename_part, category_part = line.split('->', 1)
+            filename = filename_part.strip()
+            category = category_part.strip()
+
+            if filename in known:
+                if category == ROOT_CATEGORY or not category:
+                    assignments[filename] = ROOT_CATEGORY
+                else:
+                    assignments[filename] = category
+    return assignments
+
+def estimate_tokens(text):
+    """Cheap token estimate (about four characters per token)."""
+    return len(text) // 4 + 1
+
+def chunk_filenames(filenames, token_budget=CHUNK_TOKEN_BUDGET):
+    """
+    Split filenames into chunks whose prompts stay within a token budget.
+
+    Args:
+        filenames (list): The filenames to split.
+        token_budget (int, optional): Maximum estimated tokens of filenames per chunk.
+
+    Returns:
+        list: A list of filename lists.
+    """
+    chunks = []
+    current = []
+    used = 0
+    for filename in filenames:
+        # Each name also costs its ", " separator and its line in the answer.
+        cost = 2 * estimate_tokens(filename) + 2
+        if current and used + cost > token_budget:
+            chunks.append(current)
+            current = []
+            used = 0
+        current.append(filename)
+        used += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+def classify_chunk(filenames):
+    """
+    Ask the LLM to categorize one chunk of filenames.
+
+    Args:
+        filenames (list): The filenames in the chunk.
+
+    Returns:
+        dict: Mapping of filename to category (see parse_categorization).
+    """
+    categorization = run_llm(build_semantic_prompt(filenames)).strip()
+    if not categorization:
+        return {}
+    return parse_categorization(categorization, filenames)
+
+def normalize_category(category):
+    """
+    Reduce a category name to a comparison key, so that e.g. "Invoices",
+    "invoice" and "INVOICE_files" style variants compare equal.
+
+    Args:
+        category (str): The category name.
+
+    Returns:
+        str: The normalized key.
+    """
+    words = re.sub(r"[^a-z0-9]+", " ", category.lower()).split()
+    words = [w for w in words if w not in ("files", "file", "folder", "documents")] or words
+    return " ".join(w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w
+                    for w in words)
+
+def build_merge_prompt(categories):
+    """
+    Build the prompt asking the LLM to merge synonymous category names.
+
+    Args:
+        categories (list): The category names to merge.
+
+    Returns:
+        str: The prompt to send to the LLM.
+    """
+    return (
+        "You are a file organization assistant. The following folder names were proposed "
+        "independently for different batches of files. Merge names that mean the same thing "
+        "into one shared name, keeping distinct topics separate.\n\n"
+        "Output one line per folder name in the format:\n"
+        "OriginalName -> MergedName\n\n"
+        "Folder names:\n"
+        + "\n".join(categories)
+        + "\n\nNow provide the mapping:"
+    )
+
+def merge_categories(categories, anchors=(), use_llm=True):
+    """
+    Reduce step: map category names from separate chunks onto one
+    consistent folder set.
+
+    Names are first grouped by their normalized spelling; then, if several
+    groups remain, the LLM is asked once to merge synonyms. Existing folder
+    names in `anchors` win over new spellings.
+
+    Args:
+        categories (iterable): Category names produced by the chunks.
+        anchors (iterable, optional): Folder names that already exist.
+        use_llm (bool, optional): Whether to ask the LLM to merge synonyms.
+
+    Returns:
+        dict: Mapping of every input category to its canonical name.
+    """
+    counts = Counter(categories)
+    canonical_by_key = {normalize_category(a): a for a in anchors}
+    for category, _ in counts.most_common():
+        canonical_by_key.setdefault(normalize_category(category), category)
+    mapping = {c: canonical_by_key[normalize_category(c)] for c in counts}
+
+    names = sorted(set(mapping.values()))
+    if use_llm and len(names) > 1:
+        response = run_llm(build_merge_prompt(names)).strip()
+        merged = {}
+        for line in response.split('\n'):
+            if '->' in line:
+                original, target = (part.strip() for part in line.split('->', 1))
+                if original in names and target and target != ROOT_CATEGORY:
+                    merged[original] = canonical_by_key.get(normalize_category(target), target)
+        mapping = {c: merged.get(name, name) for c, name in mapping.items()}
+    return mapping
+
+def cached_assignments(filenames, cache, model):
+    """
+    Look up filenames categorized by earlier runs.
+
+    Args:
+        filenames (list): The filenames to look up.
+        cache (ClassificationCache or None): The classification cache.
+        model (str): Model name the answers were cached for.
+
+    Returns:
+        dict: Mapping of filename to category for every cached filename.
+    """
+    assignments = {}
+    if cache is not None:
+        for filename in filenames:
+            category = cache.get(filename, model, PROMPT_VERSION)
+            if category is not None:
+                assignments[filename] = category
+        logger.info("[Cache] %d of %d files already categorized", len(assignments), len(filenames))
+    return assignments
+
+def reduce_assignments(directory, assignments, new_assignments, use_llm, cache, model):
+    """
+    Fold synonymous names from different chunks (and from earlier runs) into
+    one consistent set of folders, and cache the merged answers.
+
+    Args:
+        directory (str): The directory being organized.
+        assignments (dict): Cached filename -> category answers; updated in place.
+        new_assignments (dict): Answers from this run's chunks.
+        use_llm (bool): Whether to ask the LLM to merge synonyms.
+        cache (ClassificationCache or None): The classification cache.
+        model (str): Model name to cache the answers for.
+    """
+    new_categories = [c for c in new_assignments.values() if c != ROOT_CATEGORY]
+    anchors = set(get_existing_categories(directory)) - {STATE_DIR_NAME}
+    anchors.update(c for c in assignments.values() if c != ROOT_CATEGORY)
+    mapping = merge_categories(new_categories, anchors, use_llm=use_llm)
+    for filename, category in new_assignments.items():
+        category = mapping.get(category, category)
+        assignments[filename] = category
+        if cache is not None:
+            cache.put(filename, model, PROMPT_VERSION, category)
+
+def assignments_to_plan(directory, entries_by_name, assignments):
+    """
+    Turn filename -> category answers into planned moves; files marked
+    (root) go to the Miscellaneous folder.
+
+    Args:
+        directory (str): The directory being organized.
+        entries_by_name (dict): Filename -> ScanEntry objects with that name.
+        assignments (dict): Filename -> category.
+
+    Returns:
+        list: PlannedMove objects.
+    """
+    plan = []
+    for filename, category in assignments.items():
+        if category == ROOT_CATEGORY:
+            folder, reason = MISC_FOLDER, "semantic -> uncategorized"
+        else:
+            folder, reason = category, f"semantic -> {category}"
+        for entry in entries_by_name[filename]:
+            dest_path = os.path.join(directory, folder, filename)
+            plan.append(PlannedMove(entry.path, dest_path, reason, entry.size))
+    return plan
+
+def plan_by_semantics(directory: str, use_cache: bool = True,
+                      llm_concurrency: int = DEFAULT_LLM_CONCURRENCY,
+                      token_budget: int = CHUNK_TOKEN_BUDGET, entries=None):
+    """
+    Decide a folder for each file based on the semantic meaning of its filename,
+    using an LLM to group similar files together, without moving anything.
+    Filenames categorized by an earlier run are answered from the
+    classification cache and are not sent to the LLM again.
+
+    Large directories are handled map-reduce style: the filenames are split
+    into token-budgeted chunks that are categorized in parallel, and the
+    category names from all chunks are then merged into one folder set.
 
     Args:
         directory (str): The directory to organize.
+        use_cache (bool, optional): Whether to use the classification cache.
+        llm_concurrency (int, optional): Maximum number of chunks categorized at once.
+        token_budget (int, optional): Maximum estimated filename tokens per chunk.
+        entries (iterable, optional): ScanEntry objects to organize, e.g. from
+            walk_directory. Defaults to the files directly inside `directory`.
+
+    Returns:
+        list: PlannedMove objects.
     """
+    plan = []
     try:
         # Get all files (excluding directories)
-        filenames = [f for f in os.listdir(directory) if os.path.isfile(os.path.join(directory, f))]
+        if entries is None:
+            entries = scan_directory(directory)
+        # The same name may occur in several subfolders during a recursive run.
+        entries_by_name = {}
+        for entry in entries:
+            entries_by_name.setdefault(entry.name, []).append(entry)
+        filenames = list(entries_by_name)
         
         if not filenames:
-            print("[Info] No files found to organize.")
-            return
-
-        print(f"[Semantic Organizer] Found {len(filenames)} files to organize")
-
-        # Prepare the prompt for LLM
-        prompt = (
-            "You are a file organization assistant. Your task is to group similar files together "
-            "based solely on their filenames. Analyze the following list of filenames and "
-            "group them into logical categories.\n\n"
-            "Instructions:\n"
-            "1. Identify groups of files that clearly belong together based on their names\n"
-            "2. For each group, provide a short, descriptive folder name (2-3 words max)\n"
-            "3. If a file doesn't fit any group, mark it as (root) and it will be placed in a Miscellaneous folder\n"
-            "4. Use simple, clear category names based on file name patterns\n"
-            "5. For similar files (like screenshots), use the common part of the name as category\n"
-            "6. IMPORTANT: DO NOT use generic names like 'Category 1', 'Category 2', etc. Always use descriptive names based on content\n\n"
-            "Examples of good categorization:\n"
-            "invoice_march.pdf -> Invoices\n"
-            "invoice_april.pdf -> Invoices\n"
-            "screenshot_profile_2024.png -> Profile Screenshots\n"
-            "screenshot_profile_2023.png -> Profile Screenshots\n"
-            "resume_v2.docx -> Resume Documents\n"
-            "random_file.txt -> (root)\n\n"
-            "Output format should be:\n"
-            "filename1.jpg -> RelevantCategoryName\n"
-            "filename2.png -> RelevantCategoryName\n"
-            "document.pdf -> AnotherCategory\n"
-            "unique_file.txt -> (root)\n\n"
-            "Here are the filenames to categorize:\n"
-            f"{', '.join(filenames)}\n\n"
-            "Now provide your categorization in the specified format. Remember to use meaningful category names based on the file content, never use generic labels like 'Category 1':"
-        )
+            logger.info("No files found to organize.")
+            return plan
+
+        logger.info("[Semantic Organizer] Found %d files to organize", len(filenames))
+
+        cache = get_cache() if use_cache else None
+        model = get_client().model
+        assignments = cached_assignments(filenames, cache, model)
+        pending = [f for f in filenames if f not in assignments]
 
         try:
-            # Get the categorization from LLM
-            categorization = run_llm(prompt).strip()
-            if not categorization:
-                print("[Error] LLM did not return any categorization. Please check if Ollama is running with Gemma 3 model.")
-                return
-                
-            print("[LLM Response] Received categorization:")
-            print(categorization)
-            
-            # Process the LLM's response
-            category_mapping = {}
-            uncategorized_files = []
-            for line in categorization.split('\n'):
-                if '->' in line:
-                    filename_part, category_part = line.split('->', 1)
-                    filename = filename_part.strip()
-                    category = category_part.strip()
-                    
-                    if filename in filenames:
-                        if category == "(root)" or not category.strip():
-                            uncategorized_files.append(filename)
-                        else:
-                            category_mapping[filename] = category.strip()
-
-            # Organize files based on the mapping
-            for filename, category in category_mapping.items():
-                dest_folder = create_folder_if_not_exists(directory, category)
-                
-                # Handle filename conflicts
-                base, ext = os.path.splitext(filename)
-                counter = 1
-                dest_filename = filename
-                dest_path = os.path.join(dest_folder, dest_filename)
-                while os.path.exists(dest_path):
-                    dest_filename = f"{base}_{counter}{ext}"
-                    dest_path = os.path.join(dest_folder, dest_filename)
-                    counter += 1
-
-                try:
-                    move_file(os.path.join(directory, filename), dest_folder, dest_filename)
-                    print(f"[Moved] {filename} → {dest_folder}/{dest_filename}")
-                except Exception as e:
-                    print(f"[Error] Could not move {filename}: {e}")
-            
-            # Move uncategorized files to Miscellaneous folder
-            if uncategorized_files:
-                misc_folder = create_folder_if_not_exists(directory, "Miscellaneous")
-                print(f"[Info] Moving {len(uncategorized_files)} uncategorized files to Miscellaneous folder")
-                
-                for filename in uncategorized_files:
-                    # Handle filename conflicts
-                    base, ext = os.path.splitext(filename)
-                    counter = 1
-                    dest_filename = filename
-                    dest_path = os.path.join(misc_folder, dest_filename)
-                    while os.path.exists(dest_path):
-                        dest_filename = f"{base}_{counter}{ext}"
-                        dest_path = os.path.join(misc_folder, dest_filename)
-                        counter += 1
-                    
-                    try:
-                        move_file(os.path.join(directory, filename), misc_folder, dest_filename)
-                        print(f"[Moved] {filename} → {misc_folder}/{dest_filename}")
-                    except Exception as e:
-                        print(f"[Error] Could not move uncategorized file {filename}: {e}")
+            if pending:
+                chunks = chunk_filenames(pending, token_budget)
+                logger.info("[Semantic Organizer] Categorizing %d files in %d chunks", len(pending), len(chunks))
+                new_assignments = {}
+                with ThreadPoolExecutor(max_workers=max(1, llm_concurrency)) as pool:
+                    futures = {pool.submit(classify_chunk, chunk): chunk for chunk in chunks}
+                    for done, future in enumerate(as_completed(futures), start=1):
+                        chunk = futures[future]
+                        try:
+                            chunk_assignments = future.result()
+                        except Exception as e:
+                            logger.error("[Semantic Organizer] Chunk failed: %s", e)
+                            chunk_assignments = {}
+                        new_assignments.update(chunk_assignments)
+                        logger.info("[Semantic Organizer] Chunk %d/%d done: %d of %d files categorized",
+                                    done, len(chunks), len(chunk_assignments), len(chunk))
+
+                if not new_assignments:
+                    logger.error("LLM did not return any categorization. Please check if Ollama is running with Gemma 3 model.")
+                    if not assignments:
+                        return plan
+                else:
+                    # Reduce: one consistent set of folders across chunks.
+                    reduce_assignments(directory, assignments, new_assignments,
+                                       len(chunks) > 1, cache, model)
+
+            plan = assignments_to_plan(directory, entries_by_name, assignments)
 
         except Exception as e:
-            print(f"[Error] Failed to process categorization: {e}")
-            print("Please ensure Ollama is installed and running with the Gemma 3 model.")
-            print("Installation instructions:")
-            print("1. Install Ollama from https://ollama.ai")
-            print("2. Run: ollama pull gemma3:4b")
-            print("3. Start Ollama service")
+            logger.error("Failed to process categorization: %s\n"
+                         "Please ensure Ollama is installed and running with the Gemma 3 model.\n"
+                         "Installation instructions:\n"
+                         "1. Install Ollama from https://ollama.ai\n"
+                         "2. Run: ollama pull gemma3:4b\n"
+                         "3. Start Ollama service", e)
 
     except Exception as e:
-        print(f"[Error] Failed to organize files: {e}")
+        logger.error("Failed to organize files: %s", e)
+    return plan
+
+def organize_by_semantics(directory: str, use_cache: bool = True,
+                          llm_concurrency: int = DEFAULT_LLM_CONCURRENCY,
+                          token_budget: int = CHUNK_TOKEN_BUDGET, entries=None,
+                          dry_run: bool = False, index=None, engine: str = "prompt",
+                          embedder: str = "hashing", workers: int = 4):
+    """
+    Organizes files in a directory based on the semantic meaning of their filenames,
+    using an LLM to group similar files together. Creates folders for groups of
+    related files.
+
+    With engine="embedding" the files are clustered locally on vectors of their
+    names and leading text instead (see cluster_based.plan_by_clusters), and the
+    LLM only names each cluster.
+
+    Args:
+        directory (str): The directory to organize.
+        use_cache (bool, optional): Whether to use the classification cache.
+        llm_concurrency (int, optional): Maximum number of chunks categorized at once.
+        token_budget (int, optional): Maximum estimated filename tokens per chunk.
+        entries (iterable, optional): ScanEntry objects to organize, e.g. from
+            walk_directory. Defaults to the files directly inside `directory`.
+        dry_run (bool, optional): Only build the plan; do not move anything.
+        index (FileIndex, optional): Index updated with each file's new location.
+        engine (str, optional): "prompt" (LLM groups filenames) or "embedding" (local clustering).
+        embedder (str, optional): Vectorizer for the embedding engine, "hashing" or "ollama".
+        workers (int, optional): Text extraction processes for the embedding engine.
+
+    Returns:
+        list: The move plan.
+    """
+    if engine == "embedding":
+        # Imported here so NumPy is only loaded when the embedding engine is used.
+        from neurotask.organizer.cluster_based import plan_by_clusters
+        plan = plan_by_clusters(directory, embedder, use_cache, llm_concurrency, entries,
+                                workers=workers, index=index)
+    else:
+        plan = plan_by_semantics(directory, use_cache, llm_concurrency, token_budget, entries)
+    if not dry_run and plan:
+        record_created_folders(directory, {os.path.basename(os.path.dirname(m.destination)) for m in plan})
+        apply_plan(plan, index=index)
+    return plan
 
 if __name__ == "__main__":
     test_directory = "/path/to/your/files"  # Replace with your actual directory path
-    organize_by_semantics(test_directory)
\ No newline at end of file
+    organize_by_semantics(test_directory)
@@ -1,28 +1,304 @@
 # organizer/timeline_based.py
 import os
-from neurotask.file_manager.mover import move_file
-from datetime import datetime
+import re
+import time
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from neurotask.file_manager.scanner import STATE_DIR_NAME, birth_time, scan_directory, state_dir
+from neurotask.organizer.plan import PlannedMove, apply_plan
 
-def organize_by_timeline(directory: str):
+UNKNOWN_DATE_FOLDER = "Unknown_Date"
+GRANULARITIES = ("day", "week", "month", "quarter", "year")
+DEFAULT_GRANULARITY = "month"
+# Where a file's date comes from. "created" is the birth time where the file
+# system records one, "content" an EXIF or in-document date; both fall back
+# to the modification time. "ctime" is the inode change time on Unix.
+DATE_SOURCES = ("created", "mtime", "ctime", "content")
+DEFAULT_DATE_SOURCE = "created"
+DEFAULT_WORKERS = 4
+# Reason shown in the plan for each source, and for the mtime fallback.
+_SOURCE_LABELS = {"created": "created", "mtime": "modified", "ctime": "changed", "content": "dated"}
+_FALLBACK_LABEL = "modified"
+# File in the state folder listing the date folders this organizer created.
+CREATED_FOLDERS_FILE = "timeline_folders.txt"
+# Folder names of the "day", "week" and "quarter" granularities.
+_FOLDER_PATTERN = re.compile(r"(\d{4})(-\d{2}-\d{2}|-W\d{2}|-Q[1-4])$")
+# "year" folders; plain four-digit names are common in users' own trees.
+_YEAR_PATTERN = re.compile(r"\d{4}$")
+_EPOCH = date(1970, 1, 1)
+# Timestamps outside [0, year 10000) are treated as unknown.
+_MAX_TIMESTAMP = 253402300800
+
+def is_timeline_folder(name: str) -> bool:
+    """
+    Check whether a folder name can only be one organize_by_timeline creates.
+
+    Bare years ("2019") are not recognized: a user's own folder may be named
+    that way. See timeline_folder_filter for those.
+
+    Args:
+        name (str): The folder name.
+
+    Returns:
+        bool: True for "2024-03-15", "2024-W11", "March 2024" and "2024-Q1"
+            folders from 1970 on, and the unknown-date folder.
+    """
+    if name == UNKNOWN_DATE_FOLDER:
+        return True
+    match = _FOLDER_PATTERN.match(name)
+    if match:
+        return int(match.group(1)) >= _EPOCH.year
+    try:
+        return datetime.strptime(name, "%B %Y").year >= _EPOCH.year
+    except ValueError:
+        return False
+
+def created_folders(directory):
+    """
+    Return the names of the folders organize_by_timeline has created in a directory.
+
+    Args:
+        directory (str): The organized directory.
+
+    Returns:
+        set: Folder names.
+    """
+    try:
+        with open(os.path.join(directory, STATE_DIR_NAME, CREATED_FOLDERS_FILE), "r", encoding="utf-8") as f:
+            return {line.strip() for line in f if line.strip()}
+    except OSError:
+        return set()
+
+def record_created_folders(directory, folders):
+    """
+    Remember date folders created in a directory, so recursive runs skip them.
+
+    Args:
+        directory (str): The organized directory.
+        folders (iterable): Folder names to record.
+    """
+    new_folders = set(folders) - created_folders(directory)
+    if new_folders:
+        with open(os.path.join(state_dir(directory), CREATED_FOLDERS_FILE), "a", encoding="utf-8") as f:
+            f.writelines(f"{name}\n" for name in sorted(new_folders))
+
+def timeline_folder_filter(directory):
     """
-    Organize files based on their creation date into folders named "Month Year".
-    Example: "March 2024", "June 2025".
+    Build the prune predicate for a recursive timeline run over a directory.
+
+    Args:
+        directory (str): The directory being organized.
+
+    Returns:
+        callable: Takes a folder name; True for names is_timeline_folder
+            recognizes and for year folders organize_by_timeline created there.
+            The record is read again for each year-like name, so folders
+            created later in a --watch session count too.
+    """
+    return lambda name: is_timeline_folder(name) or (
+        bool(_YEAR_PATTERN.match(name)) and name in created_folders(directory))
+
+@lru_cache(maxsize=None)
+def bucket_folder(granularity: str, key: int) -> str:
+    """
+    Folder name of a bucket key from bucket_keys (memoized, so each bucket is
+    formatted once per run however many files fall into it).
+
+    Args:
+        granularity (str): One of GRANULARITIES.
+        key (int): The bucket key.
+
+    Returns:
+        str: E.g. "2024-03-15", "2024-W11", "March 2024", "2024-Q1" or "2024".
+    """
+    if granularity == "day":
+        return (_EPOCH + timedelta(days=key)).isoformat()
+    if granularity == "week":
+        year, week, _ = (_EPOCH + timedelta(days=key)).isocalendar()
+        return f"{year}-W{week:02d}"
+    if granularity == "month":
+        return date(1970 + key // 12, key % 12 + 1, 1).strftime("%B %Y")
+    if granularity == "quarter":
+        return f"{1970 + key // 4}-Q{key % 4 + 1}"
+    return str(1970 + key)
+
+@lru_cache(maxsize=65536)
+def _utc_offset(hour: int) -> int:
+    # Local UTC offset in seconds at the start of an hour since the epoch.
+    return time.localtime(hour * 3600).tm_gmtoff
+
+def bucket_keys(timestamps, granularity: str = DEFAULT_GRANULARITY):
+    """
+    Map POSIX timestamps to local-time buckets in one vectorized pass.
+
+    The local UTC offset is looked up once per distinct hour (time zones and
+    daylight saving change on the hour), not once per file.
+
+    Args:
+        timestamps (numpy.ndarray): float64 timestamps; NaN for unknown.
+        granularity (str, optional): One of GRANULARITIES.
+
+    Returns:
+        tuple: (keys, valid) arrays. keys are int64 bucket keys for
+            bucket_folder: days since 1970-01-01 for "day", the Monday of the
+            ISO week for "week", months, quarters or years since 1970 otherwise.
+            valid is False where the timestamp is unknown or out of range.
+    """
+    import numpy as np
+
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity: {granularity}")
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    valid = np.isfinite(timestamps) & (timestamps >= 0) & (timestamps < _MAX_TIMESTAMP)
+    seconds = np.where(valid, timestamps, 0.0)
+    hours, inverse = np.unique(np.floor_divide(seconds, 3600).astype(np.int64), return_inverse=True)
+    offsets = np.fromiter((_utc_offset(int(hour)) for hour in hours), dtype=np.float64, count=len(hours))
+    days = np.floor_divide(seconds + offsets[inverse.reshape(-1)], 86400).astype(np.int64)
+    if granularity == "day":
+        keys = days
+    elif granularity == "week":
+        # 1970-01-01 was a Thursday; step back to the Monday of each ISO week.
+        keys = days - (days + 3) % 7
+    else:
+        keys = days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+        if granularity == "quarter":
+            keys = keys // 3
+        elif granularity == "year":
+            keys = keys // 12
+    return keys, valid
+
+def _content_dates(entries, workers, index):
+    # EXIF dates of images and the first date in documents, as timestamps.
+    from neurotask.file_manager.extractor import ExtractionService
+    from neurotask.file_manager.reader import DEFAULT_BUDGETS, EXIF_EXTENSIONS, read_exif_date
+    from neurotask.utils.datetime_utils import extract_date
+
+    dates = {}
+    texts = {}
+    to_read = []
+    for entry in entries:
+        ext = os.path.splitext(entry.name)[1].lower()
+        if ext in EXIF_EXTENSIONS:
+            dates[entry.path] = read_exif_date(entry.path)
+        elif ext in DEFAULT_BUDGETS:
+            stored = index.lookup_content(entry) if index is not None else None
+            if stored is not None:
+                texts[entry.path] = stored[1]
+            else:
+                to_read.append(entry.path)
+    if to_read:
+        with ExtractionService(max(1, workers)) as extractor:
+            for result in extractor.extract_many(to_read):
+                texts[result.path] = result.text
+    for path, text in texts.items():
+        dates[path] = extract_date(text) if text else None
+    result = []
+    for entry in entries:
+        found = dates.get(entry.path)
+        try:
+            result.append(found.timestamp() if found is not None else None)
+        except (OverflowError, OSError, ValueError):
+            result.append(None)
+    return result
+
+def file_timestamps(entries, date_source: str = DEFAULT_DATE_SOURCE, workers: int = DEFAULT_WORKERS,
+                    index=None):
+    """
+    Collect the date of every file into one array.
+
+    mtime and ctime come straight from the scan. "created" adds at most one
+    statx call per file on Linux; "content" reads EXIF headers and extracts
+    document text (in `workers` processes).
+
+    Args:
+        entries (list): ScanEntry objects.
+        date_source (str, optional): One of DATE_SOURCES.
+        workers (int, optional): Extraction processes for "content".
+        index (FileIndex, optional): Index whose stored document text is reused.
+
+    Returns:
+        tuple: (timestamps, fallback) numpy arrays; fallback is True where the
+            modification time was used because the source had no date.
+    """
+    import numpy as np
+
+    if date_source not in DATE_SOURCES:
+        raise ValueError(f"Unknown date source: {date_source}")
+    count = len(entries)
+    mtimes = np.fromiter((entry.mtime for entry in entries), dtype=np.float64, count=count)
+    if date_source == "mtime":
+        return mtimes, np.zeros(count, dtype=bool)
+    if date_source == "ctime":
+        return (np.fromiter((entry.ctime for entry in entries), dtype=np.float64, count=count),
+                np.zeros(count, dtype=bool))
+    if date_source == "created":
+        found = [birth_time(entry) for entry in entries]
+    else:
+        found = _content_dates(entries, workers, index)
+    primary = np.fromiter((np.nan if value is None else value for value in found),
+                          dtype=np.float64, count=count)
+    fallback = np.isnan(primary)
+    return np.where(fallback, mtimes, primary), fallback
+
+def plan_by_timeline(directory: str, entries=None, granularity: str = DEFAULT_GRANULARITY,
+                     date_source: str = DEFAULT_DATE_SOURCE, workers: int = DEFAULT_WORKERS, index=None):
+    """
+    Decide the date folder for each file, without moving anything.
+
+    Args:
+        directory (str): The directory to scan for files.
+        entries (iterable, optional): ScanEntry objects to organize, e.g. from
+            walk_directory. Defaults to the files directly inside `directory`.
+        granularity (str, optional): Bucket size, one of GRANULARITIES.
+        date_source (str, optional): Which date to use, one of DATE_SOURCES.
+        workers (int, optional): Extraction processes for the "content" source.
+        index (FileIndex, optional): Index whose stored document text is reused.
+
+    Returns:
+        list: PlannedMove objects.
+    """
+    entries = list(scan_directory(directory) if entries is None else entries)
+    if not entries:
+        return []
+    import numpy as np
+
+    timestamps, fallback = file_timestamps(entries, date_source, workers, index)
+    keys, valid = bucket_keys(timestamps, granularity)
+    # Only the distinct buckets are named; files then just pick theirs.
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    folders = [bucket_folder(granularity, key) for key in unique_keys.tolist()]
+    label = _SOURCE_LABELS[date_source]
+    plan = []
+    for entry, bucket, is_valid, used_fallback in zip(entries, inverse.reshape(-1).tolist(),
+                                                      valid.tolist(), fallback.tolist()):
+        folder_name = folders[bucket] if is_valid else UNKNOWN_DATE_FOLDER
+        dest_path = os.path.join(directory, folder_name, entry.name)
+        reason = f"{_FALLBACK_LABEL if used_fallback else label} -> {folder_name}"
+        plan.append(PlannedMove(entry.path, dest_path, reason, entry.size))
+    return plan
+
+def organize_by_timeline(directory: str, entries=None, dry_run: bool = False, index=None,
+                         granularity: str = DEFAULT_GRANULARITY, date_source: str = DEFAULT_DATE_SOURCE,
+                         workers: int = DEFAULT_WORKERS, progress=None):
+    """
+    Organize files into date folders, by default by creation month ("March 2024").
 
     Args:
         directory (str): The directory to scan for files.
+        entries (iterable, optional): ScanEntry objects to organize, e.g. from
+            walk_directory. Defaults to the files directly inside `directory`.
+        dry_run (bool, optional): Only build the plan; do not move anything.
+        index (FileIndex, optional): Index updated with each file's new location.
+        granularity (str, optional): "day", "week", "month", "quarter" or "year".
+        date_source (str, optional): "created", "mtime", "ctime" or "content".
+        workers (int, optional): Extraction processes for the "content" source.
+        progress (ProgressReporter, optional): Receives move progress and can cancel the run.
+
+    Returns:
+        list: The move plan.
     """
-    for filename in os.listdir(directory):
-        file_path = os.path.join(directory, filename)
-        if os.path.isfile(file_path):
-            try:
-                # Get creation time and convert to datetime
-                creation_time = os.path.getctime(file_path)
-                creation_date = datetime.fromtimestamp(creation_time)
-                # Format as "Month Year" (e.g., "March 2024")
-                folder_name = creation_date.strftime("%B %Y")  # %B = Full month name
-                dest_folder = os.path.join(directory, folder_name)
-                move_file(file_path, dest_folder)
-            except OSError:  # Fallback if creation time is unavailable
-                folder_name = "Unknown_Date"
-                dest_folder = os.path.join(directory, folder_name)
-                move_file(file_path, dest_folder)
\ No newline at end of file
+    plan = plan_by_timeline(directory, entries, granularity, date_source, workers, index)
+    if not dry_run and plan:
+        record_created_folders(directory, {os.path.basename(os.path.dirname(m.destination)) for m in plan})
+        apply_plan(plan, index=index, progress=progress)
+    return plan
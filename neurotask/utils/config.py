@@ -1,6 +1,8 @@
 # utils/config.py
 import os
 import json
+from functools import lru_cache
+from types import MappingProxyType
 
 DEFAULT_CONFIG = {
     "file_categories": {
@@ -15,11 +17,81 @@ DEFAULT_CONFIG = {
     }
 }
 
+def neurotask_home() -> str:
+    """Return the directory holding Neurotask's per-user state (`~/.neurotask`)."""
+    return os.environ.get("NEUROTASK_HOME") or os.path.join(os.path.expanduser("~"), ".neurotask")
+
+class ExtensionIndex:
+    """
+    Frozen extension -> folder lookup compiled from `file_categories`.
+
+    Extensions are matched case-insensitively and may span several dots
+    (e.g. ".tar.gz"); the longest configured suffix wins. Files with no
+    matching extension go to `fallback` (None leaves them in place).
+    """
+    __slots__ = ("mapping", "max_parts", "fallback", "folders")
+
+    def __init__(self, mapping: dict, fallback: str = None):
+        self.mapping = MappingProxyType(mapping)
+        self.max_parts = max((ext.count(".") for ext in mapping), default=1)
+        self.fallback = fallback
+        self.folders = frozenset(mapping.values()) | ({fallback} if fallback else frozenset())
+
+    def lookup(self, filename: str):
+        """
+        Return the folder for a filename, or the fallback if nothing matches.
+
+        Args:
+            filename (str): The file name (not a path).
+
+        Returns:
+            str or None: Folder name.
+        """
+        parts = filename.lower().split(".")
+        for count in range(min(self.max_parts, len(parts) - 1), 0, -1):
+            # The extension must not swallow the whole name (".bashrc").
+            if not "".join(parts[:-count]):
+                continue
+            folder = self.mapping.get("." + ".".join(parts[-count:]))
+            if folder is not None:
+                return folder
+        return self.fallback
+
+def compile_extension_index(file_categories: dict, fallback_category: str = None) -> ExtensionIndex:
+    """
+    Compile a category -> extensions mapping into an ExtensionIndex.
+
+    Args:
+        file_categories (dict): Mapping of category names to lists of extensions.
+        fallback_category (str, optional): Folder for files with unknown extensions.
+
+    Returns:
+        ExtensionIndex: The compiled index.
+    """
+    frozen = tuple((category, tuple(extensions)) for category, extensions in file_categories.items())
+    return _compile_extension_index(frozen, fallback_category)
+
+@lru_cache(maxsize=8)
+def _compile_extension_index(file_categories, fallback_category):
+    mapping = {}
+    for category, extensions in file_categories:
+        for ext in extensions:
+            ext = ext.strip().lower()
+            if not ext.startswith("."):
+                ext = "." + ext
+            # First category listing an extension wins, as before.
+            mapping.setdefault(ext, category.capitalize())
+    fallback = fallback_category.capitalize() if fallback_category else None
+    return ExtensionIndex(mapping, fallback)
+
 def load_config(path="config.json"):
     if os.path.exists(path):
         with open(path, "r") as f:
-            return json.load(f)
+            config = json.load(f)
     else:
         with open(path, "w") as f:
             json.dump(DEFAULT_CONFIG, f, indent=4)
-        return DEFAULT_CONFIG 
\ No newline at end of file
+        config = dict(DEFAULT_CONFIG)
+    config["extension_index"] = compile_extension_index(
+        config.get("file_categories", {}), config.get("fallback_category"))
+    return config
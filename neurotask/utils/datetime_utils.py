@@ -1,6 +1,8 @@
 # utils/datetime_utils.py
 import re
-from dateutil import parser
+from neurotask.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
 
 def extract_date(text: str):
     """
@@ -23,10 +25,11 @@ def extract_date(text: str):
     match = date_pattern.search(text)
     if match:
         try:
+            from dateutil import parser
             date_str = match.group(0)
             return parser.parse(date_str, fuzzy=True)
         except Exception as e:
-            print(f"Date parsing error: {e}")
+            logger.debug("Date parsing error: %s", e)
     return None
 
 # Example usage:
@@ -0,0 +1,228 @@
+# utils/instrumentation.py
+"""
+Lightweight run instrumentation: stage timers, counters and a summary table.
+
+Everything is off by default. While disabled, `timer()` returns a shared
+no-op context manager and `count()`/`record()` return immediately, so the
+calls can stay in hot paths. `--profile` and `--metrics-out` turn it on.
+
+Usage:
+    with timer("llm"):
+        response = client.generate(prompt)
+    count("llm_tokens", 12)
+
+    @timed("scan")
+    def scan(...): ...
+"""
+import functools
+import json
+import os
+import threading
+import time
+
+# Stages in the order they are shown; unknown stages are listed after them.
+STAGE_ORDER = ("scan", "dedup", "extract", "rules", "llm", "plan", "move", "organize")
+METRIC_PREFIX = "neurotask"
+
+_enabled = False
+_lock = threading.Lock()
+# stage -> [calls, total seconds, max seconds]
+_stages = {}
+_counters = {}
+
+
+def enable():
+    """Start collecting timings and counters."""
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    """Stop collecting (already collected data is kept until reset())."""
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset():
+    """Drop all collected timings and counters."""
+    with _lock:
+        _stages.clear()
+        _counters.clear()
+
+
+def record(stage: str, seconds: float):
+    """Add one timed call of `stage` (e.g. measured in another process)."""
+    if not _enabled:
+        return
+    with _lock:
+        stats = _stages.get(stage)
+        if stats is None:
+            _stages[stage] = [1, seconds, seconds]
+        else:
+            stats[0] += 1
+            stats[1] += seconds
+            if seconds > stats[2]:
+                stats[2] = seconds
+
+
+def count(name: str, value: int = 1):
+    """Increase counter `name` by `value`."""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+class _Timer:
+    __slots__ = ("stage", "_start")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        record(self.stage, time.perf_counter() - self._start)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timer(stage: str):
+    """
+    Context manager timing one call of `stage`.
+
+    Args:
+        stage (str): Stage name, e.g. "extract" or "llm".
+
+    Returns:
+        A context manager (a shared no-op one while disabled).
+    """
+    return _Timer(stage) if _enabled else _NULL_TIMER
+
+
+def timed(stage: str):
+    """Decorator timing every call of the function as `stage`."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(stage, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def snapshot() -> dict:
+    """
+    Return the collected data.
+
+    Returns:
+        dict: {"stages": {stage: {"calls", "seconds", "max_seconds"}}, "counters": {name: value}}.
+    """
+    with _lock:
+        order = {stage: i for i, stage in enumerate(STAGE_ORDER)}
+        stages = {
+            stage: {"calls": calls, "seconds": total, "max_seconds": longest}
+            for stage, (calls, total, longest) in sorted(
+                _stages.items(), key=lambda item: (order.get(item[0], len(order)), item[0]))
+        }
+        return {"stages": stages, "counters": dict(sorted(_counters.items()))}
+
+
+def format_summary(data: dict = None) -> str:
+    """
+    Format the end-of-run summary table.
+
+    Args:
+        data (dict, optional): A snapshot(); the current data if omitted.
+
+    Returns:
+        str: The table, one stage per row, followed by the counters.
+    """
+    data = data or snapshot()
+    lines = [f"{'stage':<10} {'calls':>8} {'total s':>10} {'mean ms':>10} {'max ms':>10}"]
+    for stage, stats in data["stages"].items():
+        mean = stats["seconds"] / stats["calls"] * 1000 if stats["calls"] else 0.0
+        lines.append(f"{stage:<10} {stats['calls']:>8} {stats['seconds']:>10.3f} "
+                     f"{mean:>10.2f} {stats['max_seconds'] * 1000:>10.2f}")
+    if data["counters"]:
+        lines.append("")
+        lines.extend(f"{name:<20} {value:>12}" for name, value in data["counters"].items())
+    return "\n".join(lines)
+
+
+def _prometheus_text(data: dict, labels: dict) -> str:
+    label_text = ",".join(f'{key}="{value}"' for key, value in sorted(labels.items()))
+
+    def metric(name, value, extra=""):
+        inner = ",".join(part for part in (label_text, extra) if part)
+        return f"{METRIC_PREFIX}_{name}{{{inner}}} {value}" if inner else f"{METRIC_PREFIX}_{name} {value}"
+
+    lines = [
+        f"# HELP {METRIC_PREFIX}_stage_seconds Time spent per stage in the last run.",
+        f"# TYPE {METRIC_PREFIX}_stage_seconds gauge",
+    ]
+    lines += [metric("stage_seconds", f"{s['seconds']:.6f}", f'stage="{stage}"') for stage, s in data["stages"].items()]
+    lines += [
+        f"# HELP {METRIC_PREFIX}_stage_calls Timed calls per stage in the last run.",
+        f"# TYPE {METRIC_PREFIX}_stage_calls gauge",
+    ]
+    lines += [metric("stage_calls", s["calls"], f'stage="{stage}"') for stage, s in data["stages"].items()]
+    lines += [
+        f"# HELP {METRIC_PREFIX}_stage_max_seconds Longest single call per stage in the last run.",
+        f"# TYPE {METRIC_PREFIX}_stage_max_seconds gauge",
+    ]
+    lines += [metric("stage_max_seconds", f"{s['max_seconds']:.6f}", f'stage="{stage}"')
+              for stage, s in data["stages"].items()]
+    for name, value in data["counters"].items():
+        lines += [f"# TYPE {METRIC_PREFIX}_{name} gauge", metric(name, value)]
+    lines += [f"# TYPE {METRIC_PREFIX}_last_run_timestamp_seconds gauge",
+              metric("last_run_timestamp_seconds", int(time.time()))]
+    return "\n".join(lines) + "\n"
+
+
+def export(path: str, labels: dict = None, data: dict = None):
+    """
+    Write the collected data to `path`.
+
+    Files ending in ".prom" are written in the Prometheus text format,
+    replaced atomically so node exporter's textfile collector never reads a
+    partial file. Any other file gets one JSON object appended per run
+    (JSON lines).
+
+    Args:
+        path (str): Output file.
+        labels (dict, optional): Extra fields / labels, e.g. {"type": "intent"}.
+        data (dict, optional): A snapshot(); the current data if omitted.
+    """
+    data = data or snapshot()
+    labels = labels or {}
+    if path.endswith(".prom"):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(_prometheus_text(data, labels))
+        os.replace(tmp_path, path)
+    else:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"timestamp": time.time(), **labels, **data}) + "\n")
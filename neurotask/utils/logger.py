@@ -1,30 +1,103 @@
 # utils/logger.py
+import atexit
 import logging
+import os
 import sys
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
 
-def setup_logger(name: str, level=logging.INFO) -> logging.Logger:
+# Parent of every module logger (neurotask.organizer.plan, ...); its level applies to all of them.
+ROOT_LOGGER = "neurotask"
+LOG_FORMAT = "[%(asctime)s] %(levelname)s - %(message)s"
+
+_listener = None
+_configured = False
+
+
+def _stream_handler() -> logging.Handler:
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    return handler
+
+
+def _configure_root() -> logging.Logger:
+    """
+    Route the package's log records through a queue. The calling thread only
+    enqueues a record; a listener thread writes it to stdout, so slow
+    terminals and pipes do not stall the organizers.
+    """
+    global _listener, _configured
+    root = logging.getLogger(ROOT_LOGGER)
+    if _configured:
+        return root
+    _configured = True
+    queue = SimpleQueue()
+    _listener = QueueListener(queue, _stream_handler())
+    _listener.start()
+    atexit.register(stop_logging)
+    root.addHandler(QueueHandler(queue))
+    root.setLevel(logging.INFO)
+    root.propagate = False
+    return root
+
+
+def _write_directly():
+    """Replace the queue handler with a plain stdout handler."""
+    global _listener
+    _listener = None
+    root = logging.getLogger(ROOT_LOGGER)
+    for handler in list(root.handlers):
+        if isinstance(handler, QueueHandler):
+            root.removeHandler(handler)
+            root.addHandler(_stream_handler())
+
+
+# The listener thread does not survive fork(); worker processes write directly.
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_write_directly)
+
+
+def setup_logger(name: str, level=None) -> logging.Logger:
     """
-    Sets up and returns a logger with the specified name and log level.
-    
+    Sets up and returns a logger with the specified name.
+
+    Loggers below "neurotask" (use `setup_logger(__name__)` in package modules)
+    share its queued handler and level, which `set_log_level` changes for all
+    of them at once.
+
     Args:
         name (str): Name of the logger.
-        level (int, optional): Logging level. Defaults to logging.INFO.
-    
+        level (int, optional): Logging level of this logger only. Defaults to
+            the level of the "neurotask" logger (INFO unless changed).
+
     Returns:
         logging.Logger: Configured logger object.
     """
+    _configure_root()
     logger = logging.getLogger(name)
-    logger.setLevel(level)
-    
-    # Avoid duplicate handlers if logger already has one.
-    if not logger.handlers:
-        handler = logging.StreamHandler(sys.stdout)
-        formatter = logging.Formatter("[%(asctime)s] %(levelname)s - %(message)s")
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-    
+    if level is not None:
+        logger.setLevel(level)
     return logger
 
+
+def set_log_level(level):
+    """
+    Set the level of all Neurotask loggers.
+
+    Args:
+        level (int or str): A logging level, e.g. logging.DEBUG or "WARNING".
+    """
+    _configure_root().setLevel(level)
+
+
+def stop_logging():
+    """Write out the queued records and stop the listener thread (called at exit)."""
+    listener = _listener
+    if listener is not None:
+        _write_directly()
+        listener.stop()
+
+
 # Example usage:
 if __name__ == "__main__":
     log = setup_logger("neurotask")
@@ -0,0 +1,122 @@
+# utils/progress.py
+"""
+Progress events and cancellation for long organizer runs.
+
+Organizers call `start_stage()` and `advance()` from whatever thread they run
+on; the resulting ProgressEvents go into a thread-safe queue that the
+consumer drains with `events()` (the GUI does this from the Tk main loop via
+`root.after`). `cancel()` asks the run to stop: organizers check `cancelled`
+before starting on the next file, so work already in flight (a move, an LLM
+request) is finished rather than cut off.
+
+Usage:
+    progress = ProgressReporter()
+    progress.start_stage("move", total=len(moves), bytes_total=total_size)
+    for move in moves:
+        if progress.cancelled:
+            break
+        ...
+        progress.advance(nbytes=move.size)
+"""
+import queue
+import threading
+import time
+from typing import List, NamedTuple
+
+# Minimum seconds between two queued events of the same stage; the first and
+# last event of a stage are always queued.
+DEFAULT_EMIT_INTERVAL = 0.1
+
+
+class ProgressEvent(NamedTuple):
+    """Snapshot of a run's progress."""
+    stage: str
+    done: int
+    # 0 while the number of files is not known.
+    total: int
+    bytes_done: int
+    bytes_total: int
+    files_per_sec: float
+    # Estimated seconds left in the stage, or None if unknown.
+    eta: float
+
+
+class ProgressReporter:
+    """
+    Thread-safe progress counter and cancellation flag for one run.
+
+    Args:
+        emit_interval (float, optional): Minimum seconds between queued events,
+            so a fast stage does not flood the consumer.
+    """
+
+    def __init__(self, emit_interval: float = DEFAULT_EMIT_INTERVAL):
+        self.emit_interval = emit_interval
+        self._queue = queue.SimpleQueue()
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self.stage = None
+        self.done = self.total = self.bytes_done = self.bytes_total = 0
+        # Journal id of the applied plan (set by apply_plan), for `--undo`.
+        self.run_id = None
+        self._started = self._last_emit = 0.0
+
+    @property
+    def cancelled(self) -> bool:
+        """True once cancel() was called."""
+        return self._cancel.is_set()
+
+    def cancel(self):
+        """Ask the run to stop after the work already in flight."""
+        self._cancel.set()
+
+    def start_stage(self, stage: str, total: int = 0, bytes_total: int = 0):
+        """
+        Begin a new stage and reset the counters.
+
+        Args:
+            stage (str): Stage name shown to the user, e.g. "classify" or "move".
+            total (int, optional): Files the stage will handle, 0 if unknown.
+            bytes_total (int, optional): Bytes the stage will handle.
+        """
+        with self._lock:
+            self.stage = stage
+            self.total = total
+            self.bytes_total = bytes_total
+            self.done = self.bytes_done = 0
+            self._started = time.monotonic()
+            self._emit(force=True)
+
+    def advance(self, files: int = 1, nbytes: int = 0):
+        """
+        Count finished files of the current stage.
+
+        Args:
+            files (int, optional): Files finished.
+            nbytes (int, optional): Their size in bytes.
+        """
+        with self._lock:
+            self.done += files
+            self.bytes_done += nbytes
+            self._emit(force=self.total > 0 and self.done >= self.total)
+
+    def _emit(self, force: bool):
+        # Called with the lock held.
+        now = time.monotonic()
+        if not force and now - self._last_emit < self.emit_interval:
+            return
+        self._last_emit = now
+        elapsed = now - self._started
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        eta = (self.total - self.done) / rate if rate > 0 and self.total else None
+        self._queue.put(ProgressEvent(self.stage, self.done, self.total, self.bytes_done,
+                                      self.bytes_total, rate, eta))
+
+    def events(self) -> List[ProgressEvent]:
+        """Remove and return the queued events, oldest first."""
+        events = []
+        while True:
+            try:
+                events.append(self._queue.get_nowait())
+            except queue.Empty:
+                return events
@@ -7,7 +7,6 @@ import sys
 # Add the project root to Python path
 project_root = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, project_root)
-print(f"[DEBUG] Setting Python path: {project_root}")
 
 # Import and run the main function
 try:
@@ -0,0 +1,32 @@
+# tests/conftest.py
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.join(REPO_ROOT, "benchmarks"))
+
+from fake_llm import FakeOllama  # noqa: E402
+
+
+@pytest.fixture
+def fake_ollama():
+    """A fake Ollama server (benchmarks/fake_llm.py) answering without delay."""
+    with FakeOllama(latency=0, token_latency=0) as server:
+        yield server
+
+
+@pytest.fixture
+def ollama_env(monkeypatch, tmp_path):
+    """
+    Isolate the process-wide Ollama client: the next get_client() builds a
+    new client from $OLLAMA_HOST, and the HTTP API is tried again.
+    """
+    from neurotask.models import ollama_runner
+
+    monkeypatch.setenv("NEUROTASK_HOME", str(tmp_path / "home"))
+    monkeypatch.setattr(ollama_runner, "_client", None)
+    monkeypatch.setattr(ollama_runner, "_http_retry_at", 0.0)
+    return monkeypatch
@@ -0,0 +1,40 @@
+# tests/test_async_organizer.py
+import asyncio
+import threading
+
+import pytest
+
+from fake_llm import FakeOllama
+from neurotask.organizer import async_organizer
+from neurotask.utils.progress import ProgressReporter
+
+
+@pytest.fixture
+def slow_ollama(ollama_env):
+    # One prompt at a time, slow enough that most files are still queued at the cancel.
+    with FakeOllama(latency=0.2, token_latency=0, parallel=1) as server:
+        ollama_env.setenv("OLLAMA_HOST", server.address)
+        yield server
+
+
+def test_cancelled_intent_run_counts_only_classified_files(slow_ollama, ollama_env, tmp_path):
+    directory = tmp_path / "docs"
+    directory.mkdir()
+    for number in range(20):
+        (directory / f"note{number}.txt").write_text(f"Meeting notes {number}: please review the draft.")
+    messages = []
+    ollama_env.setattr(async_organizer.logger, "info", lambda msg, *args: messages.append(msg % args))
+    progress = ProgressReporter()
+    timer = threading.Timer(0.7, progress.cancel)
+    timer.start()
+    try:
+        plan = asyncio.run(async_organizer.organize_by_intents_async(
+            str(directory), workers=1, llm_concurrency=1, use_cache=False, use_rules=False,
+            progress=progress))
+    finally:
+        timer.cancel()
+
+    assert plan == []
+    assert 0 < slow_ollama.requests < 20
+    # Every classified file needed a prompt; files still queued are not counted.
+    assert f"[Intent Organizer] Cancelled after {slow_ollama.requests} of 20 files, no files moved" in messages
@@ -0,0 +1,56 @@
+# tests/test_extractor.py
+import multiprocessing
+import signal
+import time
+import types
+
+import pytest
+
+from neurotask.file_manager import extractor
+
+HANG_SECONDS = 30
+
+pytestmark = pytest.mark.skipif(
+    multiprocessing.get_context().get_start_method() != "fork",
+    reason="the patched reader only reaches the workers when they are forked")
+
+
+def _reader(path, budgets=None):
+    if "hang" in path:
+        time.sleep(HANG_SECONDS)
+    return "text of " + path
+
+
+@pytest.fixture
+def no_alarm(monkeypatch):
+    # Workers stuck in a parser: no in-worker SIGALRM (as on Windows), so only
+    # the parent's watchdog can stop them.
+    monkeypatch.setattr(extractor, "read_first_page", _reader)
+    monkeypatch.setattr(extractor, "signal", types.SimpleNamespace(SIGTERM=signal.SIGTERM))
+
+
+def test_hung_extraction_times_out_and_workers_are_killed(no_alarm):
+    start = time.monotonic()
+    with extractor.ExtractionService(2, timeout=0.5, max_bytes=0) as service:
+        results = {result.path: result for result in service.extract_many(["a", "hang", "b", "c"])}
+        late = service.submit("d").result(timeout=10)
+
+    assert results["hang"].error == "timed out after 0.5s"
+    assert {path: results[path].text for path in "abc"} == {path: "text of " + path for path in "abc"}
+    assert late.text == "text of d" and late.error is None
+    # The stuck workers were terminated rather than waited for.
+    assert time.monotonic() - start < HANG_SECONDS / 2
+    assert not multiprocessing.active_children()
+
+
+def test_close_kills_workers_busy_with_a_hung_file(no_alarm):
+    start = time.monotonic()
+    service = extractor.ExtractionService(1, timeout=HANG_SECONDS, max_bytes=0)
+    future = service.submit("hang")
+    time.sleep(0.5)
+    service.close()
+
+    assert time.monotonic() - start < HANG_SECONDS / 2
+    assert not multiprocessing.active_children()
+    # The file's future fails instead of being left pending.
+    assert future.done() and future.exception() is not None
@@ -0,0 +1,126 @@
+# tests/test_ollama_runner.py
+import os
+import socket
+import socketserver
+import stat
+import sys
+import threading
+
+import pytest
+
+from fake_llm import INTENTS, RAMBLE
+from neurotask.models import ollama_runner
+from neurotask.models.ollama_runner import OllamaClient, run_llm_until, stop_at_category
+
+INTENT_PROMPT = "Document content:\nplease review the attached draft\n\nDocument category:"
+
+
+class _OneShotHandler(socketserver.StreamRequestHandler):
+    # Answers a single request with keep-alive headers, then closes the
+    # connection, like a server dropping an idle keep-alive socket.
+    def handle(self):
+        self.server.connections += 1
+        length = 0
+        while True:
+            line = self.rfile.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        self.rfile.read(length)
+        body = b'{"response": "To_File", "done": true}'
+        self.wfile.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                         b"Connection: keep-alive\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body))
+
+
+@pytest.fixture
+def one_shot_server():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _OneShotHandler)
+    server.daemon_threads = True
+    server.connections = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_generate_reuses_keep_alive_connection(fake_ollama):
+    client = OllamaClient(host=fake_ollama.address)
+    first = client.generate(INTENT_PROMPT)
+    sock = client._connection().sock
+    second = client.generate(INTENT_PROMPT)
+
+    assert first == second
+    assert sock is not None
+    assert client._connection().sock is sock
+    assert fake_ollama.requests == 2
+    client.close()
+
+
+def test_stream_reuses_connection_after_complete_response(fake_ollama):
+    client = OllamaClient(host=fake_ollama.address)
+    assert "".join(client.stream(INTENT_PROMPT)).endswith(RAMBLE)
+    sock = client._connection().sock
+    assert "".join(client.stream(INTENT_PROMPT)).endswith(RAMBLE)
+
+    assert client._connection().sock is sock
+    client.close()
+
+
+def test_request_retried_after_server_closed_connection(one_shot_server):
+    host, port = one_shot_server.server_address
+    client = OllamaClient(host=f"{host}:{port}")
+
+    assert client.generate("first") == "To_File"
+    # The server has closed the pooled connection; the next request is sent
+    # again on a fresh socket instead of failing.
+    assert client.generate("second") == "To_File"
+    assert one_shot_server.connections == 2
+    client.close()
+
+
+def test_run_llm_until_stops_at_category(fake_ollama, ollama_env):
+    ollama_env.setenv("OLLAMA_HOST", fake_ollama.address)
+
+    answer = run_llm_until(INTENT_PROMPT, stop_at_category(INTENTS))
+
+    assert answer in INTENTS
+    # The full answer would be the category followed by RAMBLE.
+    full = run_llm_until(INTENT_PROMPT, until=None)
+    assert full.startswith(answer) and full != answer
+
+
+def test_run_llm_until_reuses_client_after_early_stop(fake_ollama, ollama_env):
+    ollama_env.setenv("OLLAMA_HOST", fake_ollama.address)
+    until = stop_at_category(INTENTS)
+
+    answers = [run_llm_until(INTENT_PROMPT, until) for _ in range(3)]
+
+    assert len(set(answers)) == 1 and answers[0] in INTENTS
+    assert fake_ollama.requests == 3
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="uses a shell script as the ollama executable")
+def test_run_llm_until_falls_back_to_ollama_run(ollama_env, tmp_path):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    fake_cli = bin_dir / "ollama"
+    fake_cli.write_text("#!/bin/sh\nprintf 'To_Sign\\nbecause it needs a signature\\n'\n")
+    fake_cli.chmod(fake_cli.stat().st_mode | stat.S_IEXEC)
+    ollama_env.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}")
+    # Nothing listens on this port, so the HTTP API is unavailable.
+    ollama_env.setenv("OLLAMA_HOST", f"127.0.0.1:{_free_port()}")
+
+    answer = run_llm_until(INTENT_PROMPT, stop_at_category(INTENTS))
+
+    assert answer == "To_Sign"
+    # The HTTP API is not tried again until the retry interval has passed.
+    assert ollama_runner._http_retry_at > 0
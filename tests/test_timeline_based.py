@@ -0,0 +1,21 @@
+# tests/test_timeline_based.py
+from neurotask.organizer.timeline_based import (
+    UNKNOWN_DATE_FOLDER, is_timeline_folder, record_created_folders, timeline_folder_filter)
+
+
+def test_dated_folder_names_are_recognized():
+    for name in ("2024-03-15", "2024-W11", "March 2024", "2024-Q1", UNKNOWN_DATE_FOLDER):
+        assert is_timeline_folder(name)
+    for name in ("2019", "1234", "0999-Q1", "March 1850", "Projects"):
+        assert not is_timeline_folder(name)
+
+
+def test_only_created_year_folders_are_pruned(tmp_path):
+    record_created_folders(str(tmp_path), {"2023", "March 2024"})
+    prune = timeline_folder_filter(str(tmp_path))
+
+    assert prune("2023")
+    assert prune("March 2024") and prune("2024-W11")
+    # A user's own year folder is searched.
+    assert not prune("2019")
+    assert not prune("Projects")